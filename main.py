@@ -1,5 +1,48 @@
-from system import System   
-system = System() #creating instance of System
-system.initMenu()
-system.home_page()
-print("Exited from InCollege")
\ No newline at end of file
+import argparse
+import os
+from system import System, TRANSFER_FORMATS, DEFAULT_DATABASE, DEFAULT_ORIGIN, SESSION_TTL
+
+parser = argparse.ArgumentParser(description="InCollege")
+parser.add_argument('--database', default=DEFAULT_DATABASE, help="database file or file: URI to use (default: %(default)s)")
+parser.add_argument('--import', dest='importDir', metavar='DIR', help="import the table files in DIR and exit")
+parser.add_argument('--export', dest='exportDir', metavar='DIR', help="export every table to files in DIR and exit")
+parser.add_argument('--backup', metavar='FILE', help="copy the database to FILE while it stays in use and exit")
+parser.add_argument('--restore', metavar='FILE', help="replace the database with the backup FILE and exit")
+parser.add_argument('--session', metavar='TOKEN', help="resume the login session of TOKEN instead of logging in")
+parser.add_argument('--route', metavar='PATH', help="open the page at PATH first (ex. profile/edit/exp/3/location)")
+parser.add_argument('--benchmark-profiles', dest='benchmarkProfiles', action='store_true',
+                    help="time loading each profile from its profile document and from the accounts/experiences join and exit")
+parser.add_argument('--format', choices=TRANSFER_FORMATS, default='csv', help="file format of the imported/exported tables")
+args = parser.parse_args()
+
+# login attempts are throttled per origin, remote users are told apart by their ssh client address
+origin = (os.environ.get('SSH_CLIENT', '').split() or [DEFAULT_ORIGIN])[0]
+system = System(args.database, origin=origin) #creating instance of System
+if args.importDir or args.exportDir or args.backup or args.restore or args.benchmarkProfiles:
+  if args.restore:
+    system.restore(args.restore)
+    print(f"Restored the database from {args.restore}.")
+  if args.importDir:
+    for table, count in system.importData(args.importDir, args.format).items():
+      print(f"Imported {count} {table} rows.")
+  if args.exportDir:
+    for table, count in system.exportData(args.exportDir, args.format).items():
+      print(f"Exported {count} {table} rows.")
+  if args.backup:
+    system.backup(args.backup)
+    print(f"Backed up the database to {args.backup}.")
+  if args.benchmarkProfiles:
+    timings = system.benchmarkProfileLoads()
+    print(f"Loaded {timings['profiles']} profiles in {timings['document'] * 1e6:.1f}us each from profile documents "
+          f"and {timings['join'] * 1e6:.1f}us each from the join.")
+else:
+  system.initMenu()
+  resumed = system.resumeSession(args.session) if args.session else None
+  if args.route:
+    system.openRoute(args.route)
+  if resumed:
+    resumed()
+  system.home_page()
+  if system.sessionToken:
+    print(f"Resume your session within {SESSION_TTL // 60} minutes with: python main.py --session {system.sessionToken}")
+  print("Exited from InCollege")
@@ -2,16 +2,114 @@ import sqlite3
 import datetime
 import re
 import hashlib
-from user import User, education, experience, profile
+import hmac
+import secrets
+from user import User, UserRef, LazyProfile, PROFILE_TTL, education, experience, profile
 import os
+import time
+import math
+import heapq
+import random
+import threading
+import csv
+from types import MappingProxyType
+import json
+import itertools
+from collections import OrderedDict, Counter, deque, namedtuple
 
 #list of languages currently supported by InCollege
 LANGUAGES = ('English', 'Spanish')
 MSG_ERR_RETRY = "Your Request Could Not Be Competed at This Time.\nPlease Try Again Later."
+MSG_SETTINGS_DROPPED = "Your Setting Changes Could Not Be Saved And Have Been Discarded."
+#number of results displayed on each page of a paginated menu
+PAGE_SIZE = 10
+#maximum number of user profiles held in the profile cache
+PROFILE_CACHE_SIZE = 256
+# minimum number of usernames the taken username filter is sized for, and its false positive rate at that size
+USERNAME_FILTER_CAPACITY = 1024
+USERNAME_FILTER_ERROR_RATE = 0.01
+# quotas created with a new database as (table, owner, maximum rows), see the quotas table
+DEFAULT_QUOTAS = (('accounts', '', 10), ('jobs', '', 5))
+# tables transferred by bulk import/export, in an order where referenced rows are imported first
+TRANSFER_TABLES = ('accounts', 'account_settings', 'friends', 'experiences', 'jobs')
+# bulk import/export file formats
+TRANSFER_FORMATS = ('csv', 'jsonl')
+# number of rows inserted per transaction by a bulk import
+IMPORT_CHUNK_SIZE = 5000
+# an account password as stored, the SHA-256 hex digest made by System.encryption
+PASSWORD_DIGEST = re.compile(r'[0-9a-f]{64}')
+# message describing the user's relation with another user, by System.friendStatus
+FRIEND_STATUS_MESSAGES = {
+  'sent': "You Have Sent a Friend Request to This User.",
+  'received': "You Have Received a Friend Request From This User.",
+  'accepted': "You Are Friends With This User.",
+  None: "You Are Not Friends With This User.",
+}
+# the profile document of each account, its profile flag, education, headline, about and experiences in one JSON array.
+# experiences are in the order they were added, see System.queryProfile
+PROFILE_DOCUMENT = """
+  SELECT username, json_array(profile, university, major, yearsAttended, title, infoAbout, json((
+    SELECT json_group_array(json_array(expID, title, employer, dateStarted, dateEnded, location, description)) FROM (
+      SELECT * FROM experiences WHERE experiences.username = accounts.username ORDER BY expID))))
+  FROM accounts"""
+# number of times each profile is loaded by System.benchmarkProfileLoads
+PROFILE_BENCHMARK_REPEAT = 20
+# tables whose changes are written to the change journal, and the columns holding the keys cached from them
+JOURNALED_TABLES = {
+  'accounts': ('username',),
+  'account_settings': ('username',),
+  'friends': ('sender', 'receiver'),
+  'experiences': ('username',),
+  'jobs': ('jobID',),
+}
+# number of most recent changes kept in the change journal, a connection further behind clears its caches
+CHANGE_JOURNAL_SIZE = 10000
+# number of times a write is attempted while the database is busy, and the delay before the first retry in seconds,
+# the delay doubles after each busy attempt up to WRITE_MAX_DELAY
+WRITE_ATTEMPTS = 5
+WRITE_BASE_DELAY = 0.05
+WRITE_MAX_DELAY = 1
+# number of seconds SQLite waits for a lock before reporting the database busy. Reads (which aren't retried) wait READ_TIMEOUT,
+# writes run by the WriteCoordinator wait BUSY_TIMEOUT so waiting for the write lock is done by its backoff between attempts
+READ_TIMEOUT = 5
+BUSY_TIMEOUT = 0.1
+# database used when the System is not given one
+DEFAULT_DATABASE = "accounts.db"
+# number of database pages copied per step of an online backup, the database is unlocked between steps
+BACKUP_PAGES = 256
+# number of seconds an online backup waits between steps so other connections can write
+BACKUP_SLEEP = 0.005
+# number of seconds a login session can be resumed for
+SESSION_TTL = 30 * 60
+# minimum number of seconds between removals of expired sessions
+SESSION_REAP_INTERVAL = 60
+# login attempts allowed in a burst and attempts regained per second, for each username and each origin of attempts
+LOGIN_USER_BURST = 5
+LOGIN_USER_RATE = 1 / 12
+LOGIN_ORIGIN_BURST = 20
+LOGIN_ORIGIN_RATE = 1
+# maximum number of login buckets held in memory, the least recently used buckets are evicted beyond this
+LOGIN_BUCKETS = 4096
+# origin of login attempts made by this process, a remote front end passes its client's address
+DEFAULT_ORIGIN = "local"
+# maximum number of seconds a settings change is kept in memory before it is written
+SETTINGS_FLUSH_INTERVAL = 5
+# number of flushes in a row that may fail before the unsaved setting changes are discarded
+SETTINGS_FLUSH_ATTEMPTS = 3
+# maximum number of job postings recommended to a user
+RECOMMENDED_JOBS = 50
+# common words that say nothing about a job or a candidate, ignored when matching
+STOP_WORDS = frozenset(('a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'i', 'in', 'is', 'it', 'my',
+                        'of', 'on', 'or', 'our', 'the', 'to', 'we', 'with', 'you', 'your'))
+# a selection starting with the prefix is a route typed into the command palette (ex. /profile/edit/exp/3/location)
+ROUTE_PREFIX = "/"
 
 
 class Jobs:
-    def __init__(self, title, employer, location, salary, posterFirstName, posterLastName, description=None):
+    def __init__(self, title, employer, location, salary, posterFirstName, posterLastName, description=None, ID=None, poster=None, created=None):
+        self.ID = ID # jobID of the posting in the jobs table, None if the job has not been saved
+        self.poster = poster # username of the user that posted the job
+        self.created = created # time the posting was created
         self.title = title
         self.description = description
         self.employer = employer
@@ -19,7 +117,35 @@ class Jobs:
         self.salary = salary
         self.posterFirstName = posterFirstName
         self.posterLastName = posterLastName
+
+    def details(self):
+        """Returns the job posting's details as a string."""
+        return (f"{self.title}\n\n"
+                f"Employer: {self.employer}\n"
+                f"Location: {self.location}\n"
+                f"Salary: {self.salary}\n"
+                f"Description: {self.description if self.description else 'N/A'}\n"
+                f"Posted By: {f'{self.posterFirstName} {self.posterLastName}' if self.posterFirstName else 'N/A'}")
   
+class MenuEntry(namedtuple('MenuEntry', 'label labelArgs action args visible')):
+    """
+    A selection of a compiled menu. The action, dynamic label and visibility check are names of methods of the menu's owner,
+    so one entry serves every system. labelArgs is None if the label is static text, otherwise the label is the name
+    of the method returning it, called with labelArgs. visible is None if the selection is always shown.
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key):
+      # entries can also be read like the selection dictionaries added by Menu.addItem (ex. entry['label'])
+      if isinstance(key, str):
+        return getattr(self, key)
+      return tuple.__getitem__(self, key)
+
+
+# a menu definition compiled from MENU_SPEC, shared by the menus of every system
+CompiledMenu = namedtuple('CompiledMenu', 'opening exitStatement entries backgroundActions')
+
+
 class Menu:
   ## Constructor
   ## Hold Menu Items Internally
@@ -29,6 +155,8 @@ class Menu:
       self.selections = []  # full list of selections(label, action, visibiliity) for the menu
       self.currSelections = [] # dyanmic list of menu selections that is updated every iteration of the menu
       self.backgroundActions = [] # a list of functions that will be called each iteration before displaying the menu
+      self.displayActions = [] # background actions only run when the menu is displayed, not when a selection was typed ahead
+      self.owner = None # system the menu belongs to, whose methods the entries of a compiled menu name
 
   
     #destructor
@@ -47,18 +175,56 @@ class Menu:
     ## Set Each Menu Item for the menu
     ## addItem function simply takes in menu option name and then function name
     def addItem(self, item, func, vis = lambda: True):
+        if isinstance(self.selections, tuple):  # the entries of a compiled menu are shared, copy them first
+            self.selections = list(self.selections)
         self.selections.append({'label': item, 'action': func, 'visible': vis})
 
+    def load(self, compiled, owner):
+      """
+      Sets up the menu from a compiled menu definition. The definition's entries are shared, not copied.
+
+      Args:
+        compiled (CompiledMenu): The menu's definition from MENU_TABLE.
+        owner (object): The object whose methods the definition names, usually the system.
+      """
+      self.owner = owner
+      if compiled.opening is not None:
+        self.opening = self.bind(compiled.opening)
+      if compiled.exitStatement is not None:
+        self.exitStatement = compiled.exitStatement
+      self.selections = compiled.entries
+      for name, onDisplay in compiled.backgroundActions:
+        self.addBackgroundAction(getattr(owner, name), onDisplay)
 
-    def addBackgroundAction(self,func):
-      self.backgroundActions.append(func)
+    def bind(self, value):
+      """Returns the text, or a function calling the owner's method if the value is a (method name, *args) tuple."""
+      if isinstance(value, tuple):
+        name, *args = value
+        return lambda: getattr(self.owner, name)(*args)
+      return value
+
+
+    def addBackgroundAction(self,func, onDisplay=False):
+      """
+      Adds a function called each iteration before the menu is displayed.
+
+      Args:
+        func (function): The background action.
+        onDisplay (bool): True if the action only needs to run when the menu is displayed (ex. it sets the opening statement
+          or does periodic upkeep), such actions are skipped when the menu's selection was typed ahead.
+      """
+      if onDisplay:
+        self.displayActions.append(func)
+      else:
+        self.backgroundActions.append(func)
 
     def hasBackgroundActions(self):
       """Returns a value equal to True if the menu has at least one background action and a value equal to False otherwise."""
-      return len(self.backgroundActions)
+      return len(self.backgroundActions) + len(self.displayActions)
 
     def clearBackgroundActions(self):
       self.backgroundActions = []
+      self.displayActions = []
   
     def setOpening(self,opening):
       self.opening = opening
@@ -87,61 +253,971 @@ class Menu:
       Generates a list of valid selections for the menu based on 
       the current visibility of each selection in the menu's full list of selections
       """
-      return [sel for sel in self.selections if sel['visible']()]
+      return [sel for sel in self.selections if self.isVisible(sel)]
+
+    def isVisible(self, sel):
+      if isinstance(sel, MenuEntry):
+        return sel.visible is None or getattr(self.owner, sel.visible)()
+      return sel['visible']()
+
+    def selectionLabel(self, sel):
+      if isinstance(sel, MenuEntry):
+        if sel.labelArgs is None:  # static labels are precomputed
+          return sel.label
+        return getattr(self.owner, sel.label)(*sel.labelArgs)
+      label = sel['label']
+      if callable(label):  # allow functions to be used as dynamic labels
+        label = label()
+      return label
+
+    def dispatch(self, sel):
+      """Runs the selection's action and returns its result, which may be the next selection."""
+      if isinstance(sel, MenuEntry):
+        return getattr(self.owner, sel.action)(*sel.args)
+      return sel['action']()
   
     ## Displays Each Set Menu Item; System Class performs the action
     ## Display List
     def displaySelections(self):
         print(f"{self.getOpening()}\n")
         for idx, sel in enumerate(self.currSelections, start=1):
-          label = sel['label']
-          if callable(label):  # allow functions to be used as dynamic labels
-            label = label()
-          print(f"[{idx}] {label}")
+          print(f"[{idx}] {self.selectionLabel(sel)}")
         print(f"[0] {self.exitStatement}")
 
   
     # Function to take in number as selection
-    def selectOption(self):
+    # a line of several numbers (ex. "3 3 1 1") selects the first and types the rest ahead into the queue
+    def selectOption(self, queue=None):
         while True:
             try:
-                choice = int(input("\nEnter the number of your selection: "))
-                if choice < 0 or choice > len(self.currSelections):
+                tokens = input("\nEnter the number of your selection: ").replace(',', ' ').split()
+                if not tokens or (len(tokens) > 1 and queue is None):
                     raise ValueError()
+                choice = self.validOption(tokens[0])
+                if queue is not None:
+                    queue.extend(tokens[1:])
                 return choice
             except ValueError:
                 print("Invalid selection. Please try again.")
 
+    def validOption(self, token):
+        """
+        Returns the selection number of the token, or the token itself if it is a route and the menu has an owner to open it.
+        Raises ValueError if it is neither.
+        """
+        if token.startswith(ROUTE_PREFIX) and self.owner is not None:
+            return token
+        choice = int(token)
+        if choice < 0 or choice > len(self.currSelections):
+            raise ValueError()
+        return choice
+
+    def queuedOption(self, queue):
+        """
+        Takes the next typed ahead selection from the queue. Returns None and discards the rest of the queue
+        if the selection is not valid for the menu, so the menu is displayed instead.
+        """
+        try:
+            return self.validOption(queue.popleft())
+        except ValueError:
+            queue.clear()
+            print("Invalid selection. Please try again.")
+            return None
+
   
-    def start(self):
-    #Main menu loop
-      selection = None
-      while True:
-        # run any tasks that need to be performed before displaying the menu
-        for action in self.backgroundActions:
-          action()
-        self.currSelections = self.getValidSelections()
-        if selection is None:  # skip displaying menu & prompting user if previous selection set new selection
-          #Displays selections and stores what the user chooses
-          self.displaySelections()
-          selection = self.selectOption()
-        
+    def start(self, onExit=None):
+      """
+      Opens the menu. If no menu is open the menu is run until the user exits it and every menu opened from it is closed,
+      otherwise the menu is pushed onto the running navigator and is shown once the current action returns.
+
+      Args:
+        onExit (function): Called after the user exits the menu, for cleanup that must wait until the menu is closed.
+      """
+      if Navigator.current is not None:
+        Navigator.current.push(self, onExit)
+        return
+      Navigator.current = Navigator()
+      try:
+        Navigator.current.push(self, onExit)
+        Navigator.current.run()
+      finally:
+        Navigator.current = None
+
+
+class Navigator:
+    """
+    Runs the open menus from an explicit stack instead of nesting a call of Menu.start for each menu,
+    so the Python call stack and the memory held by each step stay the same however deep or long a session is.
+    Each open menu is a frame of [menu, pending selection, onExit]. A menu action that opens another menu
+    pushes it and returns, and the selection it returns is kept in its frame until the menu above it is closed.
+    Selections typed ahead are queued and taken by the following menus without displaying them.
+    """
+    current = None  # the navigator of the menus being run, None when no menu is open
+
+    def __init__(self):
+      self.stack = []
+      self.queue = deque()  # selections typed ahead, taken by the next menus instead of prompting
+
+    def push(self, menu, onExit=None):
+      self.stack.append([menu, None, onExit])
+
+    def depth(self):
+      return len(self.stack)
+
+    def run(self):
+      """Runs the menu on top of the stack one step at a time until every menu is closed."""
+      while self.stack:
+        frame = self.stack[-1]
+        menu, selection = frame[0], frame[1]
+        frame[1] = None
+        try:
+          if menu.owner is not None:  # bring the owner's caches in step with other processes sharing the database
+            menu.owner.syncCaches()
+            menu.owner.flushSettingsIfDue()  # write the owner's setting changes once due, whichever menu is open
+          # run any tasks that need to be performed before displaying the menu
+          for action in menu.backgroundActions:
+            action()
+          menu.currSelections = menu.getValidSelections()
+          if selection is None and self.queue:  # the selection was typed ahead, the menu is not displayed
+            selection = menu.queuedOption(self.queue)
+          if selection is None:  # skip displaying menu & prompting user if previous selection set new selection
+            for action in menu.displayActions:
+              action()
+            #Displays selections and stores what the user chooses
+            menu.displaySelections()
+            selection = menu.selectOption(self.queue)
+        except DatabaseBusyError:  # the menu's write was rolled back, the user is returned to the previous menu
+          self.close(frame)
+          print(MSG_ERR_RETRY)
+          continue
+
         if selection == 0:
           print("Exiting")
-          self.clear()
-          break
-        elif callable(selection):  # the previous selection returned another function
-          selection = selection()
+          self.close(frame)
         else:
-          self.clear()
-          selection = self.currSelections[selection - 1]
-          selection = selection['action']() # current function may return a new selection
+          try:
+            if callable(selection):  # the previous selection returned another function
+              frame[1] = selection()
+            elif isinstance(selection, str):  # a route typed into the command palette
+              frame[1] = menu.owner.goTo(selection)
+            else:
+              menu.clear()
+              selection = menu.currSelections[selection - 1]
+              frame[1] = menu.dispatch(selection) # current function may return a new selection
+          except DatabaseBusyError:  # the action's write was rolled back, the user stays on the menu
+            print(MSG_ERR_RETRY)
+
+    def close(self, frame):
+      """Closes the menu on top of the stack and runs its onExit, a busy write of onExit still closes the menu."""
+      frame[0].clear()
+      self.stack.pop()
+      if frame[2] is not None:
+        try:
+          frame[2]()
+        except DatabaseBusyError:
+          print(MSG_ERR_RETRY)
+
+HOME_OPENING = """
+    Welcome To The InCollege Home Page!
+      
+    The Place Where Students Take The Next Big Step.
+
+    "I Had To Battle With Anxiety Every Day Until I Signed Up For InCollege.
+    Now, My Future Is On The Right Track And Im Able To Apply My Education To My Dream Career.
+    Finding A Place In My Field Of Study Was A Breeze"
+    - InCollege User
+
+    """
+
+PRIVACY_POLICY = """
+------------------------
+   PRIVACY POLICY
+------------------------
+
+At InCollege, we value your privacy and are committed to protecting your personal information. Here's a summary of our privacy practices:
+
+1. Information Collection:
+   We collect limited personal information when you register and interact with our platform.
+
+2. Data Usage:
+   We use your information to personalize your experience, deliver relevant content, and improve our services. We employ industry-standard security measures to protect your information from unauthorized access.
+
+3. Cookies and Tracking:
+   We may use cookies to enhance your browsing experience.
+------------------------
+      """
+
+
+def experienceMenu(number):
+    """Returns the definition of the menu editing the user's experience with the number."""
+    fields = (('Title', 'edit_exp_title', 'title'), ('Employer', 'edit_exp_employer', 'employer'),
+              ('Start Date', 'edit_exp_startDate', 'start'), ('End Date', 'edit_exp_endDate', 'end'),
+              ('Location', 'edit_exp_location', 'location'), ('Description', 'edit_exp_description', 'description'))
+    return {
+      'opening': "Share Your Experience: ",
+      'items': tuple((label, (action, f'{section}{number}')) for label, action, section in fields),
+      'background': (('loadUserProfile', False),),
+    }
+
+
+# Definitions of the system's static menus, keyed by the name of the system's menu attribute.
+# A definition may hold an opening, exit statement, items and background actions (method name, onDisplay).
+# An item is (label, action) or (label, action, visibility check). Labels, actions and openings are either
+# text/method names or (method name, *args) tuples, and visibility checks are method names of the system.
+MENU_SPEC = {
+  'homePage': {
+    'opening': HOME_OPENING,
+    'items': (("Login", 'login'), ("Register", 'register'), ("Find People I Know", 'findUser'),
+              ("See Our Success Video", 'video_menu'), ('Useful Links', 'useful_links'),
+              ('InCollege Important Links', 'important_links')),
+    'background': (('reapSessions', True),),
+  },
+  'videoMenu': {
+    'opening': "See Our Success Story:\n(Playing Video)\n",
+  },
+  'mainMenu': {
+    'exit': "Log Out",
+    'items': (('Profile', 'user_profile_menu'), ('Job/Internship Search', 'jobs_menu'), ('Friends', 'friend_menu'),
+              ('Learn A Skill', 'skills_menu'), ('Useful Links', 'useful_links'),
+              ('InCollege Important Links', 'important_links')),
+    'background': (('show_pending_message', True),),
+  },
+  'friendMenu': {
+    'opening': "Welcome To The Friends Page",
+    'exit': "Return To Main Menu",
+    'items': (("Find A Friend", 'find_a_friend_menu'), ("Show My Network", 'network_menu'),
+              (('pendingRequestsLabel',), 'received_friends_menu')),
+    'background': (('countReceivedRequests', False),),
+  },
+  'networkMenu': {
+    'background': (('show_network', False),),
+  },
+  'skillsMenu': {
+    'opening': "Please Select a Skill:",
+    'exit': "Return To Main Menu",
+    'items': (('Project Management', 'skillA'), ('Networking', 'skillB'), ('System Design', 'skillC'),
+              ('Coding', 'skillD'), ('Professional Communication', 'skillE')),
+  },
+  'joinMenu': {
+    'items': (('Login', 'login'), ('Register', 'register')),
+  },
+  'jobsMenu': {
+    'opening': "Welcome to the Job Postings Page",
+    'exit': "Return To Main Menu",
+    'items': (('Post Job', 'postJob'), ('Browse Jobs', 'browseJobs'), ('Search Jobs', 'promptJobSearch'),
+              ('Recommended Jobs', 'recommendJobs')),
+  },
+  'importantLinks': {
+    'opening': "Welcome to the Important Links Page",
+    'exit': "Return To Home Page",
+    'items': (('Copyright Notice', ('content_menu', "Copyright Notice")), ('About', ('content_menu', "About")),
+              ('Accessibility', ('content_menu', "Accessibility")),
+              ('User Agreement', ('content_menu', "User Agreement")), ('Privacy Policy', 'privacy_menu'),
+              ('Cookie Policy', ('content_menu', "Cookie Policy")), ('Brand Policy', ('content_menu', "Brand Policy")),
+              ('Languages', 'language_menu', 'isLoggedOn')),
+  },
+  'guestControls': {
+    'opening': "Guest Controls:\n",
+    'exit': "Back",
+    'items': ((('settingLabel', 'email', "Email"), 'setUserEmail'), (('settingLabel', 'sms', "SMS"), 'setUserSMS'),
+              (('settingLabel', 'targetedAds', "Targeted Advertising"), 'setUserTargetedAds')),
+  },
+  'languageMenu': {
+    'opening': "Languages:",
+    'exit': "Back",
+    'items': tuple((('languageLabel', language), ('setUserLanguage', language)) for language in LANGUAGES),
+  },
+  'privacyMenu': {
+    'opening': PRIVACY_POLICY,
+    'items': (('Guest Controls', 'guest_controls', 'isLoggedOn'),),
+  },
+  'usefulLinks': {
+    'opening': "Welcome to the Useful Links Page",
+    'items': (('General', 'general_menu'), ('Browse InCollege', ('quick_menu', "Under Construction")),
+              ('Business Solutions', ('quick_menu', "Under Construction")),
+              ('Directories', ('quick_menu', "Under Construction"))),
+  },
+  'generalMenu': {
+    'opening': 'General Links',
+    'items': (('Sign Up', ('join_menu', "Sign Up:", "Back"), 'isLoggedOff'),  # disappears when the user logs in
+              ('Help Center', ('content_menu', "Help Center")), ('About', ('content_menu', "General About")),
+              ('Press', ('content_menu', "Press")), ('Blog', ('quick_menu', "Under Construction")),
+              ('Careers', ('quick_menu', "Under Construction")), ('Developers', ('quick_menu', "Under Construction"))),
+  },
+  'findAFriend': {
+    'opening': 'Search For InCollege Users By:',
+    'items': (('Last Name', ('searchUserByField', 'lName')), ('University', ('searchUserByField', 'university')),
+              ('Major', ('searchUserByField', 'major'))),
+  },
+  'userProfileMenu': {
+    'opening': "Welcome to the Profile Menu",
+    'exit': "Return to Main Menu",
+    'items': ((('profileLabel',), 'edit_profile_menu'), ("View Profile", 'view_user_profile', 'userHasProfile')),
+    'background': (('check_user_profile', False),),
+  },
+  'viewUserProfile': {
+    'opening': ('profileText', "full"),
+    'background': (('loadUserProfile', False),),
+  },
+  'editProfileMenu': {
+    'opening': "Choose A Section To Edit:",
+    'items': (("Title", ('edit_section', "head")), ("About", ('edit_section', "about")), ("Education", 'education_menu'),
+              ("Experience 1", 'experience1_menu'), ("Experience 2", 'experience2_menu'),
+              ("Experience 3", 'experience3_menu')),
+    'background': (('loadUserProfile', False),),
+  },
+  'educationMenu': {
+    'opening': "Choose A Section To Edit:",
+    'items': (("University", ('edit_section', "uni")), ("Degree", ('edit_section', "deg")),
+              ("Years Attended", ('edit_section', "years"))),
+    'background': (('loadUserProfile', False),),
+  },
+  'experience1Menu': experienceMenu(1),
+  'experience2Menu': experienceMenu(2),
+  'experience3Menu': experienceMenu(3),
+}
+
+
+def compileMenus(spec):
+    """
+    Compiles menu definitions into an immutable table of CompiledMenu tuples keyed by menu name.
+    Labels, actions and visibility checks are resolved into MenuEntry tuples once, static labels are kept as text.
+    """
+    def entry(item):
+      label, action, visible = item if len(item) == 3 else (*item, None)
+      labelArgs = None
+      if isinstance(label, tuple):  # dynamic label
+        label, *labelArgs = label
+        labelArgs = tuple(labelArgs)
+      action, *args = action if isinstance(action, tuple) else (action,)
+      return MenuEntry(label, labelArgs, action, tuple(args), visible)
+    return MappingProxyType({
+      name: CompiledMenu(menu.get('opening'), menu.get('exit'), tuple(entry(item) for item in menu.get('items', ())),
+                         tuple(menu.get('background', ())))
+      for name, menu in spec.items()
+    })
+
+
+MENU_TABLE = compileMenus(MENU_SPEC)
+
+# a route compiled from ROUTE_SPEC, the menu holding the route's item, the item and the name of the system's access check
+CompiledRoute = namedtuple('CompiledRoute', 'menu entry access')
+
+
+def experienceRoutes(number):
+    """Returns the routes of the menu editing the user's experience with the number and of its items."""
+    menu = f'experience{number}Menu'
+    routes = {f'profile/edit/exp/{number}': ('editProfileMenu', f'experience{number}_menu', 'isLoggedOn')}
+    for item in MENU_SPEC[menu]['items']:
+      _, section = item[1]
+      routes[f'profile/edit/exp/{number}/{section[:-1]}'] = (menu, item[1], 'isLoggedOn')
+    return routes
+
+
+# Paths of the routes opened from the command palette and main.py --route (ex. profile/edit/exp/3/location).
+# A route is (menu, action, access): the name of a menu of MENU_SPEC, the action of one of its items, written as in
+# the menu's items, and the name of a visibility check of the system for routes into menus shown only to members or guests.
+# A route opens its item the way the menu does, with the menu's background actions and the item's visibility check.
+ROUTE_SPEC = {
+  'login': ('homePage', 'login', 'isLoggedOff'),
+  'register': ('homePage', 'register', 'isLoggedOff'),
+  'find-people': ('homePage', 'findUser', 'isLoggedOff'),
+  'video': ('homePage', 'video_menu', None),
+  'links/useful': ('homePage', 'useful_links', None),
+  'links/useful/general': ('usefulLinks', 'general_menu', None),
+  'links/useful/general/sign-up': ('generalMenu', ('join_menu', "Sign Up:", "Back"), None),
+  'links/important': ('homePage', 'important_links', None),
+  'links/important/privacy': ('importantLinks', 'privacy_menu', None),
+  'links/important/privacy/guest-controls': ('privacyMenu', 'guest_controls', None),
+  'links/important/languages': ('importantLinks', 'language_menu', None),
+
+  'profile': ('mainMenu', 'user_profile_menu', 'isLoggedOn'),
+  'profile/view': ('userProfileMenu', 'view_user_profile', 'isLoggedOn'),
+  'profile/edit': ('userProfileMenu', 'edit_profile_menu', 'isLoggedOn'),
+  'profile/edit/title': ('editProfileMenu', ('edit_section', "head"), 'isLoggedOn'),
+  'profile/edit/about': ('editProfileMenu', ('edit_section', "about"), 'isLoggedOn'),
+  'profile/edit/edu': ('editProfileMenu', 'education_menu', 'isLoggedOn'),
+  'profile/edit/edu/uni': ('educationMenu', ('edit_section', "uni"), 'isLoggedOn'),
+  'profile/edit/edu/degree': ('educationMenu', ('edit_section', "deg"), 'isLoggedOn'),
+  'profile/edit/edu/years': ('educationMenu', ('edit_section', "years"), 'isLoggedOn'),
+  **experienceRoutes(1),
+  **experienceRoutes(2),
+  **experienceRoutes(3),
+
+  'jobs': ('mainMenu', 'jobs_menu', 'isLoggedOn'),
+  'jobs/post': ('jobsMenu', 'postJob', 'isLoggedOn'),
+  'jobs/browse': ('jobsMenu', 'browseJobs', 'isLoggedOn'),
+  'jobs/search': ('jobsMenu', 'promptJobSearch', 'isLoggedOn'),
+  'jobs/recommended': ('jobsMenu', 'recommendJobs', 'isLoggedOn'),
+
+  'friends': ('mainMenu', 'friend_menu', 'isLoggedOn'),
+  'friends/find': ('friendMenu', 'find_a_friend_menu', 'isLoggedOn'),
+  'friends/network': ('friendMenu', 'network_menu', 'isLoggedOn'),
+  'friends/pending': ('friendMenu', 'received_friends_menu', 'isLoggedOn'),
+
+  'skills': ('mainMenu', 'skills_menu', 'isLoggedOn'),
+  'skills/project-management': ('skillsMenu', 'skillA', 'isLoggedOn'),
+  'skills/networking': ('skillsMenu', 'skillB', 'isLoggedOn'),
+  'skills/system-design': ('skillsMenu', 'skillC', 'isLoggedOn'),
+  'skills/coding': ('skillsMenu', 'skillD', 'isLoggedOn'),
+  'skills/communication': ('skillsMenu', 'skillE', 'isLoggedOn'),
+}
+
+
+def compileRoutes(spec, table):
+    """
+    Compiles route definitions into an immutable table of CompiledRoute tuples keyed by path, resolving each route's action
+    to the MenuEntry of its menu in the compiled menu table. Raises ValueError if a route names an item its menu doesn't have,
+    so a renamed menu item can't leave a route behind.
+    """
+    routes = {}
+    for path, (menu, action, access) in spec.items():
+      action, *args = action if isinstance(action, tuple) else (action,)
+      entries = [entry for entry in table[menu].entries if entry.action == action and entry.args == tuple(args)]
+      if not entries:
+        raise ValueError(f"Route {path} names no item of the {menu} menu")
+      routes[path] = CompiledRoute(menu, entries[0], access)
+    return MappingProxyType(routes)
+
+
+ROUTE_TABLE = compileRoutes(ROUTE_SPEC, MENU_TABLE)
+
+
+class Pager:
+    """
+    Keyset (cursor based) paginator for menus that display large result sets.
+    Only the rows of the visible page are fetched from the database,
+    so memory and latency stay bounded no matter how many rows match.
+
+    Args:
+      fetch (function): Called as fetch(afterKey, limit), returns up to limit results ordered by key.
+        afterKey is None when the first page is requested.
+      key (function): Returns the unique sort key of a result. The default is the result's username.
+      pageSize (int): The maximum number of results displayed per page.
+    """
+    def __init__(self, fetch, key=lambda result: result.userName, pageSize=PAGE_SIZE):
+      self.fetch = fetch
+      self.key = key
+      self.pageSize = pageSize
+      self.reset()
+
+    def reset(self):
+      """Returns the pager to the first page."""
+      self.starts = [None]  # keyset cursor of each page visited so far, the last one is the current page
+      self.results = []
+      self.more = False
+      self.stale = True
+
+    def refresh(self):
+      """Marks the current page to be fetched again the next time it is requested."""
+      self.stale = True
+
+    def page(self):
+      """Returns the results of the current page."""
+      if self.stale:
+        # fetch one extra result to find out if there is a next page
+        results = self.fetch(self.starts[-1], self.pageSize + 1)
+        self.more = len(results) > self.pageSize
+        self.results = results[:self.pageSize]
+        self.stale = False
+        # the current page may have emptied since it was last fetched (ex. last request on the page was accepted)
+        if not self.results and self.hasPrev():
+          self.prev()
+          return self.page()
+      return self.results
+
+    def pageNumber(self):
+      return len(self.starts)
+
+    def hasNext(self):
+      return self.more
+
+    def hasPrev(self):
+      return len(self.starts) > 1
 
+    def next(self):
+      """Moves to the page after the current page."""
+      if self.hasNext():
+        self.starts.append(self.key(self.results[-1]))
+        self.stale = True
+
+    def prev(self):
+      """Moves to the page before the current page."""
+      if self.hasPrev():
+        self.starts.pop()
+        self.stale = True
+
+
+class LRUCache:
+    """
+    Bounded least recently used cache with a time to live for each entry.
+    Keeps hit, miss and eviction counts so the cache's effectiveness can be monitored.
+
+    Args:
+      maxSize (int): The maximum number of entries, the least recently used entry is evicted beyond this size.
+      ttl (float): Number of seconds an entry is valid for after it is stored.
+    """
+    def __init__(self, maxSize, ttl):
+      self.maxSize = maxSize
+      self.ttl = ttl
+      self.entries = OrderedDict()  # key: cache key, value: (expiry time, value)
+      self.hits = 0
+      self.misses = 0
+      self.evictions = 0
+
+    def get(self, key, default=None):
+      """Returns the value cached for the key, or the default if the key is missing or expired."""
+      entry = self.entries.get(key)
+      if entry is not None:
+        if entry[0] > time.monotonic():
+          self.entries.move_to_end(key)
+          self.hits += 1
+          return entry[1]
+        del self.entries[key]
+      self.misses += 1
+      return default
+
+    def put(self, key, value):
+      """Caches the value for the key, evicting the least recently used entry if the cache is full."""
+      self.entries[key] = (time.monotonic() + self.ttl, value)
+      self.entries.move_to_end(key)
+      while len(self.entries) > self.maxSize:
+        self.entries.popitem(last=False)
+        self.evictions += 1
+
+    def patch(self, key, update):
+      """Replaces a cached value with update(value) without changing its expiry, does nothing if the key is not cached."""
+      entry = self.entries.get(key)
+      if entry is not None:
+        self.entries[key] = (entry[0], update(entry[1]))
+
+    def invalidate(self, key):
+      """Removes the key from the cache."""
+      self.entries.pop(key, None)
+
+    def clear(self):
+      self.entries.clear()
+
+    def __len__(self):
+      return len(self.entries)
+
+    def stats(self):
+      """Returns the cache's size and hit/miss statistics as a dictionary."""
+      lookups = self.hits + self.misses
+      return {'size': len(self.entries),
+              'maxSize': self.maxSize,
+              'hits': self.hits,
+              'misses': self.misses,
+              'evictions': self.evictions,
+              'hitRate': self.hits / lookups if lookups else 0.0}
+
+
+class TokenBucketLimiter:
+    """
+    Rate limiter keeping a token bucket for each key. Each allowed attempt takes a token from its bucket,
+    and buckets regain tokens at a fixed rate up to their capacity, so short bursts are allowed while
+    sustained attempts are slowed to the refill rate. A bucket is stored as a (tokens, time) pair;
+    full buckets are dropped when evicting since they are the same as a missing bucket.
+
+    Args:
+      capacity (float): The number of tokens in a full bucket, the maximum burst of attempts.
+      rate (float): The number of tokens regained per second.
+      maxKeys (int): The maximum number of buckets held, the least recently used buckets are evicted beyond this.
+      evictInterval (float): The minimum number of seconds between sweeps that drop full buckets.
+    """
+    def __init__(self, capacity, rate, maxKeys=LOGIN_BUCKETS, evictInterval=60):
+      self.capacity = capacity
+      self.rate = rate
+      self.maxKeys = maxKeys
+      self.evictInterval = evictInterval
+      self.buckets = OrderedDict()  # key: bucket key, value: (tokens, time the tokens were counted)
+      self.swept = time.monotonic()
+      self.allowed = 0
+      self.blocked = 0
+      self.evictions = 0
+
+    def tokens(self, key, now):
+      """Returns the number of tokens in the key's bucket at the time now."""
+      bucket = self.buckets.get(key)
+      if bucket is None:
+        return self.capacity
+      return min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+
+    def available(self, key, now=None):
+      """Returns True if an attempt for the key would be allowed, without taking a token."""
+      return self.tokens(key, time.monotonic() if now is None else now) >= 1
+
+    def take(self, key, now=None):
+      """Takes a token from the key's bucket, returns True if the attempt is allowed and False if it is blocked."""
+      now = time.monotonic() if now is None else now
+      tokens = self.tokens(key, now)
+      if tokens < 1:
+        self.blocked += 1
+        return False
+      self.buckets[key] = (tokens - 1, now)
+      self.buckets.move_to_end(key)
+      self.allowed += 1
+      self.evict(now)
+      return True
+
+    def evict(self, now):
+      """Drops full buckets once every evictInterval seconds, and the least recently used buckets beyond maxKeys."""
+      if now - self.swept >= self.evictInterval:
+        self.swept = now
+        full = [key for key in self.buckets if self.tokens(key, now) >= self.capacity]
+        for key in full:
+          del self.buckets[key]
+      while len(self.buckets) > self.maxKeys:
+        self.buckets.popitem(last=False)
+        self.evictions += 1
+
+    def __len__(self):
+      return len(self.buckets)
+
+    def stats(self):
+      """Returns the limiter's size and allowed/blocked counts as a dictionary."""
+      return {'size': len(self.buckets),
+              'maxKeys': self.maxKeys,
+              'allowed': self.allowed,
+              'blocked': self.blocked,
+              'evictions': self.evictions}
+
+
+class BloomFilter:
+    """
+    Bloom filter answering whether an item was added in constant time, using a few bits per item.
+    An item never added is reported as absent except at the filter's error rate, an added item is always reported as present.
+    Items can't be removed, so the filter is rebuilt once it holds more items than its capacity.
+
+    Args:
+      capacity (int): The number of items the filter is sized for.
+      errorRate (float): The rate of false positives once the filter holds capacity items.
+    """
+    def __init__(self, capacity, errorRate=USERNAME_FILTER_ERROR_RATE):
+      self.capacity = max(1, capacity)
+      self.errorRate = errorRate
+      self.size = math.ceil(-self.capacity * math.log(errorRate) / math.log(2) ** 2)  # number of bits
+      self.hashes = max(1, round(self.size / self.capacity * math.log(2)))  # number of bits set by each item
+      self.bits = bytearray((self.size + 7) // 8)
+      self.count = 0
+
+    def positions(self, item):
+      """Returns the bits of the item, by double hashing the two halves of one digest."""
+      digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+      first = int.from_bytes(digest[:8], 'little')
+      second = int.from_bytes(digest[8:], 'little') | 1
+      return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+      for position in self.positions(item):
+        self.bits[position >> 3] |= 1 << (position & 7)
+      self.count += 1
+
+    def __contains__(self, item):
+      return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(item))
+
+    def __len__(self):
+      return self.count
+
+    def full(self):
+      """Returns True once the filter holds capacity items, past this the false positive rate exceeds errorRate."""
+      return self.count >= self.capacity
+
+
+class DatabaseBusyError(sqlite3.OperationalError):
+    """Raised when a write still finds the database busy or locked after every attempt."""
+
+
+class WriteCoordinator:
+    """
+    Runs a process's writes to a database one at a time, each in its own transaction. A write that finds the database
+    busy or locked (ex. another process is writing) is rolled back and retried after a jittered delay that doubles
+    with each attempt, so concurrent writers back off instead of failing straight away. Writes of every coordinator
+    of the process on the same database wait in one queue. Keeps counts of writes, busy attempts and time waited
+    so contention can be monitored.
+
+    Args:
+      conn (Connection): The connection written to.
+      database (str): The database's file name, coordinators of the same database share a queue.
+      attempts (int): The number of times a write is attempted while the database is busy.
+      baseDelay (float): The number of seconds waited before the first retry.
+      maxDelay (float): The maximum number of seconds waited before a retry.
+      busyTimeout (float): The number of seconds SQLite waits for a lock during a write, instead of the connection's readTimeout.
+      readTimeout (float): The connection's busy timeout outside writes, restored after each write.
+    """
+    queues = {}  # key: database, value: lock held by the write being run
+    queuesLock = threading.Lock()
+
+    def __init__(self, conn, database, attempts=WRITE_ATTEMPTS, baseDelay=WRITE_BASE_DELAY, maxDelay=WRITE_MAX_DELAY,
+                 busyTimeout=BUSY_TIMEOUT, readTimeout=READ_TIMEOUT):
+      self.conn = conn
+      self.attempts = attempts
+      self.baseDelay = baseDelay
+      self.maxDelay = maxDelay
+      self.busyTimeout = busyTimeout
+      self.readTimeout = readTimeout
+      with WriteCoordinator.queuesLock:
+        # private in memory databases can't be shared, so they get a queue of their own
+        key = database if database != ":memory:" else id(self)
+        self.queue = WriteCoordinator.queues.setdefault(key, threading.RLock())
+      self.depth = 0  # number of nested writes being run, nested writes join the outer write's transaction
+      self.writes = 0
+      self.busy = 0
+      self.failures = 0
+      self.waited = 0.0
+
+    @staticmethod
+    def isBusy(error):
+      """Returns True if the error was raised because the database was busy or locked."""
+      code = getattr(error, 'sqlite_errorcode', None)
+      if code is not None:
+        return code & 0xff in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+      return 'locked' in str(error) or 'busy' in str(error)
+
+    def run(self, work, immediate=False):
+      """
+      Runs work() in a write transaction and commits it, returning work's result. Raises DatabaseBusyError if the database 
+      stays busy, any other error is rolled back and raised.
+
+      Args:
+        work (function): Makes the write's changes, it is run again if the database was busy.
+        immediate (bool): True to start the transaction with BEGIN IMMEDIATE, for read-modify-write work whose reads
+          must not be changed by another writer before it writes.
+      """
+      with self.queue:
+        if self.depth:
+          return work()
+        self.depth += 1
+        self.setBusyTimeout(self.busyTimeout)
+        try:
+          for attempt in range(self.attempts):
+            try:
+              if immediate and not self.conn.in_transaction:
+                self.conn.execute("BEGIN IMMEDIATE")
+              result = work()
+              self.conn.commit()
+              self.writes += 1
+              return result
+            except sqlite3.OperationalError as error:
+              self.conn.rollback()
+              if not self.isBusy(error):
+                raise
+              self.busy += 1
+              if attempt + 1 == self.attempts:
+                self.failures += 1
+                raise DatabaseBusyError(str(error)) from error
+              delay = min(self.maxDelay, self.baseDelay * 2 ** attempt) * random.uniform(0.5, 1)
+              self.waited += delay
+              time.sleep(delay)
+            except BaseException:
+              self.conn.rollback()
+              raise
+        finally:
+          self.setBusyTimeout(self.readTimeout)
+          self.depth -= 1
+
+    def setBusyTimeout(self, seconds):
+      """Sets the number of seconds SQLite waits for a lock held by another connection before reporting the database busy."""
+      self.conn.execute(f"PRAGMA busy_timeout = {int(seconds * 1000)}")
+
+    def stats(self):
+      """Returns the coordinator's write and contention statistics as a dictionary."""
+      return {'writes': self.writes,
+              'busy': self.busy,
+              'failures': self.failures,
+              'waited': self.waited}
+
+
+class SettingsService:
+    """
+    Keeps users' account settings in memory, loading each user's settings once per session.
+    Changes are coalesced and written together in one transaction of UPSERTs by flush,
+    so toggling several settings costs one write. A failed flush keeps the changes to be written by the next flush,
+    due once the flush interval has passed again, until attempts flushes in a row have failed and the changes are discarded.
+    Unsaved changes only live in memory, so a crash loses the changes of the last flush interval.
+
+    Args:
+      conn (Connection): The database connection the settings are read from and written to.
+      flushInterval (float): The number of seconds after the first unsaved change that the changes are due to be written.
+      writer (WriteCoordinator): Runs the flushes, a flush is written directly if it is None.
+      attempts (int): The number of flushes in a row that may fail before the unsaved changes are discarded.
+    """
+    FIELDS = ('email', 'sms', 'targetedAds', 'language')
+
+    def __init__(self, conn, flushInterval=SETTINGS_FLUSH_INTERVAL, writer=None, attempts=SETTINGS_FLUSH_ATTEMPTS):
+      self.conn = conn
+      self.flushInterval = flushInterval
+      self.writer = writer
+      self.attempts = attempts
+      self.settings = {}  # key: username, value: dict of the user's settings
+      self.pending = set()  # usernames with changes that have not been written
+      self.dirtySince = None  # time of the oldest unsaved change
+      self.flushes = 0
+      self.failures = 0  # number of flushes in a row that failed
+      self.dropped = 0  # number of users whose unsaved changes were discarded
+
+    def load(self, username):
+      """Returns the user's settings, reading them from the database if they are not loaded. Missing settings have the defaults."""
+      settings = self.settings.get(username)
+      if settings is None:
+        row = self.conn.execute("SELECT email, sms, targetedAds, language FROM account_settings WHERE username = ?", (username,)).fetchone()
+        settings = dict(zip(self.FIELDS, row or (True, True, True, LANGUAGES[0])))
+        self.settings[username] = settings
+      return settings
+
+    def seed(self, username, settings):
+      """Loads the user's settings from a known copy (ex. a resumed session) unless they are already loaded."""
+      if username not in self.settings:
+        self.settings[username] = {field: settings[field] for field in self.FIELDS}
+
+    def set(self, username, field, value):
+      """Changes one of the user's settings in memory, it is written by the next flush."""
+      self.load(username)[field] = value
+      self.pending.add(username)
+      if self.dirtySince is None:
+        self.dirtySince = time.monotonic()
+
+    def due(self):
+      """Returns True if there are unsaved changes older than the flush interval."""
+      return self.dirtySince is not None and time.monotonic() - self.dirtySince >= self.flushInterval
+
+    def flush(self):
+      """
+      Writes every unsaved change in one transaction. Returns False if they could not be written, the changes are kept
+      unless the flush was the last of the attempts, then they are discarded.
+      """
+      if not self.pending:
+        return True
+      upsert = """
+      INSERT INTO account_settings (username, email, sms, targetedAds, language) VALUES (?, ?, ?, ?, ?)
+      ON CONFLICT (username) DO UPDATE SET 
+        email = excluded.email, sms = excluded.sms, targetedAds = excluded.targetedAds, language = excluded.language
+      """
+      rows = [(username, *(self.settings[username][field] for field in self.FIELDS)) for username in self.pending]
+      try:
+        if self.writer is not None:
+          self.writer.run(lambda: self.conn.executemany(upsert, rows))
+        else:
+          with self.conn:
+            self.conn.executemany(upsert, rows)
+      except sqlite3.Error:
+        self.failures += 1
+        if self.failures >= self.attempts:
+          self.discard()
+        else:
+          self.dirtySince = time.monotonic()  # retried once the flush interval has passed again
+        return False
+      self.pending.clear()
+      self.dirtySince = None
+      self.failures = 0
+      self.flushes += 1
+      return True
+
+    def discard(self):
+      """Discards the unsaved changes, unloading the changed users' settings so they are read from the database again."""
+      for username in self.pending:
+        self.settings.pop(username, None)
+      self.dropped += len(self.pending)
+      self.pending.clear()
+      self.dirtySince = None
+      self.failures = 0
+
+    def clear(self):
+      """Unloads every user's settings and discards the unsaved changes, ex. when the database is replaced."""
+      self.settings.clear()
+      self.pending.clear()
+      self.dirtySince = None
+
+    def forget(self, username):
+      """Unloads the user's settings, once their changes have been written."""
+      if username not in self.pending:
+        self.settings.pop(username, None)
+
+
+class JobMatcher:
+    """
+    Matches candidates to job postings with an inverted index from each word to the postings containing it.
+    Postings are weighted by log scaled term frequency normalized by the posting's length, and words are
+    weighted by their inverse document frequency when scoring, so postings can be added and removed
+    incrementally without reweighting the rest of the index. Only the postings sharing a word with the
+    candidate are scored and the best are selected with a heap.
+
+    Args:
+      candidateCacheSize (int): The maximum number of candidates whose profile words are cached.
+    """
+    def __init__(self, candidateCacheSize=PROFILE_CACHE_SIZE):
+      self.index = {}  # key: word, value: dict of jobID to the word's weight in the posting
+      self.postings = {}  # key: jobID, value: words of the posting
+      self.candidates = LRUCache(candidateCacheSize, PROFILE_TTL)  # key: username, value: Counter of profile words
+
+    @staticmethod
+    def tokenize(*fields):
+      """Returns the words of the text fields, lowercased and without stop words."""
+      return [word for field in fields if field
+              for word in re.findall(r"[a-z0-9+#]+", str(field).lower()) if word not in STOP_WORDS]
+
+    def add(self, jobID, *fields):
+      """Indexes a job posting, replacing it if it was already indexed."""
+      self.remove(jobID)
+      counts = Counter(self.tokenize(*fields))
+      weights = {word: 1 + math.log(count) for word, count in counts.items()}
+      length = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+      for word, weight in weights.items():
+        self.index.setdefault(word, {})[jobID] = weight / length
+      self.postings[jobID] = tuple(weights)
+
+    def remove(self, jobID):
+      """Removes a job posting from the index, does nothing if it was not indexed."""
+      for word in self.postings.pop(jobID, ()):
+        jobs = self.index[word]
+        del jobs[jobID]
+        if not jobs:
+          del self.index[word]
+
+    def clear(self):
+      self.index.clear()
+      self.postings.clear()
+
+    def __len__(self):
+      return len(self.postings)
+
+    def idf(self, word):
+      """Returns the inverse document frequency of the word, rarer words weigh more."""
+      return math.log((len(self.postings) + 1) / (len(self.index.get(word, ())) + 1)) + 1
+
+    def recommend(self, words, k=RECOMMENDED_JOBS):
+      """
+      Returns up to k (score, jobID) pairs of the postings that best match the words, best first.
+      Ties are broken in favour of the newer posting.
+
+      Args:
+        words (Counter): The candidate's words and the number of times each occurs.
+        k (int): The maximum number of postings returned.
+      """
+      scores = {}
+      for word, count in words.items():
+        jobs = self.index.get(word)
+        if jobs:
+          weight = (1 + math.log(count)) * self.idf(word) ** 2
+          for jobID, jobWeight in jobs.items():
+            scores[jobID] = scores.get(jobID, 0.0) + weight * jobWeight
+      return heapq.nlargest(k, ((score, jobID) for jobID, score in scores.items()))
 
 
 class System:
-  def __init__(self): #create and connect to db
-    self.conn = sqlite3.connect("accounts.db") #establishes connection to SQLite database called accounts
+  def __init__(self, database=DEFAULT_DATABASE, template=None, origin=DEFAULT_ORIGIN): #create and connect to db
+    """
+    Args:
+      database (str): The database file, ":memory:" for a private in memory database, or a "file:" URI
+        such as "file:name?mode=memory&cache=shared" for an in memory database shared by the systems opening it.
+      template: A database file or connection copied into the database before it is used, see fromTemplate.
+      origin (str): Where the system's login attempts come from, login attempts are throttled for each origin.
+    """
+    self.database = database
+    self.origin = origin
+    self.conn = sqlite3.connect(database, timeout=READ_TIMEOUT, uri=database.startswith("file:")) #establishes connection to the SQLite database
+    if template is not None:
+      self.copyDatabase(template, self.conn)
     self.cursor = self.conn.cursor() #creates cursor object which is later used to execute SQL queries
     self.cursor.execute(
       """
@@ -159,25 +1235,152 @@ class System:
         )
       """
     ) #execute method and cursor object are used to create table if one does not exist
+    #names, universities and majors are compared case insensitively, NOCASE indexes let an exact name be found with a seek
+    #and let the Find A Friend counts scan an index instead of the table, the username makes the indexes covering
+    self.cursor.execute("CREATE INDEX IF NOT EXISTS accounts_name ON accounts (lName COLLATE NOCASE, fName COLLATE NOCASE, username)")
+    self.cursor.execute("PRAGMA table_info(accounts)")
+    account_columns = [column[1] for column in self.cursor.fetchall()]
+    for column in ('university', 'major'):
+      if column in account_columns: # missing from accounts tables created before universities and majors were added
+        self.cursor.execute(f"CREATE INDEX IF NOT EXISTS accounts_{column} ON accounts ({column} COLLATE NOCASE, username)")
     self.conn.commit() #commit method used to save changes
+    # jobs tables created before postings had IDs used the title as the primary key and stored the poster's name,
+    # rename such a table so its postings can be copied into the current jobs table below
+    self.cursor.execute("PRAGMA table_info(jobs)")
+    migrate_jobs = 'posterFirstName' in [column[1] for column in self.cursor.fetchall()]
+    if migrate_jobs:
+      self.cursor.execute("ALTER TABLE jobs RENAME TO jobs_v1")
     # SQL code to create the jobs table if one does not exist
     create_jobs_table = """
     CREATE TABLE IF NOT EXISTS jobs (
-      title VARCHAR(128) PRIMARY KEY,
+      jobID INTEGER PRIMARY KEY,
+      title VARCHAR(128) NOT NULL,
       description TEXT,
       employer VARCHAR(128) NOT NULL,
       location VARCHAR(128) NOT NULL,
       salary INT NOT NULL,
-      posterFirstName VARCHAR(128),
-      posterLastName VARCHAR(128)
+      poster VARCHAR(25),
+      created TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+      FOREIGN KEY(poster) REFERENCES accounts(username) ON DELETE CASCADE
     );
     """
     # Execute the SQL code
     self.cursor.execute(create_jobs_table)
+    if migrate_jobs:
+      # the poster is matched to an account by name, postings by unknown posters are kept without a poster
+      migrate_postings = """
+      INSERT INTO jobs (title, description, employer, location, salary, poster)
+      SELECT title, description, employer, location, salary,
+        (SELECT username FROM accounts WHERE fName = posterFirstName AND lName = posterLastName LIMIT 1)
+      FROM jobs_v1 ORDER BY rowid
+      """
+      self.cursor.execute(migrate_postings)
+      self.cursor.execute("DROP TABLE jobs_v1")
     
     # Commit the transaction
     self.conn.commit()
 
+    #create indexes for the job search filters
+    self.cursor.execute("CREATE INDEX IF NOT EXISTS jobs_employer ON jobs (employer COLLATE NOCASE)")
+    self.cursor.execute("CREATE INDEX IF NOT EXISTS jobs_location ON jobs (location COLLATE NOCASE)")
+    self.cursor.execute("CREATE INDEX IF NOT EXISTS jobs_salary ON jobs (salary)")
+    #postings of a poster in the order they were created, also used to cascade account deletions
+    self.cursor.execute("CREATE INDEX IF NOT EXISTS jobs_poster_created ON jobs (poster, created)")
+    self.cursor.execute("CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created)")
+    self.conn.commit()
+
+    #create counters table holding the number of rows of a table, and of each user's rows in a table (ex. jobs per poster),
+    #so quotas can be checked with a point read instead of counting the table. Counters are kept by the triggers below
+    self.cursor.execute("PRAGMA table_info(counters)")
+    counter_columns = [column[1] for column in self.cursor.fetchall()]
+    if counter_columns and 'owner' not in counter_columns:
+      # counters created before per user counts, they are derived from the tables so they are dropped and recounted
+      self.cursor.executescript("""
+      DROP TRIGGER IF EXISTS count_jobs_insert;
+      DROP TRIGGER IF EXISTS count_jobs_delete;
+      DROP TABLE counters;
+      """)
+      counter_columns = []
+    table_counters = """
+    CREATE TABLE IF NOT EXISTS counters (
+      name VARCHAR(64) NOT NULL,
+      owner VARCHAR(25) NOT NULL DEFAULT '',
+      count INT NOT NULL DEFAULT 0,
+      PRIMARY KEY (name, owner));
+    """
+    self.cursor.execute(table_counters)
+    trigger_counters = """
+    CREATE TRIGGER IF NOT EXISTS count_accounts_insert AFTER INSERT ON accounts
+    BEGIN
+      UPDATE counters SET count = count + 1 WHERE name = 'accounts' AND owner = '';
+    END;
+    CREATE TRIGGER IF NOT EXISTS count_accounts_delete AFTER DELETE ON accounts
+    BEGIN
+      UPDATE counters SET count = count - 1 WHERE name = 'accounts' AND owner = '';
+    END;
+    CREATE TRIGGER IF NOT EXISTS count_jobs_insert AFTER INSERT ON jobs
+    BEGIN
+      UPDATE counters SET count = count + 1 WHERE name = 'jobs' AND owner = '';
+      INSERT INTO counters (name, owner, count) SELECT 'jobs', NEW.poster, 1 WHERE NEW.poster IS NOT NULL
+        ON CONFLICT (name, owner) DO UPDATE SET count = count + 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS count_jobs_delete AFTER DELETE ON jobs
+    BEGIN
+      UPDATE counters SET count = count - 1 WHERE name = 'jobs' AND owner IN ('', OLD.poster);
+    END;
+    CREATE TRIGGER IF NOT EXISTS count_jobs_update_poster AFTER UPDATE OF poster ON jobs
+    BEGIN
+      UPDATE counters SET count = count - 1 WHERE name = 'jobs' AND owner = OLD.poster;
+      INSERT INTO counters (name, owner, count) SELECT 'jobs', NEW.poster, 1 WHERE NEW.poster IS NOT NULL
+        ON CONFLICT (name, owner) DO UPDATE SET count = count + 1;
+    END;
+    """
+    self.cursor.executescript(trigger_counters)
+    # start the counters from the tables the first time they are created or after a migration
+    if not counter_columns or migrate_jobs:
+      self.recountRows()
+
+    #create quotas table holding the maximum number of rows of a table,
+    #owner '' limits the whole table, '*' limits each user's rows and a username overrides '*' for that user
+    table_quotas = """
+    CREATE TABLE IF NOT EXISTS quotas (
+      name VARCHAR(64) NOT NULL,
+      owner VARCHAR(25) NOT NULL DEFAULT '',
+      maxRows INT NOT NULL,
+      PRIMARY KEY (name, owner));
+    """
+    self.cursor.execute(table_quotas)
+    self.cursor.executemany("INSERT OR IGNORE INTO quotas (name, owner, maxRows) VALUES (?, ?, ?)", DEFAULT_QUOTAS)
+    self.conn.commit()
+
+    #create full text search index over the job titles and descriptions
+    #the index reads its content from the jobs table and is kept in sync by the triggers below
+    self.cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'")
+    fts_exists = self.cursor.fetchone()
+    self.cursor.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(title, description, content='jobs', content_rowid='rowid')
+    """)
+    trigger_jobs_fts = """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs
+    BEGIN
+      INSERT INTO jobs_fts (rowid, title, description) VALUES (NEW.rowid, NEW.title, NEW.description);
+    END;
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs
+    BEGIN
+      INSERT INTO jobs_fts (jobs_fts, rowid, title, description) VALUES ('delete', OLD.rowid, OLD.title, OLD.description);
+    END;
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE ON jobs
+    BEGIN
+      INSERT INTO jobs_fts (jobs_fts, rowid, title, description) VALUES ('delete', OLD.rowid, OLD.title, OLD.description);
+      INSERT INTO jobs_fts (rowid, title, description) VALUES (NEW.rowid, NEW.title, NEW.description);
+    END;
+    """
+    self.cursor.executescript(trigger_jobs_fts)
+    # index any postings that existed before the full text index was created or were migrated
+    if fts_exists is None or migrate_jobs:
+      self.cursor.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('rebuild')")
+    self.conn.commit()
+
     #create account settings table
     table_acc_settings = """
     CREATE TABLE IF NOT EXISTS account_settings (
@@ -228,22 +1431,21 @@ class System:
     self.cursor.execute(table_friends)
     self.conn.commit()
 
-    #create trigger unique friendships trigger on friends table
-    #enforces that the sender,receiver combination is a unique relation
-    #by preventing permutations so if friendA,friendB is a key then friendB,friendA is invalid
-    trigger_unique_friends = """
-    CREATE TRIGGER IF NOT EXISTS unique_friend_combinations
-    BEFORE INSERT ON friends
-    FOR EACH ROW
-    BEGIN
-      --sender,receiver must not already have a friend relation as receiver,sender - abort if such a relation is found
-      SELECT CASE
-        WHEN ((SELECT rowid FROM friends WHERE sender = NEW.receiver AND receiver = NEW.sender) IS NOT NULL)
-        THEN RAISE(ABORT, 'UNIQUE constraint failed: friends.sender, friends.receiver')
-      END;
-    END;
-    """
-    self.cursor.execute(trigger_unique_friends)
+    #friendships are unique for each pair of users whichever of them sent the request, enforced by a unique index on
+    #the canonical (lower, higher) pair of usernames instead of a trigger searching for the reversed pair on each insert.
+    #the direction of the request is kept by the sender/receiver order
+    self.cursor.execute("DROP TRIGGER IF EXISTS unique_friend_combinations")
+    self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'friends_pair'")
+    if self.cursor.fetchone() is None:
+      # keep the first of any pairs stored in both directions before the index existed
+      dedupe_friends = """
+      DELETE FROM friends WHERE rowid NOT IN (
+        SELECT MIN(rowid) FROM friends GROUP BY min(sender, receiver), max(sender, receiver))
+      """
+      self.cursor.execute(dedupe_friends)
+      self.cursor.execute("CREATE UNIQUE INDEX friends_pair ON friends (min(sender, receiver), max(sender, receiver))")
+    #a user's friendships are found by sender with the primary key and by receiver with this index
+    self.cursor.execute("CREATE INDEX IF NOT EXISTS friends_receiver ON friends (receiver, status)")
     self.conn.commit()
 
     #create trigger remove friendships trigger on accounts table
@@ -275,6 +1477,93 @@ class System:
         FOREIGN KEY (username) REFERENCES accounts(username) ON DELETE CASCADE)
 """)
 # Commit the changes and close the connection for experience table
+    self.cursor.execute("CREATE INDEX IF NOT EXISTS experiences_username ON experiences (username, expID)")
+    self.conn.commit()
+
+    #create profile documents table holding each user's profile serialized by PROFILE_DOCUMENT, so a profile is loaded with
+    #one primary key read instead of joining the accounts and experiences tables. the triggers below rewrite a user's
+    #document whenever their account or experiences change
+    self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'profile_documents'")
+    create_documents = self.cursor.fetchone() is None
+    table_documents = """
+    CREATE TABLE IF NOT EXISTS profile_documents (
+      username VARCHAR(25) PRIMARY KEY,
+      document TEXT NOT NULL) WITHOUT ROWID
+    """
+    self.cursor.execute(table_documents)
+    # trigger name: (event, usernames whose documents are rewritten)
+    document_triggers = {
+      'accounts_insert': ("AFTER INSERT ON accounts", "NEW.username"),
+      'accounts_update': ("AFTER UPDATE OF username, university, major, yearsAttended, title, infoAbout, profile ON accounts",
+                          "OLD.username, NEW.username"),
+      'accounts_delete': ("AFTER DELETE ON accounts", "OLD.username"),
+      'experiences_insert': ("AFTER INSERT ON experiences", "NEW.username"),
+      'experiences_update': ("AFTER UPDATE ON experiences", "OLD.username, NEW.username"),
+      'experiences_delete': ("AFTER DELETE ON experiences", "OLD.username"),
+    }
+    # accounts tables created before profiles were added have no documents
+    if 'profile' in account_columns:
+      for name, (event, changed) in document_triggers.items():
+        # triggers written with an earlier PROFILE_DOCUMENT are replaced, and every document is written again
+        self.cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (f"profile_document_{name}",))
+        trigger = self.cursor.fetchone()
+        if trigger is not None and PROFILE_DOCUMENT in trigger[0]:
+          continue
+        create_documents = True
+        document_trigger = f"""
+        CREATE TRIGGER profile_document_{name} {event}
+        BEGIN
+          DELETE FROM profile_documents WHERE username IN ({changed});
+          INSERT INTO profile_documents (username, document) {PROFILE_DOCUMENT} WHERE accounts.username IN ({changed});
+        END;
+        """
+        self.cursor.execute(f"DROP TRIGGER IF EXISTS profile_document_{name}")
+        self.cursor.execute(document_trigger)
+      if create_documents:
+        # write the documents of accounts created before the profile documents table or its current triggers
+        self.cursor.execute(f"INSERT OR REPLACE INTO profile_documents (username, document) {PROFILE_DOCUMENT}")
+    self.conn.commit()
+
+    #create sessions table holding the login sessions that can be resumed without logging in again,
+    #data holds the user's account and settings fields so a resumed session doesn't read the accounts tables
+    table_sessions = """
+    CREATE TABLE IF NOT EXISTS sessions (
+      sessionID VARCHAR(32) PRIMARY KEY,
+      username VARCHAR(25) NOT NULL,
+      expires REAL NOT NULL,
+      data TEXT NOT NULL,
+      FOREIGN KEY(username) REFERENCES accounts(username) ON DELETE CASCADE);
+    """
+    self.cursor.execute(table_sessions)
+    #expired sessions are found by expiry when they are reaped, and a user's sessions by username when the account is removed
+    self.cursor.execute("CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires)")
+    self.cursor.execute("CREATE INDEX IF NOT EXISTS sessions_username ON sessions (username)")
+    #create secrets table holding the keys used to sign session tokens, created once per database
+    self.cursor.execute("CREATE TABLE IF NOT EXISTS secrets (name VARCHAR(32) PRIMARY KEY, value TEXT NOT NULL)")
+    self.cursor.execute("INSERT OR IGNORE INTO secrets (name, value) VALUES ('session', ?)", (secrets.token_hex(32),))
+    self.cursor.execute("SELECT value FROM secrets WHERE name = 'session'")
+    self.sessionKey = bytes.fromhex(self.cursor.fetchone()[0])
+    self.conn.commit()
+
+    #create the change journal, triggers write the key of every changed row so that connections sharing the database
+    #can invalidate only the cached keys another connection changed. A NULL key means the whole table changed (ex. an import)
+    table_changes = """
+    CREATE TABLE IF NOT EXISTS changes (
+      changeID INTEGER PRIMARY KEY AUTOINCREMENT,
+      tableName VARCHAR(32) NOT NULL,
+      key);
+    """
+    self.cursor.execute(table_changes)
+    for tableName, keys in JOURNALED_TABLES.items():
+      for event, rows in (('INSERT', ('NEW',)), ('UPDATE', ('OLD', 'NEW')), ('DELETE', ('OLD',))):
+        changedKeys = ' UNION '.join(f"SELECT '{tableName}', {row}.{key}" for row in rows for key in keys)
+        journal_trigger = f"""
+        CREATE TRIGGER IF NOT EXISTS journal_{tableName}_{event.lower()} AFTER {event} ON {tableName}
+        BEGIN
+          INSERT INTO changes (tableName, key) {changedKeys};
+        END;
+        """
+        self.cursor.execute(journal_trigger)
     self.conn.commit()
        
     ## Instantiate User Class Here
@@ -283,6 +1572,7 @@ class System:
     self.homePage = Menu()
     self.mainMenu = Menu()
     self.jobsMenu = Menu()
+    self.jobResultsMenu = Menu() # displays the job postings generated by browsing or searching jobs
     self.friendMenu = Menu()
     self.videoMenu = Menu()
     self.skillsMenu = Menu()
@@ -297,7 +1587,7 @@ class System:
     self.findAFriend = Menu() # allows searching for users by last name, university, or major
     self.receivedFriendsMenu = Menu() # displays the list of user's who have sent friend requests to the current user
     self.userResultsMenu = Menu() # displays the list of users generated by the Find A Friend search
-    self.sendFriendRequestMenu = Menu()
+    self.sendFriendRequestMenu = Menu() # the screens below are rebuilt for each friend they show, see System.screenMenu
     self.receiveFriendReqMenu = Menu()
     self.networkMenu = Menu()
     self.displayFriendInfo = Menu()
@@ -332,11 +1622,49 @@ class System:
     self.eDate3Menu = Menu()
     self.location3Menu = Menu()
     self.description3Menu = Menu()
+    for menu in vars(self).values():
+      if isinstance(menu, Menu):
+        menu.owner = self
+    ## Cache of loaded profiles (profile flag, profile) keyed by username
+    self.profileCache = LRUCache(PROFILE_CACHE_SIZE, PROFILE_TTL)
+    ## Pagers for menus displaying large result sets
+    self.userResultsPager = None # created by each Find A Friend search
+    self.networkPager = Pager(self.fetchAcceptedFriendsPage)
+    self.receivedFriendsPager = Pager(self.fetchReceivedFriendsPage)
+    self.receivedFriendsCount = 0
+    self.jobsPager = None # created by each job browse/search
+    self.jobsHeading = "Job Postings" # heading of the job results menu
+    self.jobMatcher = JobMatcher() # indexed when recommendations are first requested
+    self.routes = {} # path of every menu and menu item, built with the menus
+    self.sessionToken = None # token of the last login session, it can be resumed until it expires
+    self.sessionsReaped = 0 # time expired sessions were last removed
+    ## Writes of the menus are queued and retried while other processes keep the database busy
+    self.writer = WriteCoordinator(self.conn, database)
+    ## Settings of logged in users, changes are written when leaving the settings menus or by the first menu step after SETTINGS_FLUSH_INTERVAL
+    self.settings = SettingsService(self.conn, writer=self.writer)
+    ## Login attempt throttling for each username and each origin
+    self.userLoginLimiter = TokenBucketLimiter(LOGIN_USER_BURST, LOGIN_USER_RATE)
+    self.originLoginLimiter = TokenBucketLimiter(LOGIN_ORIGIN_BURST, LOGIN_ORIGIN_RATE)
+    ## Cache coherence with other connections, see syncCaches
+    self.dataVersion = self.conn.execute("PRAGMA data_version").fetchone()[0]
+    self.lastChange = self.conn.execute("SELECT COALESCE(MAX(changeID), 0) FROM changes").fetchone()[0]
+    self.changeListeners = {tableName: [] for tableName in JOURNALED_TABLES} # functions invalidating a changed key
+    self.onChange('accounts', self.invalidateProfile)
+    self.onChange('experiences', self.invalidateProfile)
+    self.onChange('account_settings', self.reloadSettings)
+    self.onChange('jobs', self.reindexJob)
+    self.onChange('accounts', self.addUsername)
+    ## Taken usernames, checked while registering so new usernames are accepted without a query
+    self.rebuildUsernames()
     
     
     
     
   def __del__(self): #closes connection to db
+    try:
+      self.settings.flush()
+    except Exception:
+      pass
     self.conn.close()
     
   #System Level Controls for Menus    
@@ -344,8 +1672,7 @@ class System:
    if not(self.user.loggedOn):
      self.homePage.start()
    else:
-     self.mainMenu.start()
-     self.user.logout()
+     self.mainMenu.start(onExit=self.logout)
      
   def join_menu(self, opening = "Would You Like To Join Your Friends On InCollege?", exit = "Return To Home Page"):
     self.joinMenu.setOpening(opening)
@@ -353,10 +1680,20 @@ class System:
     if not(self.user.loggedOn):
      self.joinMenu.start()
     else:
-     self.mainMenu.start()
-     self.user.logout()
+     self.mainMenu.start(onExit=self.logout)
      
 
+  def logout(self):
+    """Saves the user's settings and session, then logs the user out, run when the user leaves the main menu."""
+    self.flushSettings()
+    self.saveSession()
+    self.settings.forget(self.user.userName)
+    self.user.logout()
+
+  def content_menu(self, name):
+    """Displays the page of InCollege content with the name (ex. "Copyright Notice") in the quick menu."""
+    self.quick_menu(System.content[name])
+
   def quick_menu(self, opening, exit='Back'):
     """
     Allows the caller to display text to the user in a simple menu with no selections.
@@ -378,6 +1715,10 @@ class System:
       self.mainMenu.start()
   def jobs_menu(self):
       self.jobsMenu.start()
+  def job_results_menu(self):
+      if not self.jobResultsMenu.hasBackgroundActions():
+        self.jobResultsMenu.addBackgroundAction(self.populateJobSelections)
+      self.jobResultsMenu.start()
   def friend_menu(self):
       self.friendMenu.start()
   def video_menu(self):
@@ -389,269 +1730,199 @@ class System:
   def privacy_menu(self):
       self.privacyMenu.start()
   def guest_controls(self):
-      self.guestControls.start()
+      self.guestControls.start(onExit=self.flushSettings)
   def useful_links(self):
       self.usefulLinks.start()
   def general_menu(self):
       self.generalMenu.start()
   def language_menu(self):
-      self.languageMenu.start()
+      self.languageMenu.start(onExit=self.flushSettings)
   def find_a_friend_menu(self):
       self.findAFriend.start()
   def received_friends_menu(self):
       # set the opening statement
       if not self.receivedFriendsMenu.hasOpening():
-        opening = lambda: f"You Have Received Friend Requests From {len(self.user.receivedRequests)} Users."
+        opening = lambda: f"You Have Received Friend Requests From {self.receivedFriendsCount} Users."
         self.receivedFriendsMenu.setOpening(opening)
       # add background task to update pending friends
       if not self.receivedFriendsMenu.hasBackgroundActions():
         self.receivedFriendsMenu.addBackgroundAction(self.populateReceivedFriendSelections)
-      # start the menu
+      # start the menu on the first page of requests
+      self.receivedFriendsPager.reset()
       self.receivedFriendsMenu.start()  
   def user_results_menu(self):
+      if not self.userResultsMenu.hasBackgroundActions():
+        self.userResultsMenu.addBackgroundAction(self.populateUserResultSelections)
       self.userResultsMenu.start()
+  def screenMenu(self):
+      """
+      Returns a new menu owned by the system, for a screen whose selections are built for one call (ex. one friend).
+      The screen can be opened again from the command palette while it is open, so each call gets its own menu
+      instead of adding its selections to a menu shared with the screen below it.
+      """
+      menu = Menu()
+      menu.owner = self
+      return menu
   def send_friend_request_menu(self, friend):
-      """Performs setup and cleanup for the send friend request menu."""
+      """Performs setup for the send friend request menu."""
+      # the user's relation with the friend, looked up before each display
+      relation = {}
       # create the dynamic opening statement
-      opening = (
-        lambda: f"""{friend.displayProfile("part")}\n
-      {"You Have Sent a Friend Request to This User." if friend.userName in self.user.sentRequests 
-        else "You Have Received a Friend Request From This User." if friend.userName in self.user.receivedRequests 
-        else "You Are Friends With This User." if friend.userName in self.user.acceptedRequests 
-        else "You Are Not Friends With This User."}"""
-      )
+      opening = lambda: f"""{friend.displayProfile("part")}\n
+      {FRIEND_STATUS_MESSAGES[relation['status']]}"""
       # initialize the menu components
-      self.sendFriendRequestMenu.setOpening(opening)
-      self.sendFriendRequestMenu.addBackgroundAction(self.loadAllFriends)
-      self.sendFriendRequestMenu.addItem(
+      menu = self.sendFriendRequestMenu = self.screenMenu()
+      menu.setOpening(opening)
+      menu.addBackgroundAction(lambda: relation.update(status=self.friendStatus(friend.userName)))
+      menu.addItem(
         'Send Friend Request',
         lambda: self.sendFriendRequest(friend),
-        lambda: True if friend.userName not in self.user.sentRequests 
-        and friend.userName not in self.user.receivedRequests
-        and friend.userName not in self.user.acceptedRequests 
-        else False
+        lambda: relation['status'] is None
       )
-      self.sendFriendRequestMenu.start() #start the menu
-      # cleanup the menu components
-      self.sendFriendRequestMenu.clearBackgroundActions()
-      self.sendFriendRequestMenu.clearSelections()
+      menu.start() #start the menu
 
 
   def receive_friend_req_menu(self, friend):
-      """Performs setup and cleanup for the receive friend request menu."""
+      """Performs setup for the receive friend request menu."""
+      # the user's relation with the friend, looked up before each display
+      relation = {}
       # create the dynamic opening statement
-      opening = (
-        lambda: f"""{friend.displayProfile("part")}\n
-      {"You Have Sent a Friend Request to This User." if friend.userName in self.user.sentRequests 
-        else "You Have Received a Friend Request From This User." if friend.userName in self.user.receivedRequests 
-        else "You Are Friends With This User." if friend.userName in self.user.acceptedRequests 
-        else "You Are Not Friends With This User."}"""
-      )
+      opening = lambda: f"""{friend.displayProfile("part")}\n
+      {FRIEND_STATUS_MESSAGES[relation['status']]}"""
       # initialize the menu components
-      self.receiveFriendReqMenu.setOpening(opening)
-      self.receiveFriendReqMenu.addBackgroundAction(self.loadAllFriends)
-      self.receiveFriendReqMenu.addItem(
+      menu = self.receiveFriendReqMenu = self.screenMenu()
+      menu.setOpening(opening)
+      menu.addBackgroundAction(lambda: relation.update(status=self.friendStatus(friend.userName)))
+      menu.addItem(
     		'Accept',
     		lambda: self.acceptFriendRequest(friend),
-    		lambda: True if friend.userName in self.user.receivedRequests else False
+    		lambda: relation['status'] == 'received'
       )
-      self.receiveFriendReqMenu.addItem(
+      menu.addItem(
     		'Reject',
     		lambda: self.rejectFriendRequest(friend),
-    		lambda: True if friend.userName in self.user.receivedRequests else False
+    		lambda: relation['status'] == 'received'
       )
       # start the menu
-      self.receiveFriendReqMenu.start()
-      # cleanup the menu
-      self.receiveFriendReqMenu.clearBackgroundActions()
-      self.receiveFriendReqMenu.clearSelections()    
+      menu.start()
     
   def show_pending_message(self):
-    # check receivedRequest dictionary to determine opening statement
-    self.loadAllFriends()
-    numRequests = len(self.user.receivedRequests)
+    # count the received requests to determine opening statement
+    numRequests = self.countReceivedRequests()
     if numRequests:
       self.mainMenu.setOpening(f'Welcome User!\n\nYou Have {numRequests} Pending Friend Requests!')
     else:
       self.mainMenu.setOpening('Welcome User!') 
 
   def network_menu(self):
+    # start the menu on the first page of connections
+    self.networkPager.reset()
     self.networkMenu.start()
   def display_friend_info(self):
     self.displayFriendInfo.start()
   
 
-  def view_friend_profile(self, friend):
-    self.loadFriendProfile(friend)
-    full_profile = friend.displayProfile("full")
-    partial_profile = friend.displayProfile("part")
-    self.viewFriendProfile.setOpening(lambda: full_profile if friend.hasProfile() and friend.userName in self.user.acceptedRequests else partial_profile)
-    self.viewFriendProfile.start()
+  def view_friend_profile(self, friend, relation):
+    """
+    Displays the friend's profile.
+
+    Args:
+      friend (UserRef): The friend.
+      relation (dict): The display_network relation with the friend, whose 'accepted' value was looked up before the menu was displayed.
+    """
+    self.loadFriendProfile(friend, relation['accepted'])
+    # only display (and fetch) the full profile if the user is still friends with the friend
+    menu = self.viewFriendProfile = self.screenMenu()
+    menu.setOpening(lambda: friend.displayProfile("full") if friend.hasProfile() and relation['accepted'] else friend.displayProfile("part"))
+    menu.start()
 
   def display_network(self, friend):
+    # whether the user is still friends with the friend, looked up before each display
+    relation = {}
+    menu = self.displayFriendInfo = self.screenMenu()
+    menu.addBackgroundAction(lambda: relation.update(accepted=self.friendStatus(friend.userName) == 'accepted'))
     # create a dynamic opening
-    self.displayFriendInfo.setOpening(lambda: f"""Additional Friend Information: \n\n{friend.displayProfile("part")}\n\n{"You Have Disconnected From This User" if friend.userName not in self.user.acceptedRequests else "You Are Friends With This User"}""")
+    menu.setOpening(lambda: f"""Additional Friend Information: \n\n{friend.displayProfile("part")}\n\n{"You Have Disconnected From This User" if not relation['accepted'] else "You Are Friends With This User"}""")
    
   # view Profile adding into the friends connections if the friend has a profile 
 
-    self.displayFriendInfo.addItem("View Profile", 
-                                   lambda: self.view_friend_profile(friend), 
-                                   lambda: True if friend.hasProfile() and friend.userName in self.user.acceptedRequests else False )
+    menu.addItem("View Profile", 
+                 lambda: self.view_friend_profile(friend, relation), 
+                 lambda: friend.hasProfile() and relation['accepted'])
      # provide an option to disconnect from selected connection
-    self.displayFriendInfo.addItem("Disconnect", 
-                                   lambda: self.disconnectFriend(friend), 
-                                   lambda: True if friend.userName in self.user.acceptedRequests else False)
+    menu.addItem("Disconnect", 
+                 lambda: self.disconnectFriend(friend), 
+                 lambda: relation['accepted'])
     
-    self.displayFriendInfo.setExitStatement("Exit")
-    self.displayFriendInfo.start()
-    # clean up menu
-    self.displayFriendInfo.clearSelections()
+    menu.setExitStatement("Exit")
+    menu.start()
 
   def show_network(self):
-    self.networkMenu.clearSelections()
-    self.loadAcceptedFriends()
-    connections = self.user.acceptedRequests
+    # create an option for each connection on the current page and
+    # provide additional info when clicked on
+    self.populatePagedSelections(
+      self.networkMenu,
+      self.networkPager,
+      lambda user: f'{user.fName.capitalize()} {user.lName.capitalize()}',
+      self.display_network
+    )
     # check if user has connections
-    if connections:
+    if self.networkPager.page():
       self.networkMenu.setOpening("Your Connections: ")    
-      for uname, user in reversed(connections.items()):
-        full_name = f'{user.fName.capitalize()} {user.lName.capitalize()}'
-        # create an option for each connection and
-        # provide additional info when clicked on
-        self.networkMenu.addItem(full_name, lambda usr=user: self.display_network(usr))
     else:
       self.networkMenu.setOpening("You Have No Connections.")
 
   
+  # visibility checks and dynamic labels named by the menu table
+  def isLoggedOn(self):
+    return self.user.loggedOn
+
+  def isLoggedOff(self):
+    return not self.user.loggedOn
+
+  def userHasProfile(self):
+    return self.user.hasProfile()
+
+  def profileText(self, view):
+    return self.user.displayProfile(view)
+
+  def profileLabel(self):
+    return "Create Profile" if self.user.hasProfile() == False else "Edit Profile"
+
+  def pendingRequestsLabel(self):
+    return f"Pending Requests ({self.receivedFriendsCount})"
+
+  def settingLabel(self, field, name):
+    return f"{name} [{'ON' if getattr(self.user, field) else 'OFF'}]"
+
+  def languageLabel(self, language):
+    return f"{language} [{'X' if self.user.language == language else ' '}]"
+
   def check_user_profile(self):
-    query = 'SELECT profile FROM accounts WHERE username = ?'
-    self.cursor.execute(query,(self.user.userName,))
-    result = self.cursor.fetchone()
-    # if true, create a dummy profile for the user
-    if result[0]:
-      self.user.Profile = profile()
+    result = self.cachedProfile(self.user.userName)
+    # if true, attach the cached profile to the user
+    if result and result[0]:
+      self.user.Profile = result[1]
 
   def view_user_profile(self):
-    if not self.viewUserProfile.hasBackgroundActions():
-      self.viewUserProfile.addBackgroundAction(self.loadUserProfile)
-    self.viewUserProfile.setOpening(lambda: self.user.displayProfile("full"))
     self.viewUserProfile.start()
   
   def user_profile_menu(self):
-    if not self.userProfileMenu.hasBackgroundActions():
-      self.userProfileMenu.addBackgroundAction(self.check_user_profile)
-    if not self.userProfileMenu.hasOpening():
-      self.userProfileMenu.setOpening("Welcome to the Profile Menu")
-    if len(self.userProfileMenu.selections) == 0:
-      # create a dynamic option based on
-      # if the user created a profile
-      self.userProfileMenu.addItem(lambda: f"""{"Create Profile" if self.user.hasProfile() == False else "Edit Profile"}""", lambda: self.edit_profile_menu)
-      self.userProfileMenu.addItem("View Profile", 
-                                   lambda: self.view_user_profile, 
-                                   lambda: self.user.hasProfile())
-      self.userProfileMenu.setExitStatement("Return to Main Menu")
     self.userProfileMenu.start()
 
-  
   def edit_profile_menu(self):
-    # also for view menu
-    if not self.editProfileMenu.hasBackgroundActions():
-      self.editProfileMenu.addBackgroundAction(self.loadUserProfile)
-    if not self.editProfileMenu.hasOpening():
-      self.editProfileMenu.setOpening("Choose A Section To Edit:")
-    if len(self.editProfileMenu.selections) == 0:
-      self.editProfileMenu.addItem("Title", 
-                                   lambda: self.edit_section("head"), 
-                                   lambda: self.user.hasProfile)
-      self.editProfileMenu.addItem("About", 
-                                   lambda: self.edit_section("about"), 
-                                   lambda: self.user.hasProfile)
-      self.editProfileMenu.addItem("Education", 
-                                   lambda: self.education_menu, 
-                                   lambda: self.user.hasProfile)
-      self.editProfileMenu.addItem("Experience 1", 
-                                   lambda: self.experience1_menu, 
-                                   lambda: self.user.hasProfile)
-      self.editProfileMenu.addItem("Experience 2", 
-                                   lambda: self.experience2_menu, 
-                                   lambda: self.user.hasProfile)
-      self.editProfileMenu.addItem("Experience 3",
-                                   lambda: self.experience3_menu, 
-                                   lambda: self.user.hasProfile)
     self.editProfileMenu.start()
 
   def education_menu(self):
-    if not self.educationMenu.hasBackgroundActions():
-      self.educationMenu.addBackgroundAction(self.loadUserProfile)
-    if not self.educationMenu.hasOpening():
-      self.educationMenu.setOpening("Choose A Section To Edit:")
-    if len(self.educationMenu.selections) == 0:
-      self.educationMenu.addItem("University", 
-                                 lambda: self.edit_section("uni"))
-      self.educationMenu.addItem("Degree", 
-                                 lambda: self.edit_section("deg"))
-      self.educationMenu.addItem("Years Attended", 
-                                 lambda: self.edit_section("years"))
     self.educationMenu.start()
 
   def experience1_menu(self):
-    if not self.experience1Menu.hasBackgroundActions():
-      self.experience1Menu.addBackgroundAction(self.loadUserProfile)
-    if not self.experience1Menu.hasOpening():
-      self.experience1Menu.setOpening("Share Your Experience: ")
-    if len(self.experience1Menu.selections) == 0:
-      self.experience1Menu.addItem("Title", 
-                                   lambda: self.edit_exp_title("title1"))
-      self.experience1Menu.addItem("Employer", 
-                                   lambda: self.edit_exp_employer("employer1"))
-      self.experience1Menu.addItem("Start Date", 
-                                   lambda: self.edit_exp_startDate("start1"))
-      self.experience1Menu.addItem("End Date", 
-                                   lambda: self.edit_exp_endDate("end1"))
-      self.experience1Menu.addItem("Location", 
-                                   lambda: self.edit_exp_location("location1"))
-      self.experience1Menu.addItem("Description", 
-                                   lambda: self.edit_exp_description("description1"))
     self.experience1Menu.start()
 
   def experience2_menu(self):
-    if not self.experience2Menu.hasBackgroundActions():
-      self.experience2Menu.addBackgroundAction(self.loadUserProfile)
-    if not self.experience2Menu.hasOpening():
-      self.experience2Menu.setOpening("Share Your Experience: ")
-    if len(self.experience2Menu.selections) == 0:
-      self.experience2Menu.addItem("Title", 
-                                   lambda: self.edit_exp_title("title2"))
-      self.experience2Menu.addItem("Employer", 
-                                   lambda: self.edit_exp_employer("employer2"))
-      self.experience2Menu.addItem("Start Date", 
-                                   lambda: self.edit_exp_startDate("start2"))
-      self.experience2Menu.addItem("End Date", 
-                                   lambda: self.edit_exp_endDate("end2"))
-      self.experience2Menu.addItem("Location", 
-                                   lambda: self.edit_exp_location("location2"))
-      self.experience2Menu.addItem("Description", 
-                                   lambda: self.edit_exp_description("description2"))
     self.experience2Menu.start()
 
   def experience3_menu(self):
-    if not self.experience3Menu.hasBackgroundActions():
-      self.experience3Menu.addBackgroundAction(self.loadUserProfile)
-    if not self.experience3Menu.hasOpening():
-      self.experience3Menu.setOpening("Share Your Experience: ")
-    if len(self.experience3Menu.selections) == 0:
-      self.experience3Menu.addItem("Title", 
-                                   lambda: self.edit_exp_title("title3"))
-      self.experience3Menu.addItem("Employer", 
-                                   lambda: self.edit_exp_employer("employer3"))
-      self.experience3Menu.addItem("Start Date", 
-                                   lambda: self.edit_exp_startDate("start3"))
-      self.experience3Menu.addItem("End Date", 
-                                   lambda: self.edit_exp_endDate("end3"))
-      self.experience3Menu.addItem("Location", 
-                                   lambda: self.edit_exp_location("location3"))
-      self.experience3Menu.addItem("Description", 
-                                   lambda: self.edit_exp_description("description3"))
     self.experience3Menu.start()
     
 
@@ -670,8 +1941,7 @@ class System:
       if headline:
         headline_query = 'UPDATE accounts SET title = ?, profile = True WHERE username = ?'
         params = (headline, username)
-        self.cursor.execute(headline_query, params)
-        self.conn.commit()
+        self.writeProfile(username, headline_query, params)
         print("\nSuccessfully Added Title to Profile")
       else: 
         print("\nInvalid input. Please try again.")
@@ -688,44 +1958,41 @@ class System:
       if about:
         about_query = 'UPDATE accounts SET infoAbout = ?, profile = True WHERE username = ?'
         params = (about, username)
-        self.cursor.execute(about_query, params)
-        self.conn.commit()
+        self.writeProfile(username, about_query, params)
         print("\nSuccessfully Added About to Profile")
       else:
         print("\nInvalid input. Please try again.")
       self.aboutMenu.start()
     elif section == "uni":
-      old_uni = self.user.Profile.education.university.title()
+      old_uni = self.user.Profile.education.university
       print("""------------------\nEditing University\n------------------\n""")
       if old_uni == None: 
         print("University: N/A\n")
       else:
         print("University:", old_uni, "\n")
       print("Enter Your University: ", end="")
-      uni = input()
+      uni = input().title()
       if uni:
         uni_query = 'UPDATE accounts SET university = ?, profile = True WHERE username = ?'
         params = (uni, username)
-        self.cursor.execute(uni_query, params)
-        self.conn.commit()
+        self.writeProfile(username, uni_query, params)
         print("\nSuccessfully Added University to Profile")
       else:
         print("\nInvalid input. Please try again.")
       self.uniMenu.start()
     elif section == "deg":
-      old_degree = self.user.Profile.education.major.title()
+      old_degree = self.user.Profile.education.major
       print("""--------------\nEditing Degree\n--------------\n""")
       if old_degree == None:
         print("Degree: N/A\n")
       else:
         print("Degree:", old_degree, "\n")
       print("Enter Your Degree: ", end="")
-      degree = input()
+      degree = input().title()
       if degree:
         degree_query = 'UPDATE accounts SET major = ?, profile = True WHERE username = ?'
         params = (degree, username)
-        self.cursor.execute(degree_query, params)
-        self.conn.commit()
+        self.writeProfile(username, degree_query, params)
         print("\nSuccessfully Added Degree to Profile")
       else:
         print("\nInvalid input. Please try again.")
@@ -742,22 +2009,40 @@ class System:
       if years.isnumeric():
         years_query = 'UPDATE accounts SET yearsAttended = ?, profile = True WHERE username = ?'
         params = (years, username)
-        self.cursor.execute(years_query, params)
-        self.conn.commit()
+        self.writeProfile(username, years_query, params)
         print("\nSuccessfully Added Years Attended to Profile")
       else: 
         print("\n\nError: Input not a number")
       self.yearsMenu.start()
 
 
+  def writeExperience(self, userName, n, field, value):
+    """
+    Sets a field of the user's nth experience, adding an experience if the user has fewer than n, and marks the user
+    as having a profile. The experiences are read and written in one BEGIN IMMEDIATE transaction,
+    so two sessions of the same user can't both add the nth experience.
+
+    Args:
+      userName (str): The user whose experience is written.
+      n (int): The experience's position from 1, in the order the experiences were added.
+      field (str): The experiences column set.
+      value: The column's new value.
+    """
+    def update():
+      self.cursor.execute("SELECT ROWID FROM experiences WHERE username = ? ORDER BY ROWID", (userName,))
+      rowIDs = [rowID for (rowID,) in self.cursor.fetchall()]
+      if len(rowIDs) >= n:
+        self.cursor.execute(f"UPDATE experiences SET {field} = ? WHERE ROWID = ?", (value, rowIDs[n - 1]))
+      else:
+        self.cursor.execute(f"INSERT INTO experiences (username, {field}) VALUES (?, ?)", (userName, value))
+      self.cursor.execute("UPDATE accounts SET profile = True WHERE username = ?", (userName,))
+    self.write(update, immediate=True)
+    self.invalidateProfile(userName)
+
   def edit_exp_title(self, section):
     username = self.user.userName
     # title queries
-    search_title = 'SELECT title, ROWID FROM experiences WHERE username = ?'
-    insert_title = 'INSERT INTO experiences (username, title) VALUES (?, ?)'
-    update_title = 'UPDATE experiences SET title = ? WHERE username = ? AND ROWID = ?'
-    # update profile 
-    update_profile = 'UPDATE accounts SET profile = True WHERE username = ?'
+    search_title = 'SELECT title FROM experiences WHERE username = ? ORDER BY ROWID'
 
     if section == "title1":
       print("""--------------\nEditing Title\n--------------\n""")
@@ -765,8 +2050,6 @@ class System:
       result = self.cursor.fetchall()
       # check if query isn't None
       if result: 
-        # get the rowID of first experience
-        rowID = result[0][1]
         old_title = result[0][0]
         if old_title == None:
           print("Title: N/A\n")
@@ -777,11 +2060,7 @@ class System:
         title = input()
         # if valid input then update first exp in db
         if title:
-          self.cursor.execute(update_title, (title, username, rowID))
-          self.conn.commit()
-          # set profile to true in accounts table
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 1, 'title', title)
           print("\nSuccessfully Added Title to Profile")
         else:
           print("\nInvalid input. Please try again.")
@@ -790,10 +2069,7 @@ class System:
         print("Enter A Title: ", end="")
         title = input()
         if title:
-          self.cursor.execute(insert_title, (username, title))
-          self.conn.commit()
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 1, 'title', title)
           print("\nSuccessfully Added Title to Profile")
         else:
           print("\nInvalid input. Please try again.")
@@ -804,8 +2080,6 @@ class System:
       result = self.cursor.fetchall()
       # check if query isn't None
       if len(result) > 1: 
-        # get the rowID of second experience
-        rowID = result[1][1]
         # get title of second experience
         old_title = result[1][0]
         if old_title == None:
@@ -817,11 +2091,7 @@ class System:
         title = input()
         # if valid input then update second exp in db
         if title:
-          self.cursor.execute(update_title, (title, username, rowID))
-          self.conn.commit()
-          # set profile to true in accounts table
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 2, 'title', title)
           print("\nSuccessfully Added Title to Profile")
         else:
           print("\nInvalid input. Please try again.")
@@ -830,10 +2100,7 @@ class System:
         print("Enter A Title: ", end="")
         title = input()
         if title:
-          self.cursor.execute(insert_title, (username, title))
-          self.conn.commit()
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 2, 'title', title)
           print("\nSuccessfully Added Title to Profile")
         else:
           print("\nInvalid input. Please try again.")
@@ -844,8 +2111,6 @@ class System:
       result = self.cursor.fetchall()
       # check if query isn't None
       if len(result) > 2: 
-        # get the rowID of third experience
-        rowID = result[2][1]
         old_title = result[2][0]
         if old_title == None:
           print("Title: N/A\n")
@@ -856,11 +2121,7 @@ class System:
         title = input()
         # if valid input then update third exp in db
         if title:
-          self.cursor.execute(update_title, (title, username, rowID))
-          self.conn.commit()
-          # set profile to true in accounts table
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 3, 'title', title)
           print("\nSuccessfully Added Title to Profile")
         else:
           print("\nInvalid input. Please try again.")
@@ -869,10 +2130,7 @@ class System:
         print("Enter A Title: ", end="")
         title = input()
         if title:
-          self.cursor.execute(insert_title, (username, title))
-          self.conn.commit()
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 3, 'title', title)
           print("\nSuccessfully Added Title to Profile")
         else:
           print("\nInvalid input. Please try again.")
@@ -882,11 +2140,7 @@ class System:
   def edit_exp_employer(self, section):
     username = self.user.userName
     # employer queries
-    search_employer = 'SELECT employer, ROWID FROM experiences WHERE username = ?'
-    insert_employer = 'INSERT INTO experiences (username, employer) VALUES (?, ?)'
-    update_employer = 'UPDATE experiences SET employer = ? WHERE username = ? AND ROWID = ?'
-   # update profile 
-    update_profile = 'UPDATE accounts SET profile = True WHERE username = ?'
+    search_employer = 'SELECT employer FROM experiences WHERE username = ? ORDER BY ROWID'
 
     if section == "employer1":
       print("""----------------\nEditing Employer\n----------------\n""")
@@ -894,7 +2148,6 @@ class System:
       result = self.cursor.fetchall()
       # check if query isn't None
       if result: 
-        rowID = result[0][1]
         old_employer = result[0][0]
         if old_employer == None:
           print("Employer: N/A\n")
@@ -903,10 +2156,7 @@ class System:
         print("Enter Employer: ", end="")
         employer = input()
         if employer:
-          self.cursor.execute(update_employer, (employer, username, rowID))
-          self.conn.commit()
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 1, 'employer', employer)
           print("\nSuccessfully Added Employer to Profile")
         else:
           print("\nInvalid input. Please try again.")
@@ -915,10 +2165,7 @@ class System:
         print("Enter Employer: ", end="")
         employer = input()
         if employer:
-          self.cursor.execute(insert_employer, (username, employer))
-          self.conn.commit()
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 1, 'employer', employer)
           print("\nSuccessfully Added Employer to Profile")
         else: 
           print("\nInvalid input. Please try again.")
@@ -929,7 +2176,6 @@ class System:
       result = self.cursor.fetchall()
       # check if query isn't None
       if len(result) > 1: 
-        rowID = result[1][1]
         old_employer = result[1][0]
         if old_employer == None:
           print("Employer: N/A\n")
@@ -938,10 +2184,7 @@ class System:
         print("Enter Employer: ", end="")
         employer = input()
         if employer:
-          self.cursor.execute(update_employer, (employer, username, rowID))
-          self.conn.commit()
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 2, 'employer', employer)
           print("\nSuccessfully Added Employer to Profile")
         else:
           print("\nInvalid input. Please try again.")
@@ -950,10 +2193,7 @@ class System:
         print("Enter Employer: ", end="")
         employer = input()
         if employer:
-          self.cursor.execute(insert_employer, (username, employer))
-          self.conn.commit()
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 2, 'employer', employer)
           print("\nSuccessfully Added Employer to Profile")
         else: 
           print("\nInvalid input. Please try again.")
@@ -964,7 +2204,6 @@ class System:
       result = self.cursor.fetchall()
       # check if query isn't None
       if len(result) > 2: 
-        rowID = result[2][1]
         old_employer = result[2][0]
         if old_employer == None:
           print("Employer: N/A\n")
@@ -973,10 +2212,7 @@ class System:
         print("Enter Employer: ", end="")
         employer = input()
         if employer:
-          self.cursor.execute(update_employer, (employer, username, rowID))
-          self.conn.commit()
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 3, 'employer', employer)
           print("\nSuccessfully Added Employer to Profile")
         else:
           print("\nInvalid input. Please try again.")
@@ -985,10 +2221,7 @@ class System:
         print("Enter Employer: ", end="")
         employer = input()
         if employer:
-          self.cursor.execute(insert_employer, (username, employer))
-          self.conn.commit()
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 3, 'employer', employer)
           print("\nSuccessfully Added Employer to Profile")
         else: 
           print("\nInvalid input. Please try again.")
@@ -998,11 +2231,7 @@ class System:
   def edit_exp_startDate(self, section):
     username = self.user.userName
     # start date queries
-    search_startDate = 'SELECT dateStarted, ROWID FROM experiences WHERE username = ?'
-    insert_startDate = 'INSERT INTO experiences (username, dateStarted) VALUES (?, ?)'
-    update_startDate = 'UPDATE experiences SET dateStarted = ? WHERE username = ? AND ROWID = ?'
-    # update profile 
-    update_profile = 'UPDATE accounts SET profile = True WHERE username = ?'
+    search_startDate = 'SELECT dateStarted FROM experiences WHERE username = ? ORDER BY ROWID'
     # format for date
     date_format = '%Y-%m-%d'
 
@@ -1012,7 +2241,6 @@ class System:
       result = self.cursor.fetchall()
       # check if query isn't None
       if result: 
-        rowID = result[0][1]
         old_startDate = result[0][0]
         if old_startDate == None:
           print("Start Date: N/A\n")
@@ -1025,10 +2253,7 @@ class System:
           try:
             dateObject = datetime.datetime.strptime(startDate, date_format)
             if dateObject:
-              self.cursor.execute(update_startDate, (startDate, username, rowID))
-              self.conn.commit()
-              self.cursor.execute(update_profile, (username,))
-              self.conn.commit()
+              self.writeExperience(username, 1, 'dateStarted', startDate)
               print("\nSuccessfully Added Start Date to Profile")
           except ValueError:
             print("\nIncorrect format. Please try again.")
@@ -1043,10 +2268,7 @@ class System:
           try:
             dateObject = datetime.datetime.strptime(startDate, date_format)
             if dateObject:
-              self.cursor.execute(insert_startDate, (username, startDate))
-              self.conn.commit()
-              self.cursor.execute(update_profile, (username,))
-              self.conn.commit()
+              self.writeExperience(username, 1, 'dateStarted', startDate)
               print("\nSuccessfully Added Start Date to Profile")
           except ValueError:
             print("\nIncorrect format. Please try again.")
@@ -1059,7 +2281,6 @@ class System:
       result = self.cursor.fetchall()
       # check if query isn't None
       if len(result) > 1: 
-        rowID = result[1][1]
         old_startDate = result[1][0]
         if old_startDate == None:
           print("Start Date: N/A\n")
@@ -1071,10 +2292,7 @@ class System:
           try:
             dateObject = datetime.datetime.strptime(startDate, date_format)
             if dateObject:
-              self.cursor.execute(update_startDate, (startDate, username, rowID))
-              self.conn.commit()
-              self.cursor.execute(update_profile, (username,))
-              self.conn.commit()
+              self.writeExperience(username, 2, 'dateStarted', startDate)
               print("\nSuccessfully Added Start Date to Profile")
           except ValueError:
             print("\nIncorrect format. Please try again.")
@@ -1089,10 +2307,7 @@ class System:
           try:
             dateObject = datetime.datetime.strptime(startDate, date_format)
             if dateObject:
-              self.cursor.execute(insert_startDate, (username, startDate))
-              self.conn.commit()
-              self.cursor.execute(update_profile, (username,))
-              self.conn.commit()
+              self.writeExperience(username, 2, 'dateStarted', startDate)
               print("\nSuccessfully Added Start Date to Profile")
           except ValueError:
             print("\nIncorrect format. Please try again.")
@@ -1105,7 +2320,6 @@ class System:
       result = self.cursor.fetchall()
       # check if query isn't None
       if len(result) > 2: 
-        rowID = result[2][1]
         old_startDate = result[2][0]
         if old_startDate == None:
           print("Start Date: N/A\n")
@@ -1117,10 +2331,7 @@ class System:
           try:
             dateObject = datetime.datetime.strptime(startDate, date_format)
             if dateObject:
-              self.cursor.execute(update_startDate, (startDate, username, rowID))
-              self.conn.commit()
-              self.cursor.execute(update_profile, (username,))
-              self.conn.commit()
+              self.writeExperience(username, 3, 'dateStarted', startDate)
               print("\nSuccessfully Added Start Date to Profile")
           except ValueError:
             print("\nIncorrect format. Please try again.")
@@ -1135,10 +2346,7 @@ class System:
           try:
             dateObject = datetime.datetime.strptime(startDate, date_format)
             if dateObject:
-              self.cursor.execute(insert_startDate, (username, startDate))
-              self.conn.commit()
-              self.cursor.execute(update_profile, (username,))
-              self.conn.commit()
+              self.writeExperience(username, 3, 'dateStarted', startDate)
               print("\nSuccessfully Added Start Date to Profile")
           except ValueError:
             print("\nIncorrect format. Please try again.")
@@ -1149,11 +2357,7 @@ class System:
   def edit_exp_endDate(self, section):
     username = self.user.userName
     # end date queries
-    search_endDate = 'SELECT dateEnded, ROWID FROM experiences WHERE username = ?'
-    insert_endDate = 'INSERT INTO experiences (username, dateEnded) VALUES (?, ?)'
-    update_endDate = 'UPDATE experiences SET dateEnded = ? WHERE username = ? AND ROWID = ?'
-    # update profile 
-    update_profile = 'UPDATE accounts SET profile = True WHERE username = ?'
+    search_endDate = 'SELECT dateEnded FROM experiences WHERE username = ? ORDER BY ROWID'
     # format for date
     date_format = '%Y-%m-%d'
 
@@ -1163,7 +2367,6 @@ class System:
       result = self.cursor.fetchall()
       # check if query isn't None
       if result: 
-        rowID = result[0][1]
         old_endDate = result[0][0]
         if old_endDate == None:
           print("End Date: N/A\n")
@@ -1176,10 +2379,7 @@ class System:
           try:
             dateObject = datetime.datetime.strptime(endDate, date_format)
             if dateObject:
-              self.cursor.execute(update_endDate, (endDate, username, rowID))
-              self.conn.commit()
-              self.cursor.execute(update_profile, (username,))
-              self.conn.commit()
+              self.writeExperience(username, 1, 'dateEnded', endDate)
               print("\nSuccessfully Added End Date to Profile")
           except ValueError:
             print("\nIncorrect format. Please try again.")
@@ -1194,10 +2394,7 @@ class System:
           try:
             dateObject = datetime.datetime.strptime(endDate, date_format)
             if dateObject:
-              self.cursor.execute(insert_endDate, (username, endDate))
-              self.conn.commit()
-              self.cursor.execute(update_profile, (username,))
-              self.conn.commit()
+              self.writeExperience(username, 1, 'dateEnded', endDate)
               print("\nSuccessfully Added End Date to Profile")
           except ValueError:
             print("\nIncorrect format. Please try again.")
@@ -1210,7 +2407,6 @@ class System:
       result = self.cursor.fetchall()
       # check if query isn't None
       if len(result) > 1: 
-        rowID = result[1][1]
         old_endDate = result[1][0]
         if old_endDate == None:
           print("End Date: N/A\n")
@@ -1222,10 +2418,7 @@ class System:
           try:
             dateObject = datetime.datetime.strptime(endDate, date_format)
             if dateObject:
-              self.cursor.execute(update_endDate, (endDate, username, rowID))
-              self.conn.commit()
-              self.cursor.execute(update_profile, (username,))
-              self.conn.commit()
+              self.writeExperience(username, 2, 'dateEnded', endDate)
               print("\nSuccessfully Added End Date to Profile")
           except ValueError:
             print("\nIncorrect format. Please try again.")
@@ -1240,10 +2433,7 @@ class System:
           try:
             dateObject = datetime.datetime.strptime(endDate, date_format)
             if dateObject:
-              self.cursor.execute(insert_endDate, (username, endDate))
-              self.conn.commit()
-              self.cursor.execute(update_profile, (username,))
-              self.conn.commit()
+              self.writeExperience(username, 2, 'dateEnded', endDate)
               print("\nSuccessfully Added End Date to Profile")
           except ValueError:
             print("\nIncorrect format. Please try again.")
@@ -1256,7 +2446,6 @@ class System:
       result = self.cursor.fetchall()
       # check if query isn't None
       if len(result) > 2: 
-        rowID = result[2][1]
         old_endDate = result[2][0]
         if old_endDate == None:
           print("End Date: N/A\n")
@@ -1268,10 +2457,7 @@ class System:
           try:
             dateObject = datetime.datetime.strptime(endDate, date_format)
             if dateObject:
-              self.cursor.execute(update_endDate, (endDate, username, rowID))
-              self.conn.commit()
-              self.cursor.execute(update_profile, (username,))
-              self.conn.commit()
+              self.writeExperience(username, 3, 'dateEnded', endDate)
               print("\nSuccessfully Added End Date to Profile")
           except ValueError:
             print("\nIncorrect format. Please try again.")
@@ -1286,10 +2472,7 @@ class System:
           try:
             dateObject = datetime.datetime.strptime(endDate, date_format)
             if dateObject:
-              self.cursor.execute(insert_endDate, (username, endDate))
-              self.conn.commit()
-              self.cursor.execute(update_profile, (username,))
-              self.conn.commit()
+              self.writeExperience(username, 3, 'dateEnded', endDate)
               print("\nSuccessfully Added End Date to Profile")
           except ValueError:
             print("\nIncorrect format. Please try again.")
@@ -1301,11 +2484,7 @@ class System:
   def edit_exp_location(self, section):
     username = self.user.userName
     # location queries
-    search_location = 'SELECT location, ROWID FROM experiences WHERE username = ?'
-    insert_location = 'INSERT INTO experiences (username, location) VALUES (?, ?)'
-    update_location = 'UPDATE experiences SET location = ? WHERE username = ? AND ROWID = ?'
-    # update profile 
-    update_profile = 'UPDATE accounts SET profile = True WHERE username = ?'
+    search_location = 'SELECT location FROM experiences WHERE username = ? ORDER BY ROWID'
 
     if section == "location1":
       print("""----------------\nEditing Location\n----------------\n""")
@@ -1313,8 +2492,6 @@ class System:
       result = self.cursor.fetchall()
       # check if query isn't None
       if result: 
-        # get the rowID of first experience
-        rowID = result[0][1]
         old_location = result[0][0]
         if old_location == None:
           print("Location: N/A\n")
@@ -1325,11 +2502,7 @@ class System:
         location = input()
         # if valid input then update first exp in db
         if location:
-          self.cursor.execute(update_location, (location, username, rowID))
-          self.conn.commit()
-          # set profile to true in accounts table
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 1, 'location', location)
           print("\nSuccessfully Added Location to Profile")
         else:
           print("\nInvalid input. Please try again.")
@@ -1338,10 +2511,7 @@ class System:
         print("Enter A Location: ", end="")
         location = input()
         if location:
-          self.cursor.execute(insert_location, (username, location))
-          self.conn.commit()
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 1, 'location', location)
           print("\nSuccessfully Added Location to Profile")
         else:
           print("\nInvalid input. Please try again.")
@@ -1352,8 +2522,6 @@ class System:
       result = self.cursor.fetchall()
       # check if query isn't None
       if len(result) > 1: 
-        # get the rowID of second experience
-        rowID = result[1][1]
         old_location = result[1][0]
         if old_location == None:
           print("Location: N/A\n")
@@ -1364,11 +2532,7 @@ class System:
         location = input()
         # if valid input then update second exp in db
         if location:
-          self.cursor.execute(update_location, (location, username, rowID))
-          self.conn.commit()
-          # set profile to true in accounts table
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 2, 'location', location)
           print("\nSuccessfully Added Location to Profile")
         else:
           print("\nInvalid input. Please try again.")
@@ -1377,10 +2541,7 @@ class System:
         print("Enter A Location: ", end="")
         location = input()
         if location:
-          self.cursor.execute(insert_location, (username, location))
-          self.conn.commit()
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 2, 'location', location)
           print("\nSuccessfully Added Location to Profile")
         else:
           print("\nInvalid input. Please try again.")
@@ -1391,8 +2552,6 @@ class System:
       result = self.cursor.fetchall()
       # check if query isn't None
       if len(result) > 2: 
-        # get the rowID of third experience
-        rowID = result[2][1]
         old_location = result[2][0]
         if old_location == None:
           print("Location: N/A\n")
@@ -1403,11 +2562,7 @@ class System:
         location = input()
         # if valid input then update third exp in db
         if location:
-          self.cursor.execute(update_location, (location, username, rowID))
-          self.conn.commit()
-          # set profile to true in accounts table
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 3, 'location', location)
           print("\nSuccessfully Added Location to Profile")
         else:
           print("\nInvalid input. Please try again.")
@@ -1416,10 +2571,7 @@ class System:
         print("Enter A Location: ", end="")
         location = input()
         if location:
-          self.cursor.execute(insert_location, (username, location))
-          self.conn.commit()
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 3, 'location', location)
           print("\nSuccessfully Added Location to Profile")
         else:
           print("\nInvalid input. Please try again.")
@@ -1429,11 +2581,7 @@ class System:
   def edit_exp_description(self, section):
     username = self.user.userName
     # description queries
-    search_description = 'SELECT description, ROWID FROM experiences WHERE username = ?'
-    insert_description = 'INSERT INTO experiences (username, description) VALUES (?, ?)'
-    update_description = 'UPDATE experiences SET description = ? WHERE username = ? AND ROWID = ?'
-    # update profile 
-    update_profile = 'UPDATE accounts SET profile = True WHERE username = ?'
+    search_description = 'SELECT description FROM experiences WHERE username = ? ORDER BY ROWID'
 
     if section == "description1":
       print("""-------------------\nEditing Description\n-------------------\n""")
@@ -1441,8 +2589,6 @@ class System:
       result = self.cursor.fetchall()
       # check if query isn't None
       if result: 
-        # get the rowID of first experience
-        rowID = result[0][1]
         old_description = result[0][0]
         if old_description == None:
           print("Description: N/A\n")
@@ -1453,11 +2599,7 @@ class System:
         description = input()
         # if valid input then update first exp in db
         if description:
-          self.cursor.execute(update_description, (description, username, rowID))
-          self.conn.commit()
-          # set profile to true in accounts table
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 1, 'description', description)
           print("\nSuccessfully Added Description to Profile")
         else:
           print("\nInvalid input. Please try again.")
@@ -1466,10 +2608,7 @@ class System:
         print("Enter A Description: ", end="")
         description = input()
         if description:
-          self.cursor.execute(insert_description, (username, description))
-          self.conn.commit()
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 1, 'description', description)
           print("\nSuccessfully Added Description to Profile")
         else:
           print("\nInvalid input. Please try again.")
@@ -1480,8 +2619,6 @@ class System:
       result = self.cursor.fetchall()
       # check if query isn't None
       if len(result) > 1: 
-        # get the rowID of second experience
-        rowID = result[1][1]
         old_description = result[1][0]
         if old_description == None:
           print("Description: N/A\n")
@@ -1492,11 +2629,7 @@ class System:
         description = input()
         # if valid input then update second exp in db
         if description:
-          self.cursor.execute(update_description, (description, username, rowID))
-          self.conn.commit()
-          # set profile to true in accounts table
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 2, 'description', description)
           print("\nSuccessfully Added Description to Profile")
         else:
           print("\nInvalid input. Please try again.")
@@ -1505,10 +2638,7 @@ class System:
         print("Enter A Desciption: ", end="")
         description = input()
         if description:
-          self.cursor.execute(insert_description, (username, description))
-          self.conn.commit()
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 2, 'description', description)
           print("\nSuccessfully Added Description to Profile")
         else:
           print("\nInvalid input. Please try again.")
@@ -1519,8 +2649,6 @@ class System:
       result = self.cursor.fetchall()
       # check if query isn't None
       if len(result) > 2: 
-        # get the rowID of third experience
-        rowID = result[2][1]
         old_description = result[2][0]
         if old_description == None:
           print("Description: N/A\n")
@@ -1531,11 +2659,7 @@ class System:
         description = input()
         # if valid input then update third exp in db
         if description:
-          self.cursor.execute(update_description, (description, username, rowID))
-          self.conn.commit()
-          # set profile to true in accounts table
-          self.cursor.execute(update_profile, (username,))
-          self.conn.commit()
+          self.writeExperience(username, 3, 'description', description)
           print("\nSuccessfully Added Description to Profile")
         else:
           print("\nInvalid input. Please try again.")
@@ -1544,41 +2668,323 @@ class System:
         print("Enter A Description: ", end="")
         description = input()
         if description:
-          self.cursor.execute(insert_description, (username, description))
-          self.conn.commit()
-          self.cursor.execute(update_profile, (username,))
+          self.writeExperience(username, 3, 'description', description)
+          print("\nSuccessfully Added Description to Profile")
+        else:
+          print("\nInvalid input. Please try again.")
+      self.description3Menu.start()
+
+  
+  def encryption(self, password):
+    sha256 = hashlib.sha256()
+    sha256.update(password.encode('utf-8'))
+    hashed_pass = sha256.hexdigest()
+    return hashed_pass
+
+  def deleteTable(self):
+    print("Are You Sure You Want To Delete The Current Accounts In The Database? This Operation Cannot Be Undone.(Y/N): ")
+    confirm = input()
+    if confirm.upper() == "Y":
+      self.cursor.execute("DROP TABLE IF EXISTS accounts")
+      self.conn.commit()
+      print("Table Deleted Successfully.")
+    else:
+      print("Deletion Operation Canceled.")
+  
+  def printTable(self):
+    # rows are printed as they are read rather than loaded all at once
+    rows = self.conn.execute("SELECT * FROM accounts")
+    row = rows.fetchone()
+    if row:
+      print("Username\tPassword")
+      while row:
+        print(f"{row[0]}\t\t{row[1]}")
+        row = rows.fetchone()
+    else:
+        print("No Records Found In The Table.")
+
+  @classmethod
+  def fromTemplate(cls, template, database=":memory:"):
+    """
+    Creates a system whose database starts as a copy of a template database, 
+    by default in memory so the copy is isolated from other systems and fast to create.
+
+    Args:
+      template: A database file, a connection (ex. a snapshot), or a system whose database is copied.
+      database (str): The database the template is copied to, see System.
+    """
+    if isinstance(template, System):
+      template = template.conn
+    return cls(database, template=template)
+
+  @staticmethod
+  def copyDatabase(source, target):
+    """Copies the whole database of the source, a database file or connection, into the target connection."""
+    if isinstance(source, sqlite3.Connection):
+      source.backup(target)
+    else:
+      sourceConn = sqlite3.connect(source, uri=source.startswith("file:"))
+      try:
+        sourceConn.backup(target)
+      finally:
+        sourceConn.close()
+
+  def backup(self, path, pages=BACKUP_PAGES, sleep=BACKUP_SLEEP, progress=None):
+    """
+    Copies the database to a file while it stays in use. The copy is made a few pages at a time
+    and the database is only locked while a step is copied, so other sessions can keep reading and writing.
+    Pages changed by other connections during the backup are copied again, so the file is a consistent copy.
+
+    Args:
+      path (str): The backup file, replaced if it exists.
+      pages (int): The number of pages copied per step, -1 copies the whole database in one step.
+      sleep (float): The number of seconds waited between steps.
+      progress (function): Called as progress(status, remaining, total) after each step.
+    """
+    target = sqlite3.connect(path)
+    try:
+      self.conn.backup(target, pages=pages, progress=progress, sleep=sleep)
+    finally:
+      target.close()
+
+  def snapshot(self):
+    """Returns an in memory copy of the database, which restore can return the database to."""
+    target = sqlite3.connect(":memory:")
+    self.conn.backup(target)
+    return target
+
+  def restore(self, source):
+    """
+    Replaces the whole database with a backup file or snapshot. Uncommitted changes and unsaved settings changes are discarded,
+    and every cache derived from the database is cleared since it may not match the restored data.
+    Each of the JOURNALED_TABLES is journaled as a whole table change, numbered after the last change made before
+    the restore, so other systems sharing the database clear their caches too.
+
+    Args:
+      source: The path of a backup file or a snapshot connection.
+    """
+    latestChange = "SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'changes'), 0)"
+    self.conn.rollback()
+    latest = self.conn.execute(latestChange).fetchone()[0]
+    self.copyDatabase(source, self.conn)
+    latest = max(latest, self.conn.execute(latestChange).fetchone()[0])
+    changes = [(latest + n, tableName) for n, tableName in enumerate(JOURNALED_TABLES, start=1)]
+    self.write(lambda: self.cursor.executemany("INSERT INTO changes (changeID, tableName, key) VALUES (?, ?, NULL)", changes))
+    self.lastChange = changes[-1][0]
+    self.settings.clear()
+    self.clearCaches()
+
+  @staticmethod
+  def transferFormat(path, fmt=None):
+    """Returns the bulk transfer format given, or the one named by the file's extension. Raises ValueError if it is unsupported."""
+    fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+    if fmt not in TRANSFER_FORMATS:
+      raise ValueError(f"Unsupported format: {fmt}")
+    return fmt
+
+  def tableColumns(self, tableName):
+    """Returns the names of the table's columns. Raises ValueError if the table can't be transferred."""
+    if tableName not in TRANSFER_TABLES:
+      raise ValueError(f"Unsupported table: {tableName}")
+    self.cursor.execute(f"PRAGMA table_info({tableName})")
+    return [column[1] for column in self.cursor.fetchall()]
+
+  def exportTable(self, tableName, path, fmt=None):
+    """
+    Writes every row of the table to a CSV or JSONL file, streaming the rows so memory use
+    does not grow with the table. NULL values are written as empty CSV fields.
+
+    Args:
+      tableName (str): One of the TRANSFER_TABLES.
+      path (str): The file written.
+      fmt (str): csv or jsonl, the default is the file's extension.
+
+    Returns:
+      The number of rows written.
+    """
+    fmt = self.transferFormat(path, fmt)
+    columns = self.tableColumns(tableName)
+    # a separate cursor so other queries made while exporting don't interrupt the rows
+    rows = self.conn.execute(f"SELECT {', '.join(columns)} FROM {tableName}")
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+      if fmt == 'csv':
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        for row in rows:
+          writer.writerow(row)
+          count += 1
+      else:
+        for row in rows:
+          file.write(json.dumps(dict(zip(columns, row))) + '\n')
+          count += 1
+    return count
+
+  @staticmethod
+  def readRows(path, fmt):
+    """Generates the rows of a CSV or JSONL file as dictionaries, one line at a time. Empty CSV fields are read as None."""
+    with open(path, newline='', encoding='utf-8') as file:
+      if fmt == 'csv':
+        for row in csv.DictReader(file):
+          yield {column: (value if value != '' else None) for column, value in row.items()}
+      else:
+        for line in file:
+          if line.strip():
+            yield json.loads(line)
+
+  def importTable(self, tableName, path, fmt=None, chunkSize=IMPORT_CHUNK_SIZE):
+    """
+    Inserts the rows of a CSV or JSONL file into the table. Rows are streamed from the file
+    and inserted with executemany, committing every chunkSize rows, so memory use does not grow with the file.
+    The file may hold any of the table's columns, the columns are taken from the CSV header or the first JSONL row.
+    Imported account settings replace the default settings created for the imported accounts.
+
+    Account passwords are stored hashed, so an imported password that isn't already a SHA-256 hex digest
+    (as written by exportTable) is hashed with encryption before it is inserted.
+
+    The import doesn't change the schema, the table's triggers and indexes are kept up to date for every row,
+    so other connections can keep using the database: rows they add during the import still get their settings,
+    profile documents and journal entries, and their reads keep their indexes.
+    If a row can't be inserted, the rows of its chunk are rolled back and the error is raised,
+    the chunks already committed are kept.
+
+    Args:
+      tableName (str): One of the TRANSFER_TABLES.
+      path (str): The file read.
+      fmt (str): csv or jsonl, the default is the file's extension.
+      chunkSize (int): The number of rows inserted per transaction.
+
+    Returns:
+      The number of rows imported.
+    """
+    fmt = self.transferFormat(path, fmt)
+    tableColumns = self.tableColumns(tableName)
+    rows = self.readRows(path, fmt)
+    first = next(rows, None)
+    if first is None:
+      return 0
+    columns = list(first)
+    unknown = [column for column in columns if column not in tableColumns]
+    if unknown:
+      raise ValueError(f"Unknown {tableName} columns: {', '.join(unknown)}")
+    conflict = "OR REPLACE " if tableName == 'account_settings' else ""
+    insert = f"INSERT {conflict}INTO {tableName} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    values = (tuple(row.get(column) for column in columns) for row in itertools.chain((first,), rows))
+    if tableName == 'accounts' and 'password' in columns:
+      values = map(self.importedPassword(columns.index('password')), values)
+    count = 0
+    try:
+      while True:
+        chunk = list(itertools.islice(values, chunkSize))
+        if not chunk:
+          break
+        try:
+          self.cursor.executemany(insert, chunk)
           self.conn.commit()
-          print("\nSuccessfully Added Description to Profile")
-        else:
-          print("\nInvalid input. Please try again.")
-      self.description3Menu.start()
+        except sqlite3.Error:
+          self.conn.rollback()
+          raise
+        count += len(chunk)
+    finally:
+      if tableName == 'accounts':
+        self.rebuildUsernames()
+    return count
 
-  
-  def encryption(self, password):
-    sha256 = hashlib.sha256()
-    sha256.update(password.encode('utf-8'))
-    hashed_pass = sha256.hexdigest()
-    return hashed_pass
+  def importedPassword(self, position):
+    """Returns a function hashing the password at the position of an imported accounts row, unless it is already hashed."""
+    def hashPassword(row):
+      password = row[position]
+      if password is None or PASSWORD_DIGEST.fullmatch(password):
+        return row
+      return row[:position] + (self.encryption(password),) + row[position + 1:]
+    return hashPassword
 
-  def deleteTable(self):
-    print("Are You Sure You Want To Delete The Current Accounts In The Database? This Operation Cannot Be Undone.(Y/N): ")
-    confirm = input()
-    if confirm.upper() == "Y":
-      self.cursor.execute("DROP TABLE IF EXISTS accounts")
-      self.conn.commit()
-      print("Table Deleted Successfully.")
-    else:
-      print("Deletion Operation Canceled.")
-  
-  def printTable(self):
-    self.cursor.execute("SELECT * FROM accounts")
-    rows = self.cursor.fetchall()
-    if rows:
-      print("Username\tPassword")
-      for row in rows:
-        print(f"{row[0]}\t\t{row[1]}")
+  def exportData(self, directory, fmt='csv'):
+    """
+    Exports each of the TRANSFER_TABLES to a {table}.{fmt} file in the directory.
+
+    Returns:
+      A dictionary of the number of rows exported from each table.
+    """
+    fmt = self.transferFormat('', fmt)
+    os.makedirs(directory, exist_ok=True)
+    return {table: self.exportTable(table, os.path.join(directory, f"{table}.{fmt}"), fmt) for table in TRANSFER_TABLES}
+
+  def importData(self, directory, fmt='csv'):
+    """
+    Imports the {table}.{fmt} file of each of the TRANSFER_TABLES found in the directory, 
+    referenced tables are imported first.
+
+    Returns:
+      A dictionary of the number of rows imported into each table with a file.
+    """
+    fmt = self.transferFormat('', fmt)
+    counts = {}
+    for table in TRANSFER_TABLES:
+      path = os.path.join(directory, f"{table}.{fmt}")
+      if os.path.exists(path):
+        counts[table] = self.importTable(table, path, fmt)
+    return counts
+
+  def rowCount(self, tableName, owner=''):
+    """
+    Returns the number of rows in the table from the counters table, maintained by triggers on the table.
+
+    Args:
+      tableName (str): The counted table.
+      owner (str): A username to count only that user's rows (ex. a poster's jobs). The default counts the whole table.
+    """
+    self.cursor.execute("SELECT count FROM counters WHERE name = ? AND owner = ?", (tableName, owner))
+    count = self.cursor.fetchone()
+    if count:
+      return count[0]
+    # users without a counter have no rows, tables without a counter are counted
+    return 0 if owner else self.countRows(tableName)
+
+  def recountRows(self):
+    """Resets the counters from the accounts and jobs tables, used when the counters can't be trusted (ex. after a migration)."""
+    recount = """
+    DELETE FROM counters;
+    INSERT INTO counters (name, owner, count) SELECT 'accounts', '', COUNT(*) FROM accounts;
+    INSERT INTO counters (name, owner, count) SELECT 'jobs', '', COUNT(*) FROM jobs;
+    INSERT INTO counters (name, owner, count) SELECT 'jobs', poster, COUNT(*) FROM jobs WHERE poster IS NOT NULL GROUP BY poster;
+    """
+    self.cursor.executescript(recount)
+    self.conn.commit()
+
+  def setQuota(self, tableName, maxRows, owner=''):
+    """
+    Sets the maximum number of rows of a table.
+
+    Args:
+      tableName (str): The limited table.
+      maxRows (int): The maximum number of rows, None removes the quota.
+      owner (str): '' limits the whole table, '*' limits the rows of each user, 
+        and a username sets that user's limit in place of the '*' limit.
+    """
+    if maxRows is None:
+      self.cursor.execute("DELETE FROM quotas WHERE name = ? AND owner = ?", (tableName, owner))
     else:
-        print("No Records Found In The Table.")
+      upsert = """
+      INSERT INTO quotas (name, owner, maxRows) VALUES (?, ?, ?) ON CONFLICT (name, owner) DO UPDATE SET maxRows = excluded.maxRows
+      """
+      self.cursor.execute(upsert, (tableName, owner, maxRows))
+    self.conn.commit()
+
+  def quotaReached(self, tableName, owner=None):
+    """
+    Returns True if another row can't be added to the table without exceeding its quota,
+    or exceeding the owner's quota when an owner is given.
+    """
+    self.cursor.execute("SELECT owner, maxRows FROM quotas WHERE name = ? AND owner IN ('', '*', ?)", (tableName, owner or ''))
+    limits = dict(self.cursor.fetchall())
+    if '' in limits and self.rowCount(tableName) >= limits['']:
+      return True
+    if owner:
+      limit = limits.get(owner, limits.get('*'))
+      if limit is not None and self.rowCount(tableName, owner) >= limit:
+        return True
+    return False
 
   def countRows(self,tableName):
     ##Current Number of Accounts
@@ -1633,9 +3039,7 @@ class System:
     return True
     
   def validateUserName(self, userName): # validate Username
-      self.cursor.execute("SELECT * FROM accounts WHERE username=?", (userName,))
-      exists_user = self.cursor.fetchone()
-      if exists_user:
+      if self.usernameTaken(userName):
         print("Username Has Been Taken.")
         return False
        #arbitrary limit 
@@ -1650,10 +3054,14 @@ class System:
       userName = input()
       print("Enter Password: ", end="")
       password = input()
+      ## Throttle attempts before looking up the account, a token is only taken if both the username and origin allow it
+      if not self.allowLogin(userName):
+        print("Too Many Login Attempts, Please Try Again Later.")
+        return
       ##Validate User Name and Password then Search
-      acc_fields = 'username, password, fName, lName, university, major, email, sms, targetedAds, language'
+      acc_fields = 'username, password, fName, lName, university, major'
       select_account = f"""
-        SELECT {acc_fields} FROM accounts NATURAL JOIN account_settings WHERE username = (?)
+        SELECT {acc_fields} FROM accounts WHERE username = (?)
       """
       self.cursor.execute(select_account, (userName,)) 
       #? is placeholder for username
@@ -1662,28 +3070,134 @@ class System:
         hashed_inputpass = self.encryption(password)
         if hashed_inputpass == account[1]:
           print("You Have Successfully Logged In!")
+          # the settings are read once per session, later logins in the session reuse them
+          settings = self.settings.load(userName)
           self.user.login(userName,
                           fName=account[2],
                           lName=account[3], 
                           university=account[4],
                           major=account[5],
-                          email=account[6], 
-                          sms=account[7], 
-                          targetedAds=account[8], 
-                          language=account[9])          
+                          **settings)          
+          self.createSession()
           return self.home_page
         else:
           print("Invalid Username/Password, Try Again!")
       else:
         print("Account Not Found, Check Username/Password.")
 
+  def allowLogin(self, userName):
+    """Returns True and takes a login attempt from the username's and origin's buckets, or False if either is empty."""
+    now = time.monotonic()
+    if not self.userLoginLimiter.available(userName, now):
+      self.userLoginLimiter.blocked += 1
+      return False
+    if not self.originLoginLimiter.take(self.origin, now):
+      return False
+    return self.userLoginLimiter.take(userName, now)
+
+  def metrics(self):
+    """Returns the statistics of the system's caches and limiters for monitoring, as a dictionary."""
+    return {'profileCache': self.profileCache.stats(),
+            'jobCandidates': self.jobMatcher.candidates.stats(),
+            'userLogins': self.userLoginLimiter.stats(),
+            'originLogins': self.originLoginLimiter.stats(),
+            'writes': self.writer.stats()}
+
+  def signSession(self, sessionID, username, expires):
+    """Returns the signature of a session, which ties the session's ID to its user and expiry."""
+    message = f"{sessionID}:{username}:{expires!r}".encode('utf-8')
+    return hmac.new(self.sessionKey, message, hashlib.sha256).hexdigest()
+
+  def sessionData(self):
+    """Returns the logged in user's account and settings fields, as stored with their session."""
+    fields = ('fName', 'lName', 'university', 'major', 'email', 'sms', 'targetedAds', 'language')
+    return json.dumps({field: getattr(self.user, field) for field in fields})
+
+  def createSession(self):
+    """
+    Starts a login session for the logged in user that can be resumed until it expires,
+    and returns its token. The token is the session's ID and a signature of the session.
+    """
+    sessionID = secrets.token_hex(16)
+    expires = time.time() + SESSION_TTL
+    insert = "INSERT INTO sessions (sessionID, username, expires, data) VALUES (?, ?, ?, ?)"
+    self.write(lambda: self.cursor.execute(insert, (sessionID, self.user.userName, expires, self.sessionData())))
+    self.sessionToken = f"{sessionID}.{self.signSession(sessionID, self.user.userName, expires)}"
+    return self.sessionToken
+
+  def saveSession(self):
+    """Stores the logged in user's current settings with their session, so resuming it restores them."""
+    if self.sessionToken is not None and self.user.loggedOn:
+      sessionID = self.sessionToken.split('.')[0]
+      update = "UPDATE sessions SET data = ? WHERE sessionID = ?"
+      self.write(lambda: self.cursor.execute(update, (self.sessionData(), sessionID)))
+
+  def resumeSession(self, token=None):
+    """
+    Logs the user back in from a session token without reading the accounts tables or hashing a password.
+
+    Args:
+      token (str): The session token, the default is the token of the last login.
+    """
+    token = token or self.sessionToken
+    sessionID, _, signature = (token or '').partition('.')
+    self.cursor.execute("SELECT username, expires, data FROM sessions WHERE sessionID = ?", (sessionID,))
+    session = self.cursor.fetchone()
+    if (session is None or session[1] <= time.time()
+        # compared as bytes, a signature with non ASCII characters is then a mismatch instead of a TypeError
+        or not hmac.compare_digest(signature.encode('utf-8'), self.signSession(sessionID, session[0], session[1]).encode('utf-8'))):
+      if token == self.sessionToken:
+        self.sessionToken = None
+      print("Your Session Has Expired, Please Log In Again.")
+      return
+    data = json.loads(session[2])
+    self.settings.seed(session[0], data)
+    self.user.login(session[0], **data)
+    self.sessionToken = token
+    print("You Have Successfully Logged In!")
+    return self.home_page
+
+  def endSession(self, token=None):
+    """Removes a session so it can no longer be resumed, the default is the session of the last login."""
+    token = token or self.sessionToken
+    if token:
+      self.write(lambda: self.cursor.execute("DELETE FROM sessions WHERE sessionID = ?", (token.split('.')[0],)))
+      if token == self.sessionToken:
+        self.sessionToken = None
+
+  def reapSessions(self, force=False):
+    """
+    Removes the expired sessions, at most once every SESSION_REAP_INTERVAL seconds unless forced.
+    If the database stays busy the sessions are left to be removed by the next call.
+    """
+    now = time.time()
+    if force or now - self.sessionsReaped >= SESSION_REAP_INTERVAL:
+      def reap():
+        self.cursor.execute("DELETE FROM sessions WHERE expires <= ?", (now,))
+        reaped = self.cursor.rowcount
+        self.pruneChanges()  # the change journal is kept short on the same schedule
+        return reaped
+      try:
+        reaped = self.write(reap)
+      except DatabaseBusyError:
+        return
+      self.sessionsReaped = now
+      if self.sessionToken is not None and reaped:
+        self.cursor.execute("SELECT 1 FROM sessions WHERE sessionID = ?", (self.sessionToken.split('.')[0],))
+        if self.cursor.fetchone() is None:
+          self.sessionToken = None
+
   def register(self):
-    ## Set Account Limit (now 10)
-    if self.countRows("accounts") >= 10:
+    ## Account Limit (10 by default, see the quotas table)
+    if self.quotaReached("accounts"):
       print("Maximum Number Of Accounts Created!")
       return
     print("Enter Username: ", end="")
     username = input()
+    # the username is checked before the other details are asked for
+    if not self.validateUserName(username):
+      print("Account Creation Failed.")
+      return
     print("Enter First Name: ", end="")
     fName = input()
     print("Enter Last Name: ", end="")
@@ -1697,10 +3211,24 @@ class System:
     print("Confirm Password: ", end="")
     passwordCheck = input()
     ## Validate Inputs
-    if self.validatePassword(password,passwordCheck) and self.validateUserName(username) and self.validName(fName,lName):
+    if self.validatePassword(password,passwordCheck) and self.validName(fName,lName):
       encrypted_pass = self.encryption(password)
-      self.cursor.execute("INSERT INTO accounts (username, password,fName,lName,university,major,profile) VALUES (?, ?, ?, ?, ?, ?, ?)", (username, encrypted_pass,fName,lName,university,major,False))
-      self.conn.commit() #saving new account to database
+      # check the limit again with the database locked, in case another account was created during the prompts,
+      # the insert does nothing if the username was taken during the prompts
+      def insert():
+        if self.quotaReached("accounts"):
+          return "Maximum Number Of Accounts Created!"
+        self.cursor.execute("""
+          INSERT INTO accounts (username, password,fName,lName,university,major,profile) VALUES (?, ?, ?, ?, ?, ?, ?)
+          ON CONFLICT (username) DO NOTHING RETURNING username
+        """, (username, encrypted_pass,fName,lName,university,major,False))
+        if self.cursor.fetchone() is None:
+          return "Username Has Been Taken.\nAccount Creation Failed."
+      failure = self.write(insert, immediate=True) #saving new account to database
+      if failure:
+        print(failure)
+        return
+      self.addUsername(username)
       print("Account created successfully.")
       return self.login
     else:
@@ -1708,8 +3236,9 @@ class System:
     return
 
   def postJob(self):
-    ## Set Account Limit
-    if self.countRows("jobs") >= 5:
+    ## Job Limit (5 by default, see the quotas table)
+    poster = self.user.userName if self.user.loggedOn else None
+    if self.quotaReached("jobs", poster):
       print("Maximum Number Of Jobs Posts Created!")
       return
     print("Enter Title: ")
@@ -1724,14 +3253,163 @@ class System:
     salary = input()
     ## Validate Inputs
     if self.validString("Title",title) and self.validString("Description",description) and self.validString("Employer",employer)and self.validString("Location",location) and self.validPosNum("Salary",salary):
-      self.cursor.execute("INSERT INTO jobs (title, description,employer,location,salary,posterFirstName,posterLastName) VALUES (?, ?, ?, ?, ?, ?, ?)", (title, description,employer,location,salary,self.user.fName,self.user.lName))
-      self.conn.commit() #saving new account to database
+      def insert():
+        if self.quotaReached("jobs", poster):
+          return False
+        self.cursor.execute("INSERT INTO jobs (title, description,employer,location,salary,poster) VALUES (?, ?, ?, ?, ?, ?)", (title, description,employer,location,salary,poster))
+        return True
+      if not self.write(insert, immediate=True): #saving new job to database
+        print("Maximum Number Of Jobs Posts Created!")
+        return
+      if len(self.jobMatcher):
+        self.jobMatcher.add(self.cursor.lastrowid, title, description, employer, location)
       print("Job Posted Successfully.")
       return 
     else:
       print("Job Posting Creation Failed.")
     return
 
+  def browseJobs(self):
+    """Displays all job postings, newest first."""
+    return self.searchJobs({})
+
+  def recommendJobs(self):
+    """Displays the job postings that best match the user's profile, best match first."""
+    words = self.candidateWords(self.user.userName)
+    if not words:
+      print("Add A Title, Education Or Experience To Your Profile To Get Recommendations.")
+    ranked = [jobID for score, jobID in self.jobMatcher.recommend(words)]
+    rank = {jobID: position for position, jobID in enumerate(ranked)}
+    def fetch(afterKey, limit):
+      start = 0 if afterKey is None else afterKey + 1
+      jobs = self.fetchJobsPage({'jobIDs': ranked[start:start + limit]}, None, limit)
+      return sorted(jobs, key=lambda job: rank[job.ID])
+    self.jobsPager = Pager(fetch, key=lambda job: rank[job.ID])
+    self.jobsHeading = "Recommended Jobs"
+    return self.job_results_menu
+
+  def syncJobMatcher(self):
+    """Indexes every job posting if the job matcher's index is out of step with the jobs table."""
+    if len(self.jobMatcher) != self.rowCount("jobs"):
+      self.jobMatcher.clear()
+      self.cursor.execute("SELECT jobID, title, description, employer, location FROM jobs")
+      for jobID, *fields in self.cursor.fetchall():
+        self.jobMatcher.add(jobID, *fields)
+
+  def candidateWords(self, userName):
+    """
+    Returns a Counter of the words in the user's profile title, about, education and experiences, 
+    after bringing the job matcher's index up to date. The words are cached until the user's profile changes.
+    """
+    self.syncJobMatcher()
+    words = self.jobMatcher.candidates.get(userName)
+    if words is None:
+      words = Counter()
+      result = self.cachedProfile(userName)
+      if result is not None:
+        userProfile = result[1]
+        words.update(JobMatcher.tokenize(userProfile.headline, userProfile.about,
+                                         userProfile.education.university, userProfile.education.major))
+        for exp in userProfile.experiences:
+          words.update(JobMatcher.tokenize(exp.title, exp.employer, exp.description))
+      self.jobMatcher.candidates.put(userName, words)
+    return words
+
+  def promptJobSearch(self):
+    """Prompts the user for job search filters and displays the matching job postings."""
+    print("Leave A Filter Blank To Skip It.\n")
+    prompts = [('text', 'Enter Keywords: '),
+               ('employer', 'Enter Employer: '),
+               ('location', 'Enter Location: '),
+               ('minSalary', 'Enter Minimum Salary: '),
+               ('maxSalary', 'Enter Maximum Salary: ')]
+    filters = {}
+    for name, prompt in prompts:
+      print(prompt, end="")
+      value = input().strip()
+      if value:
+        filters[name] = value
+    for name, label in (('minSalary', 'Minimum Salary'), ('maxSalary', 'Maximum Salary')):
+      if name in filters:
+        if not self.validPosNum(label, filters[name]):
+          print("Job Search Failed.")
+          return
+        filters[name] = int(filters[name])
+    return self.searchJobs(filters)
+
+  def searchJobs(self, filters):
+    """
+    Creates a pager over the job postings matching the filters and returns the job results menu.
+
+    Args:
+      filters (dict): Any of text (keywords matched against title and description), 
+        employer, location, minSalary, maxSalary and jobIDs (a list of the postings to include).
+    """
+    self.jobsPager = Pager(lambda afterKey, limit: self.fetchJobsPage(filters, afterKey, limit), key=lambda job: job.ID)
+    self.jobsHeading = "Job Postings"
+    return self.job_results_menu
+
+  def fetchJobsPage(self, filters, afterKey, limit):
+    """
+    Fetches a page of job postings matching the filters, newest first.
+    Keyword searches use the full text index, the other filters use the jobs table indexes.
+
+    Args:
+      filters (dict): The search filters, see searchJobs.
+      afterKey (int): Only postings older than the posting with this ID are returned, None for the first page.
+      limit (int): The maximum number of postings returned.
+    """
+    conditions = []
+    params = []
+    if filters.get('text'):
+      # quote each word so user input can't be parsed as full text query syntax, and match word prefixes
+      words = re.findall(r"\w+", filters['text'])
+      if words:
+        conditions.append("jobID IN (SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH ?)")
+        params.append(' '.join(f'"{word}"*' for word in words))
+    if filters.get('employer'):
+      conditions.append("jobs.employer = ? COLLATE NOCASE")
+      params.append(filters['employer'])
+    if filters.get('location'):
+      conditions.append("jobs.location = ? COLLATE NOCASE")
+      params.append(filters['location'])
+    if filters.get('minSalary') is not None:
+      conditions.append("jobs.salary >= ?")
+      params.append(filters['minSalary'])
+    if filters.get('maxSalary') is not None:
+      conditions.append("jobs.salary <= ?")
+      params.append(filters['maxSalary'])
+    if filters.get('jobIDs') is not None:
+      conditions.append(f"jobID IN ({','.join('?' * len(filters['jobIDs']))})")
+      params.extend(filters['jobIDs'])
+    if afterKey is not None:
+      conditions.append("jobID < ?")
+      params.append(afterKey)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    # the poster's name is read from their account
+    query = f"""
+    SELECT jobID, jobs.title, jobs.description, jobs.employer, jobs.location, jobs.salary, fName, lName, poster, created 
+    FROM jobs LEFT JOIN accounts ON accounts.username = jobs.poster
+    {where} ORDER BY jobID DESC LIMIT ?"""
+    self.cursor.execute(query, (*params, limit))
+    return [
+      Jobs(title, employer, location, salary, fName, lName, description=desc, ID=jobID, poster=poster, created=created)
+      for jobID, title, desc, employer, location, salary, fName, lName, poster, created in self.cursor.fetchall()
+    ]
+
+  def populateJobSelections(self):
+    """Populates the job results menu with selections for the current page of job postings."""
+    self.populatePagedSelections(
+      self.jobResultsMenu,
+      self.jobsPager,
+      lambda job: f"{job.title} - {job.employer} ({job.location})",
+      lambda job: self.quick_menu(job.details())
+    )
+    if self.jobsPager.page():
+      self.jobResultsMenu.setOpening(f"{self.jobsHeading} (Page {self.jobsPager.pageNumber()}):")
+    else:
+      self.jobResultsMenu.setOpening("No Job Postings Found.")
+
   #This is the function to find someone they know in the system
   def findUser(self):
     #Prompts for searching by first name and last name
@@ -1742,10 +3420,10 @@ class System:
     # Validate
     if(self.validName(fName,lName)):
         # Search for the user in the database
-        self.cursor.execute("SELECT * FROM accounts WHERE UPPER(fName) = UPPER(?) AND UPPER(lName) = UPPER(?)", (fName, lName))
-        result = self.cursor.fetchall()
+        self.cursor.execute("SELECT 1 FROM accounts WHERE lName = ? COLLATE NOCASE AND fName = ? COLLATE NOCASE", (lName, fName))
+        result = self.cursor.fetchone()
         ## If the user is found, print 
-        if len(result) > 0:
+        if result is not None:
             print("They Are Part Of The InCollege System.")
             return self.join_menu
         else:
@@ -1757,68 +3435,64 @@ class System:
   def setUserEmail(self):
     """
     Toggles the user's email setting between True (ON) and False (OFF). 
-    If an exception occurs when updating the DB then no change is made, 
-    and a message is displayed informing the user to try again later.
+    The change is saved with the user's other setting changes, see flushSettings.
     """
-    username = self.user.userName
     newEmail = not self.user.email
-    update = 'UPDATE account_settings SET email = ? WHERE username = ?'
-    try:
-      self.cursor.execute(update, (newEmail, username))
-      self.conn.commit()
-      self.user.email = newEmail
-    except Exception:
-      print(MSG_ERR_RETRY)
+    self.changeSetting('email', newEmail)
+    self.user.email = newEmail
 
   def setUserSMS(self):
     """
     Toggles the user's sms setting between True (ON) and False (OFF). 
-    If an exception occurs when updating the DB then no change is made, 
-    and a message is displayed informing the user to try again later.
+    The change is saved with the user's other setting changes, see flushSettings.
     """
-    username = self.user.userName
     newSMS = not self.user.sms
-    update = 'UPDATE account_settings SET sms = ? WHERE username = ?'
-    try:
-      self.cursor.execute(update, (newSMS, username))
-      self.conn.commit()
-      self.user.sms = newSMS
-    except Exception:
-      print(MSG_ERR_RETRY)
+    self.changeSetting('sms', newSMS)
+    self.user.sms = newSMS
 
   def setUserTargetedAds(self):
     """
     Toggles the user's targeted advertising setting between True (ON) and False (OFF). 
-    If an exception occurs when updating the DB then no change is made, 
-    and a message is displayed informing the user to try again later.
+    The change is saved with the user's other setting changes, see flushSettings.
     """
-    username = self.user.userName
     newtargetedAds = not self.user.targetedAds
-    update = 'UPDATE account_settings SET targetedAds = ? WHERE username = ?'
-    try:
-      self.cursor.execute(update, (newtargetedAds, username))
-      self.conn.commit()
-      self.user.targetedAds = newtargetedAds
-    except Exception:
-      print(MSG_ERR_RETRY)
+    self.changeSetting('targetedAds', newtargetedAds)
+    self.user.targetedAds = newtargetedAds
 
   def setUserLanguage(self, language):
     """
     Sets the user's language setting to the specified language. 
-    If an exception occurs when updating the DB then no change is made, 
-    and a message is displayed informing the user to try again later.
+    The change is saved with the user's other setting changes, see flushSettings.
     
     Args:
       language (str): A language from the system's LANGUAGES list.
     """
-    uName = self.user.userName
-    update = 'UPDATE account_settings SET language = ? WHERE username = ?' 
-    try:
-        self.cursor.execute(update, (language, uName))
-        self.conn.commit()
-        self.user.language = language
-    except Exception:
+    self.changeSetting('language', language)
+    self.user.language = language
+
+  def changeSetting(self, field, value):
+    """Records a change to the logged in user's settings, guests' settings are not saved."""
+    if self.user.loggedOn:
+      self.settings.set(self.user.userName, field, value)
+
+  def flushSettings(self):
+    """
+    Saves the users' setting changes in one write. If the changes can't be saved they are kept 
+    to be saved by the next flush, and a message is displayed informing the user to try again later.
+    Once SETTINGS_FLUSH_ATTEMPTS flushes in a row have failed the changes are discarded, the user is told
+    and the logged in user's settings are read from the database again.
+    """
+    if not self.settings.flush():
+      if self.settings.pending:
         print(MSG_ERR_RETRY)
+      else:
+        print(MSG_SETTINGS_DROPPED)
+        self.reloadSettings(None)
+
+  def flushSettingsIfDue(self):
+    """Saves the users' setting changes if the oldest is SETTINGS_FLUSH_INTERVAL seconds old, run before each menu step."""
+    if self.settings.due():
+      self.flushSettings()
 
   def loadSentFriends(self):
     """
@@ -1833,7 +3507,7 @@ class System:
     result = self.cursor.fetchall()
     # iterate over the results and create a dictionary mapping each username to an initialized user object
     self.user.sentRequests = {
-      uName: User(uName, fName, lName) for uName, fName, lName in result
+      uName: UserRef(uName, fName, lName) for uName, fName, lName in result
     }
 
   def loadReceivedFriends(self):
@@ -1849,7 +3523,7 @@ class System:
     result = self.cursor.fetchall()
     # iterate over the results and create a dictionary mapping each username to an initialized user object
     self.user.receivedRequests = {
-      uName: User(uName, fName, lName) for uName, fName, lName in result
+      uName: UserRef(uName, fName, lName) for uName, fName, lName in result
     }
     # return length of dictionary to determine if
     # pending request message and number is displayed
@@ -1861,22 +3535,23 @@ class System:
     """
     query = """
     SELECT username, fName, lName, profile FROM accounts WHERE username IN (
-      SELECT CASE WHEN sender = ? THEN receiver ELSE sender END AS friend 
-      FROM friends WHERE ? in (sender, receiver) AND status = ?
-      GROUP BY friend
+      SELECT receiver FROM friends WHERE sender = ? AND status = ?
+      UNION ALL
+      SELECT sender FROM friends WHERE receiver = ? AND status = ?
     )
     """
     username = self.user.userName
-    params = (username, username, 'accepted')
+    params = (username, 'accepted', username, 'accepted')
     self.cursor.execute(query, params)
     result = self.cursor.fetchall()
     # iterate over the results and create a dictionary mapping each username to an initialized user object
+    # friends with a profile get a lazy profile that is only fetched once viewed
     self.user.acceptedRequests = {}
     for uName, fName, lName, bprofile in result:
       if bprofile:
-        self.user.acceptedRequests[uName] = User(uName, fName, lName, Profile=profile())
+        self.user.acceptedRequests[uName] = UserRef(uName, fName, lName, Profile=self.lazyFriendProfile(uName))
       else:
-        self.user.acceptedRequests[uName] = User(uName, fName, lName) 
+        self.user.acceptedRequests[uName] = UserRef(uName, fName, lName)
 
   def loadAllFriends(self):
     """
@@ -1886,6 +3561,31 @@ class System:
     self.loadReceivedFriends()
     self.loadAcceptedFriends()
 
+  def countReceivedRequests(self):
+    """Counts the current user's received pending friend requests into receivedFriendsCount and returns it, without loading them."""
+    query = "SELECT COUNT(*) FROM friends WHERE receiver = ? AND status = ?"
+    self.cursor.execute(query, (self.user.userName, 'pending'))
+    self.receivedFriendsCount = self.cursor.fetchone()[0]
+    return self.receivedFriendsCount
+
+  def friendStatus(self, userName):
+    """
+    Returns the current user's relation with the user with one seek of the friends_pair index: "accepted" if they are friends,
+    "sent" or "received" for a pending request sent to or received from the user, or None if they have no relation.
+    """
+    query = """
+    SELECT sender, status FROM friends
+    WHERE min(sender, receiver) = min(?, ?) AND max(sender, receiver) = max(?, ?)
+    """
+    self.cursor.execute(query, (self.user.userName, userName) * 2)
+    relation = self.cursor.fetchone()
+    if relation is None:
+      return None
+    sender, status = relation
+    if status == 'accepted':
+      return 'accepted'
+    return 'sent' if sender == self.user.userName else 'received'
+
   def searchUserByField(self, field):
     """Allows the user to perform a search based on the specified criteria, 
     and populates the user results menu with the search results."""
@@ -1893,24 +3593,91 @@ class System:
     field_title = {'lName': 'Last Name', 'university': 'University', 'major': 'Major'}
     print(f"Please Enter A {field_title[field]}: ", end="")
     value = input()
-    # query the database for users based on the search criteria (exclude current user)
-    query = f"""
-    SELECT username, fName, lName, university, major FROM accounts WHERE {field} LIKE ? COLLATE NOCASE and username != ?"""
-    self.cursor.execute(query, (f"%{value}%", self.user.userName))
-    results = [
-      User(uname, fname, lname, university=uni, major=maj) for uname, fname, lname, uni, maj in self.cursor.fetchall()
-    ]
-    # generate the selections of the results menu from the user results
-    self.userResultsMenu.clearSelections()
-    for user in results:
-      self.userResultsMenu.addItem(f"{user.fName} {user.lName}", lambda usr=user: self.send_friend_request_menu(usr))
+    pattern = f"%{value}%"
+    # count the matching users (exclude current user) without loading them
+    query = f"SELECT COUNT(*) FROM accounts WHERE {field} LIKE ? COLLATE NOCASE and username != ?"
+    self.cursor.execute(query, (pattern, self.user.userName))
+    count = self.cursor.fetchone()[0]
+    # the results menu only fetches the page of matching users being displayed
+    self.userResultsPager = Pager(lambda afterKey, limit: self.fetchUserSearchPage(field, pattern, afterKey, limit))
 
     # set opening for user results menu
     self.userResultsMenu.setOpening(
-      f"Search Results: {len(results)} Users Were Found With {field_title[field]} Matching '{value}'"
+      f"Search Results: {count} Users Were Found With {field_title[field]} Matching '{value}'"
     )
     return self.user_results_menu
 
+  def fetchUserSearchPage(self, field, pattern, afterKey, limit):
+    """
+    Fetches a page of users matching a Find A Friend search, ordered by username.
+
+    Args:
+      field (str): The accounts column being searched.
+      pattern (str): The LIKE pattern the column must match.
+      afterKey (str): Only users with a username after this one are returned, None for the first page.
+      limit (int): The maximum number of users returned.
+    """
+    query = f"""
+    SELECT username, fName, lName FROM accounts 
+    WHERE {field} LIKE ? COLLATE NOCASE and username != ? and username > ?
+    ORDER BY username LIMIT ?"""
+    self.cursor.execute(query, (pattern, self.user.userName, afterKey or '', limit))
+    return [UserRef(uname, fname, lname) for uname, fname, lname in self.cursor.fetchall()]
+
+  def fetchAcceptedFriendsPage(self, afterKey, limit):
+    """Fetches a page of the current user's accepted friends, ordered by username."""
+    query = """
+    SELECT username, fName, lName, profile FROM accounts WHERE username IN (
+      SELECT receiver FROM friends WHERE sender = ? AND status = ?
+      UNION ALL
+      SELECT sender FROM friends WHERE receiver = ? AND status = ?
+    ) AND username > ?
+    ORDER BY username LIMIT ?
+    """
+    username = self.user.userName
+    self.cursor.execute(query, (username, 'accepted', username, 'accepted', afterKey or '', limit))
+    return [
+      UserRef(uName, fName, lName, Profile=self.lazyFriendProfile(uName)) if bprofile else UserRef(uName, fName, lName)
+      for uName, fName, lName, bprofile in self.cursor.fetchall()
+    ]
+
+  def fetchReceivedFriendsPage(self, afterKey, limit):
+    """Fetches a page of the users that sent the current user a pending friend request, ordered by username."""
+    query = """
+    SELECT username, fName, lName FROM accounts 
+    WHERE username IN (SELECT sender FROM friends WHERE receiver = ? AND status = ?) AND username > ?
+    ORDER BY username LIMIT ?
+    """
+    self.cursor.execute(query, (self.user.userName, 'pending', afterKey or '', limit))
+    return [UserRef(uName, fName, lName) for uName, fName, lName in self.cursor.fetchall()]
+
+  def populatePagedSelections(self, menu, pager, label, action):
+    """
+    Refreshes the pager's current page and replaces the menu's selections 
+    with one selection per result on the page, followed by the page controls.
+
+    Args:
+      menu (Menu): The paginated menu.
+      pager (Pager): The pager holding the menu's results.
+      label (function): Called with a result to create the result's label.
+      action (function): Called with a result when the result is selected.
+    """
+    menu.clearSelections()
+    pager.refresh()
+    for result in pager.page():
+      menu.addItem(label(result), lambda res=result: action(res))
+    menu.addItem('Next Page', pager.next, pager.hasNext)
+    menu.addItem('Previous Page', pager.prev, pager.hasPrev)
+
+  def populateUserResultSelections(self):
+    """Populates the user results menu with selections for the current page of search results."""
+    self.populatePagedSelections(
+      self.userResultsMenu,
+      self.userResultsPager,
+      lambda user: f"{user.fName} {user.lName}",
+      self.send_friend_request_menu
+    )
+
   def sendFriendRequest(self, friend):
     """
     Inserts a pending relation into the friends table between the user and the friend.
@@ -1921,20 +3688,18 @@ class System:
     query = "INSERT INTO friends (sender, receiver, status) VALUES (?,?,?)"
     values = (self.user.userName, friend.userName, 'pending')
     try:
-      self.cursor.execute(query, values)
-      self.conn.commit()
+      self.write(lambda: self.cursor.execute(query, values))
     except sqlite3.IntegrityError as e:
       e = str(e)
       #one or both users don't exist (maybe accounts deleted)
       if e == "FOREIGN KEY constraint failed":
         print("Error: User not found. Please retry the search later.\n")
-      # user already received a request from the friend
-      elif e == "UNIQUE constraint failed: friends.sender, friends.receiver":  
+      # user already sent or received a request from the friend (the friends primary key or canonical pair index)
+      elif e.startswith("UNIQUE constraint failed"):
         print("Error: Pre-Existing Friend Record Found. Please See Updated Relation Status Below.\n")
       # catch all (can't connect to database?)
       else:
         print(e)
-      self.conn.rollback() # need to rollback the failed transaction or database will remain locked
 
 
   def acceptFriendRequest(self, friend):
@@ -1946,9 +3711,7 @@ class System:
     """
     query = "UPDATE friends SET status = ? WHERE sender = ? AND receiver = ? RETURNING rowid"
     values = ('accepted', friend.userName, self.user.userName)
-    self.cursor.execute(query, values)
-    result = self.cursor.fetchone()
-    self.conn.commit()
+    result = self.write(lambda: self.cursor.execute(query, values).fetchone())
     if result is None:
       print("Error: Friend Request Not Found. Please See Updated Relation Status Below.\n")
 
@@ -1961,39 +3724,65 @@ class System:
     """
     query = "DELETE FROM friends WHERE sender = ? AND receiver = ? AND status = ? RETURNING rowid"
     values = (friend.userName, self.user.userName, 'pending')
-    self.cursor.execute(query, values)
-    result = self.cursor.fetchone()
-    self.conn.commit()
+    result = self.write(lambda: self.cursor.execute(query, values).fetchone())
     if result is None:
       print("Error: Friend Request Not Found. Please See Updated Relation Status Below.\n")
 
   def populateReceivedFriendSelections(self):
     """
-    Refreshes the users list of received friend requests 
-    and populates the received friend requests menu with selections corresponding to those users.
+    Refreshes the number of received friend requests 
+    and populates the received friend requests menu with selections corresponding to the users on the current page.
     """
-    self.receivedFriendsMenu.clearSelections()
-    self.loadReceivedFriends()
-    for uname, friend in self.user.receivedRequests.items():
-      self.receivedFriendsMenu.addItem(
-        f"{friend.fName} {friend.lName}", 
-        lambda usr=friend: self.receive_friend_req_menu(usr)
-      )
+    self.countReceivedRequests()
+    self.populatePagedSelections(
+      self.receivedFriendsMenu,
+      self.receivedFriendsPager,
+      lambda friend: f"{friend.fName} {friend.lName}",
+      self.receive_friend_req_menu
+    )
 
   
   def disconnectFriend(self, friend):
-    # delete relationship from table
+    # delete relationship from table, found by its canonical pair whichever user sent the request
     query = """
     DELETE FROM friends
-    WHERE ? IN (sender, receiver) AND ? IN (sender, receiver) AND status = 'accepted' 
+    WHERE min(sender, receiver) = min(?, ?) AND max(sender, receiver) = max(?, ?) AND status = 'accepted' 
     """
-    params = (friend.userName, self.user.userName)
-    self.cursor.execute(query, params)
-    self.conn.commit()
+    params = (friend.userName, self.user.userName) * 2
+    self.write(lambda: self.cursor.execute(query, params))
 
 
-  def loadUserProfile(self):
-    userName = self.user.userName
+  def queryProfile(self, userName):
+    """
+    Loads a user's profile from their profile document, with one primary key read.
+
+    Args:
+      userName (str): The user whose profile is loaded.
+
+    Returns:
+      A tuple of the user's profile flag and profile, or None if the user was not found.
+    """
+    self.cursor.execute("SELECT document FROM profile_documents WHERE username = ?", (userName,))
+    row = self.cursor.fetchone()
+    if row is None:
+      return None
+    hasProfile, university, major, yearsAttended, headline, about, experiences = json.loads(row[0])
+    return hasProfile, profile(headline=headline,
+                               about=about,
+                               education=education(university=university, major=major, yearsAttended=yearsAttended),
+                               experiences=[experience(*exp) for exp in experiences])
+
+  def queryJoinedProfile(self, userName):
+    """
+    Loads a user's profile by joining the accounts and experiences tables, as profiles were loaded before profile documents.
+    Kept to benchmark and check the profile documents against, see benchmarkProfileLoads.
+
+    Args:
+      userName (str): The user whose profile is loaded.
+
+    Returns:
+      A tuple of the user's profile flag and profile, or None if the user was not found.
+    """
     fields = """
       university, major, yearsAttended, accounts.title AS headline, infoAbout, profile, expID, experiences.title AS title, employer, dateStarted, dateEnded, location, description
       """
@@ -2002,78 +3791,227 @@ class System:
       """
     self.cursor.execute(query, (userName,))
     userProfile = self.cursor.fetchall()    
-    if len(userProfile):
-      if userProfile[0][5] == False:
+    if not len(userProfile):
+      return None
+    userEducation = education(university=userProfile[0][0],
+                              major=userProfile[0][1],
+                              yearsAttended=userProfile[0][2])
+    # list comprehension to create exp as a list
+    experiences = [row[6:] for row in userProfile]
+    userExperiences = []
+    if not(len(experiences) == 1 and experiences[0][0] is None):
+      for exp in experiences:
+        userExperiences.append(experience(ID=exp[0],
+                               title=exp[1],
+                               employer=exp[2],
+                               startDate=exp[3],
+                               endDate=exp[4],
+                               location=exp[5],
+                               description=exp[6]))
+    return userProfile[0][5], profile(headline=userProfile[0][3],
+                                      about=userProfile[0][4],
+                                      education=userEducation,
+                                      experiences=userExperiences)
+
+  def benchmarkProfileLoads(self, repeat=PROFILE_BENCHMARK_REPEAT):
+    """
+    Times loading every user's profile from their profile document and from the accounts and experiences join,
+    without the profile cache.
+
+    Args:
+      repeat (int): The number of times each profile is loaded by each method.
+
+    Returns:
+      A dictionary of the number of profiles, and the mean seconds taken to load a profile by each method.
+    """
+    userNames = [userName for (userName,) in self.conn.execute("SELECT username FROM accounts")]
+    result = {'profiles': len(userNames)}
+    for method, load in (('document', self.queryProfile), ('join', self.queryJoinedProfile)):
+      start = time.perf_counter()
+      for _ in range(repeat):
+        for userName in userNames:
+          load(userName)
+      result[method] = (time.perf_counter() - start) / max(1, len(userNames) * repeat)
+    return result
+
+
+  def cachedProfile(self, userName):
+    """
+    Returns the user's profile flag and profile from the profile cache, 
+    loading them from the database if they are not cached. Returns None if the user was not found.
+    """
+    result = self.profileCache.get(userName)
+    if result is None:
+      result = self.queryProfile(userName)
+      if result is not None:
+        self.profileCache.put(userName, result)
+    return result
+
+
+  def write(self, work, immediate=False):
+    """Runs work() as one write through the system's write coordinator and returns its result, see WriteCoordinator.run."""
+    return self.writer.run(work, immediate)
+
+  def writeProfile(self, userName, query, params):
+    """Writes a change to the user's profile and removes the user's outdated profile from the profile cache."""
+    self.write(lambda: self.cursor.execute(query, params))
+    self.invalidateProfile(userName)
+
+  def onChange(self, tableName, listener):
+    """
+    Registers a function invalidating the cached data of a key of the table, it is called by syncCaches 
+    with each key of the table changed by another connection, or with None if the whole table may have changed.
+    """
+    self.changeListeners[tableName].append(listener)
+
+  def clearCaches(self):
+    """Clears every cache derived from the database, by calling each change listener as if its whole table had changed."""
+    for listeners in self.changeListeners.values():
+      for listener in listeners:
+        listener(None)
+
+  def syncCaches(self):
+    """
+    Invalidates the cached keys that other connections sharing the database have changed since the last sync,
+    called before each menu step. PRAGMA data_version only changes when another connection commits,
+    so the change journal is only read then. Returns the number of changed keys invalidated.
+    """
+    version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+    if version == self.dataVersion:
+      return 0
+    self.dataVersion = version
+    # the oldest change kept, and the latest change ever journaled (kept even once the journal is pruned)
+    oldest, latest = self.conn.execute("""
+      SELECT MIN(changeID), (SELECT seq FROM sqlite_sequence WHERE name = 'changes') FROM changes
+    """).fetchone()
+    latest = latest or 0
+    query = "SELECT changeID, tableName, key FROM changes WHERE changeID > ? ORDER BY changeID"
+    rows = self.conn.execute(query, (self.lastChange,)).fetchall()
+    changed = {(tableName, key) for changeID, tableName, key in rows}
+    # unread changes were pruned, or the journal is behind the last change read (ex. an older database was copied over it)
+    if (oldest if oldest is not None else latest + 1) > self.lastChange + 1 or latest < self.lastChange:
+      changed = {(tableName, None) for tableName in JOURNALED_TABLES}
+    self.lastChange = max(latest, rows[-1][0] if rows else 0)
+    wholeTables = {tableName for tableName, key in changed if key is None}
+    for tableName, key in changed:
+      if key is None or tableName not in wholeTables:
+        for listener in self.changeListeners.get(tableName, ()):
+          listener(key)
+    return len(changed)
+
+  def pruneChanges(self):
+    """Removes all but the CHANGE_JOURNAL_SIZE most recent changes from the change journal."""
+    prune = "DELETE FROM changes WHERE changeID <= (SELECT MAX(changeID) FROM changes) - ?"
+    self.write(lambda: self.cursor.execute(prune, (CHANGE_JOURNAL_SIZE,)))
+
+  def invalidateProfile(self, userName):
+    """Removes the user's cached profile and profile words, or every cached profile if the username is None."""
+    if userName is None:
+      self.profileCache.clear()
+      self.jobMatcher.candidates.clear()
+    else:
+      self.profileCache.invalidate(userName)
+      self.jobMatcher.candidates.invalidate(userName)
+
+  def reloadSettings(self, userName):
+    """Unloads the user's settings (every user's if the username is None), and reloads them if the user is logged in."""
+    for loaded in ([userName] if userName is not None else list(self.settings.settings)):
+      self.settings.forget(loaded)
+    if self.user.loggedOn and userName in (None, self.user.userName):
+      for field, value in self.settings.load(self.user.userName).items():
+        setattr(self.user, field, value)
+
+  def rebuildUsernames(self):
+    """Builds the taken username filter from the accounts table, sized for twice the current accounts so it fills slowly."""
+    self.usernames = BloomFilter(max(USERNAME_FILTER_CAPACITY, 2 * self.rowCount("accounts")))
+    for (username,) in self.conn.execute("SELECT username FROM accounts"):
+      self.usernames.add(username)
+
+  def addUsername(self, userName):
+    """
+    Adds a taken username to the username filter, the filter is rebuilt if the username is None or the filter is full.
+    Usernames the filter already holds (ex. accounts updated or deleted by another connection) are skipped,
+    so they don't fill the filter.
+    """
+    if userName is None:
+      self.rebuildUsernames()
+    elif userName not in self.usernames:
+      if self.usernames.full():
+        self.rebuildUsernames()
+      else:
+        self.usernames.add(userName)
+
+  def usernameTaken(self, userName):
+    """
+    Returns True if an account has the username. Usernames missing from the username filter are available
+    without a query, only the filter's matches (taken usernames and rare false positives) are looked up.
+    """
+    if userName not in self.usernames:
+      return False
+    return self.conn.execute("SELECT 1 FROM accounts WHERE username = ?", (userName,)).fetchone() is not None
+
+  def reindexJob(self, jobID):
+    """Reindexes the job posting in the job matcher, or drops the whole index if the jobID is None."""
+    if jobID is None:
+      self.jobMatcher.clear()
+      return
+    indexed = len(self.jobMatcher) > 0  # an empty index is built when recommendations are next requested
+    self.jobMatcher.remove(jobID)
+    if indexed:
+      row = self.conn.execute("SELECT title, description, employer, location FROM jobs WHERE jobID = ?", (jobID,)).fetchone()
+      if row is not None:
+        self.jobMatcher.add(jobID, *row)
+
+
+  def loadUserProfile(self):
+    userName = self.user.userName
+    result = self.cachedProfile(userName)
+    if result:
+      hasProfile, userProfile = result
+      if hasProfile == False:
         update_query = 'UPDATE accounts SET profile = True WHERE username = ?'
-        self.cursor.execute(update_query, (userName,))
-        self.conn.commit()
-      userEducation = education(university=userProfile[0][0],
-                                major=userProfile[0][1],
-                                yearsAttended=userProfile[0][2])
-      # list comprehension to create exp as a list
-      experiences = [row[6:] for row in userProfile]
-      userExperiences = []
-      if not(len(experiences) == 1 and experiences[0][0] is None):
-        for exp in experiences:
-          userExperiences.append(experience(ID=exp[0],
-                                 title=exp[1],
-                                 employer=exp[2],
-                                 startDate=exp[3],
-                                 endDate=exp[4],
-                                 location=exp[5],
-                                 description=exp[6]))
-      self.user.Profile = profile(headline=userProfile[0][3],
-                                  about=userProfile[0][4],
-                                  education=userEducation,
-                                  experiences=userExperiences)
+        self.write(lambda: self.cursor.execute(update_query, (userName,)))
+        # patch the cached profile flag so the update is not repeated
+        self.profileCache.patch(userName, lambda cached: (True, cached[1]))
+      self.user.Profile = userProfile
     else:
       print("Error: User not found.")
       self.user.Profile = None
 
 
-  def loadFriendProfile(self, friend):
+  def lazyFriendProfile(self, userName):
+    """Returns a lazy profile for the friend that is fetched when the profile is first viewed."""
+    def load():
+      result = self.cachedProfile(userName)
+      if result is None:
+        print("Error: User not found.")
+        return None
+      hasProfile, friendProfile = result
+      return friendProfile if hasProfile == True else None
+    return LazyProfile(load)
+
+
+  def loadFriendProfile(self, friend, accepted=None):
+    """
+    Loads the profile of one of the user's friends. 
+    Friendship is taken from accepted if the caller already looked it up, otherwise it is checked against the user's
+    loaded accepted friends, or by looking up the pair if the friend isn't among them.
+    The profile is only fetched again once the friend's cached profile has expired.
+
+    Args:
+      friend (UserRef): The friend.
+      accepted (bool): Whether the user is friends with the friend, None if it isn't known.
+    """
     userName = friend.userName
-    query = "SELECT rowid FROM friends WHERE ? IN (sender, receiver) AND ? IN (sender, receiver) AND status = 'accepted'"
-    self.cursor.execute(query, (self.user.userName, friend.userName))
-    result = self.cursor.fetchone()
-    if result == None:
-      self.user.acceptedRequests.pop(userName, None)
+    if accepted is None:
+      accepted = userName in self.user.acceptedRequests or self.friendStatus(userName) == 'accepted'
+    if not accepted:
       print("Error: Not friends with this user")
       return
-    
-    fields = """
-      university, major, yearsAttended, accounts.title AS headline, infoAbout, profile, expID, experiences.title AS title, employer, dateStarted, dateEnded, location, description
-      """
-    query = f"""
-      SELECT {fields} FROM accounts LEFT JOIN experiences ON accounts.username = experiences.username WHERE accounts.username = ?
-      """
-    self.cursor.execute(query, (userName,))
-    userProfile = self.cursor.fetchall()    
-    if len(userProfile):
-      if userProfile[0][5] == True:
-        userEducation = education(university=userProfile[0][0],
-                                  major=userProfile[0][1],
-                                  yearsAttended=userProfile[0][2])
-        # list comprehension to create exp as a list
-        experiences = [row[6:] for row in userProfile]
-        userExperiences = []
-        if not(len(experiences) == 1 and experiences[0][0] is None):
-          for exp in experiences:
-            userExperiences.append(experience(ID=exp[0],
-                                   title=exp[1],
-                                   employer=exp[2],
-                                   startDate=exp[3],
-                                   endDate=exp[4],
-                                   location=exp[5],
-                                   description=exp[6]))
-        friend.Profile = profile(headline=userProfile[0][3],
-                                about=userProfile[0][4],
-                                education=userEducation,
-                                experiences=userExperiences)
-      else:
-        friend.Profile = None
-    else:
-      print("Error: User not found.")
+    if not isinstance(friend.Profile, LazyProfile):
+      friend.Profile = self.lazyFriendProfile(userName)
+    # the friend has no profile or could not be found
+    if friend.Profile.resolve() is None:
       friend.Profile = None
   
   
@@ -2217,132 +4155,51 @@ In College Pressroom: Stay on top of the latest news, updates, and reports
 
   
   def initMenu(self):
-      ## Set Home Page Items
-      hpOpening = """
-    Welcome To The InCollege Home Page!
-      
-    The Place Where Students Take The Next Big Step.
-
-    "I Had To Battle With Anxiety Every Day Until I Signed Up For InCollege.
-    Now, My Future Is On The Right Track And Im Able To Apply My Education To My Dream Career.
-    Finding A Place In My Field Of Study Was A Breeze"
-    - InCollege User
+      """Sets up the menus defined in MENU_TABLE, which are shared by every system, then builds the routes."""
+      for name, compiled in MENU_TABLE.items():
+        getattr(self, name).load(compiled, self)
+      self.initRoutes()
 
+  def initRoutes(self):
     """
-      self.homePage.setOpening(hpOpening)
-      self.homePage.addItem("Login", self.login)
-      self.homePage.addItem("Register", self.register)
-      self.homePage.addItem("Find People I Know", self.findUser)
-      ##self.homePage.setSelection('4',{'label':'Delete Users','action':self.deleteTable})
-      self.homePage.addItem("See Our Success Video", self.video_menu)
-      self.homePage.addItem('Useful Links', self.useful_links)
-      self.homePage.addItem('InCollege Important Links', self.important_links)
-      ## Set Video Page Items
-      self.videoMenu.setOpening("See Our Success Story:\n(Playing Video)\n")
-      ## Set Main Menu Items
-      self.mainMenu.addBackgroundAction(self.show_pending_message)
-      self.mainMenu.addItem('Profile', self.user_profile_menu)
-      self.mainMenu.addItem('Job/Internship Search', self.jobs_menu)
-      # Find a Friend in mainMenu now Friends
-      self.mainMenu.addItem('Friends', self.friend_menu)
-      self.mainMenu.addItem('Learn A Skill', self.skills_menu)
-      self.mainMenu.addItem('Useful Links', self.useful_links)
-      self.mainMenu.addItem('InCollege Important Links', self.important_links)
-      self.mainMenu.setExitStatement("Log Out")
-      # Set Friends Item
-      self.friendMenu.setOpening("Welcome To The Friends Page")
-      self.friendMenu.addItem("Find A Friend", self.find_a_friend_menu)
-      self.friendMenu.addItem("Show My Network", self.network_menu)
-      self.friendMenu.addItem(
-        lambda: f"Pending Requests ({len(self.user.receivedRequests)})", 
-        self.received_friends_menu
-      )
-      self.friendMenu.addBackgroundAction(self.loadAllFriends)
-      self.friendMenu.setExitStatement("Return To Main Menu")
-      self.networkMenu.addBackgroundAction(self.show_network)
-      self.displayFriendInfo.addBackgroundAction(self.loadAcceptedFriends)
-      # Set Skill Items
-      self.skillsMenu.setOpening("Please Select a Skill:")
-      self.skillsMenu.addItem('Project Management',self.skillA)
-      self.skillsMenu.addItem('Networking',self.skillB)
-      self.skillsMenu.addItem('System Design',self.skillC)
-      self.skillsMenu.addItem('Coding',self.skillD)
-      self.skillsMenu.addItem('Professional Communication',self.skillE)
-      self.skillsMenu.setExitStatement("Return To Main Menu")
-      # Set Join Items
-      self.joinMenu.addItem('Login',self.login)
-      self.joinMenu.addItem('Register',self.register)
-      # Set Post A Job Items
-      self.jobsMenu.setOpening("Welcome to the Job Postings Page")
-      self.jobsMenu.addItem('Post Job',self.postJob)
-      self.jobsMenu.setExitStatement("Return To Main Menu")
-      # Set InCollege Important Links
-      self.importantLinks.setOpening("Welcome to the Important Links Page")
-      self.importantLinks.addItem('Copyright Notice', lambda: self.quick_menu(System.content["Copyright Notice"]))
-      self.importantLinks.addItem('About', lambda: self.quick_menu(System.content["About"]))
-      self.importantLinks.addItem('Accessibility', lambda: self.quick_menu(System.content["Accessibility"]))
-      self.importantLinks.addItem('User Agreement', lambda: self.quick_menu(System.content["User Agreement"]))
-      self.importantLinks.addItem('Privacy Policy', self.privacy_menu)
-      self.importantLinks.addItem('Cookie Policy', lambda: self.quick_menu(System.content["Cookie Policy"]))
-      self.importantLinks.addItem('Brand Policy', lambda: self.quick_menu(System.content["Brand Policy"]))
-      self.importantLinks.addItem('Languages', self.language_menu, lambda: True if self.user.loggedOn else False)
-      self.importantLinks.setExitStatement("Return To Home Page")
-      # Set Guest Controls Items  
-      self.guestControls.setOpening("Guest Controls:\n")
-      self.guestControls.addItem((lambda: f"Email [{'ON' if self.user.email else 'OFF'}]"), self.setUserEmail)
-      self.guestControls.addItem((lambda: f"SMS [{'ON' if self.user.sms else 'OFF'}]"), self.setUserSMS)
-      self.guestControls.addItem(
-        (lambda: f"Targeted Advertising [{'ON' if self.user.targetedAds else 'OFF'}]"), 
-        self.setUserTargetedAds)
-      self.guestControls.setExitStatement("Back")
-      # Set Languages Items
-      self.languageMenu.setOpening("Languages:")
-      for language in LANGUAGES:
-        """give parameter to lambda functions here 
-        as workaround for python's lambda function late binding feature 
-        otherwise all menu items will be created with the last language in the list """
-        label = lambda lang=language: f"{lang} [{'X' if self.user.language == lang else ' '}]"
-        action = lambda lang=language: self.setUserLanguage(lang)
-        self.languageMenu.addItem(label, action)
-      self.languageMenu.setExitStatement("Back")
-      # Privacy page
-      privacyPolicy = """
-------------------------
-   PRIVACY POLICY
-------------------------
-
-At InCollege, we value your privacy and are committed to protecting your personal information. Here's a summary of our privacy practices:
+    Builds the route table from ROUTE_TABLE, which gives every menu and menu item a stable path (ex. profile/edit/exp/3/location)
+    that can be opened directly from the command palette or main.py, without walking through the menus above it.
+    Each route holds its menu and item, the loaders of the data its screen needs (the menu's background actions
+    that are not only run on display) and its access check.
+    """
+    self.routes = {}
+    for path, route in ROUTE_TABLE.items():
+      menu = getattr(self, route.menu)
+      load = tuple(getattr(self, name) for name, onDisplay in MENU_TABLE[route.menu].backgroundActions if not onDisplay)
+      access = getattr(self, route.access) if route.access is not None else (lambda: True)
+      self.routes[path] = {'menu': menu, 'entry': route.entry, 'load': load, 'visible': access}
 
-1. Information Collection:
-   We collect limited personal information when you register and interact with our platform.
+  def goTo(self, path):
+    """
+    Opens the route of the path directly, loading only the data of the route's screen.
+    Returns the value returned by the route's action, or None if the route doesn't exist or isn't available.
 
-2. Data Usage:
-   We use your information to personalize your experience, deliver relevant content, and improve our services. We employ industry-standard security measures to protect your information from unauthorized access.
+    Args:
+      path (str): The route's path, with or without the leading slash (ex. /profile/edit/exp/3/location).
+    """
+    route = self.routes.get(path.strip().strip(ROUTE_PREFIX).lower())
+    if route is None:
+      print(f"Page Not Found: {path}")
+      return None
+    if route['visible']():
+      for load in route['load']:
+        load()
+      # the item's own visibility check may need the data its menu loads (ex. View Profile needs the user's profile)
+      if route['menu'].isVisible(route['entry']):
+        return route['menu'].dispatch(route['entry'])
+    print("This Page Is Not Available, Please Log In Or Log Out First.")
+    return None
 
-3. Cookies and Tracking:
-   We may use cookies to enhance your browsing experience.
-------------------------
-      """
-      #Privacy menu just to have the option for guest controls if logged in
-      self.privacyMenu.setOpening(privacyPolicy)
-      self.privacyMenu.addItem('Guest Controls', self.guest_controls, lambda: True if self.user.loggedOn else False)
-      #Useful links menu
-      self.usefulLinks.setOpening("Welcome to the Useful Links Page")
-      self.usefulLinks.addItem('General', self.general_menu)
-      self.usefulLinks.addItem('Browse InCollege', lambda: self.quick_menu("Under Construction"))
-      self.usefulLinks.addItem('Business Solutions', lambda: self.quick_menu("Under Construction"))
-      self.usefulLinks.addItem('Directories', lambda: self.quick_menu("Under Construction"))
-      #General links menu navigation links
-      self.generalMenu.setOpening('General Links')
-      self.generalMenu.addItem('Sign Up', lambda: self.join_menu("Sign Up:", "Back"), lambda: True if not self.user.loggedOn else False) #Disapears when user logs in
-      self.generalMenu.addItem('Help Center', lambda: self.quick_menu(System.content["Help Center"]))
-      self.generalMenu.addItem('About', lambda: self.quick_menu(System.content["General About"]))
-      self.generalMenu.addItem('Press', lambda: self.quick_menu(System.content["Press"]))
-      self.generalMenu.addItem('Blog', lambda: self.quick_menu("Under Construction"))
-      self.generalMenu.addItem('Careers', lambda: self.quick_menu("Under Construction"))
-      self.generalMenu.addItem('Developers', lambda: self.quick_menu("Under Construction"))
-      # Set Find a Friend (search) Menu Items
-      self.findAFriend.setOpening('Search For InCollege Users By:')
-      self.findAFriend.addItem('Last Name', lambda: self.searchUserByField('lName'))
-      self.findAFriend.addItem('University', lambda: self.searchUserByField('university'))
-      self.findAFriend.addItem('Major', lambda: self.searchUserByField('major'))
\ No newline at end of file
+  def openRoute(self, path):
+    """
+    Opens the route of the path from outside the menus (ex. the --route option), 
+    running the menus and functions returned by the route's action until one returns nothing.
+    """
+    nxt = self.goTo(path)
+    while callable(nxt):
+      nxt = nxt()
\ No newline at end of file
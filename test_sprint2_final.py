@@ -368,13 +368,14 @@ def test_jobs_table_creation_withFields():
     column_names = [column[1] for column in columns]
     # Define the expected column names
     expected_columns = [
+        'jobID',
         'title',
         'description',
         'employer',
         'location',
         'salary',
-        'posterFirstName',
-        'posterLastName'
+        'poster',
+        'created'
     ]
     # Assert that the column names match the expected column names
     assert column_names == expected_columns
@@ -395,13 +396,14 @@ def test_jobs_table_schema():
     # Define the expected field types and primary keys
    #A value of 1 means the column does not allow NULL values, and 0 means NULL values are allowed.
     expected_schema = {
-        'title': ('VARCHAR(128)', 0, None, 1),
+        'jobID': ('INTEGER', 0, None, 1),
+        'title': ('VARCHAR(128)', 1, None, 0),
         'description': ('TEXT', 0, None, 0),
         'employer': ('VARCHAR(128)', 1, None, 0),
         'location': ('VARCHAR(128)', 1, None, 0),
         'salary': ('INT', 1, None, 0),
-        'posterFirstName': ('VARCHAR(128)', 0, None, 0),
-        'posterLastName': ('VARCHAR(128)', 0, None, 0)
+        'poster': ('VARCHAR(25)', 0, None, 0),
+        'created': ('TIMESTAMP', 1, 'CURRENT_TIMESTAMP', 0)
     }
  # Iterate over the columns and compare with expected schema
     for column in columns:
@@ -543,8 +545,8 @@ def test_post_job_prompt(monkeypatch, capsys):
 def test_postJobLimitReached(capsys):
     # Create an instance of the System class or a mock object if available
     system = System()
-    # Mock the countRows method to return a value equal to the job post limit (5)
-    system.countRows = Mock(return_value=5)
+    # Mock the rowCount method to return a value equal to the job post limit (5)
+    system.rowCount = Mock(return_value=5)
     # Call the postJob method
     result = system.postJob()
     # Assert that the maximum jobs limit message is printed
@@ -571,7 +573,7 @@ def system_instance_2():
     # For example, insert test data into the database
     conn = sqlite3.connect("accounts.db")
     cursor = conn.cursor()
-    cursor.execute("INSERT INTO jobs (title, description, employer, location, salary, posterFirstName, posterLastName) VALUES (?, ?, ?, ?, ?, ?, ?)", ('Test Job Title', 'Test Job Description', 'Test Employer', 'Test Location', 50000.00, 'John', 'Doe'))
+    cursor.execute("INSERT INTO jobs (title, description, employer, location, salary, poster) VALUES (?, ?, ?, ?, ?, ?)", ('Test Job Title', 'Test Job Description', 'Test Employer', 'Test Location', 50000.00, None))
     conn.commit()
     conn.close()
 
@@ -583,7 +585,7 @@ def test_job_created_correctlyInDataBase(system_instance_2):
     # Retrieve the inserted job data from the database
     conn = sqlite3.connect("accounts.db")
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM jobs WHERE title=?", ('Test Job Title',))
+    cursor.execute("SELECT title, description, employer, location, salary, poster, created FROM jobs WHERE title=?", ('Test Job Title',))
     result = cursor.fetchone()
     conn.close()
 
@@ -593,8 +595,8 @@ def test_job_created_correctlyInDataBase(system_instance_2):
     assert result[2] == "Test Employer"
     assert result[3] == "Test Location"
     assert result[4] == 50000.00
-    assert result[5] == "John"
-    assert result[6] == "Doe"
+    assert result[5] is None
+    assert result[6] is not None
 
 # this test make sure a valid salary when post a job 
 def test_post_job_with_invalid_salary():
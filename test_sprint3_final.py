@@ -777,6 +777,8 @@ def test_set_sms(account_settings):
   # Perform the test by calling the relevant method on account_settings
   assert account_settings.user.loggedOn == True
   account_settings.setUserSMS()
+  # setting changes are saved together when leaving the settings menu
+  account_settings.flushSettings()
   # Grab the user's SMS setting toconfirm update
   conn = sqlite3.connect("accounts.db")
   cursor = conn.cursor()
@@ -793,6 +795,8 @@ def test_set_targetedAds(account_settings):
   assert account_settings.user.loggedOn == True
   # Perform the test by calling the relevant method on account_settings
   account_settings.setUserTargetedAds()
+  # setting changes are saved together when leaving the settings menu
+  account_settings.flushSettings()
   # Grab the user's SMS setting toconfirm update
   conn = sqlite3.connect("accounts.db")
   cursor = conn.cursor()
@@ -809,6 +813,8 @@ def test_set_email(account_settings):
   # Perform the test by calling the relevant method on account_settings
   assert account_settings.user.loggedOn == True
   account_settings.setUserEmail()
+  # setting changes are saved together when leaving the settings menu
+  account_settings.flushSettings()
   # Grab the user's setting to confirm update
   conn = sqlite3.connect("accounts.db")
   cursor = conn.cursor()
@@ -900,6 +900,8 @@ def test_set_sms(test_instance_1):
   # Perform the test by calling the relevant method on account_settings
   assert test_instance_1.user.loggedOn == True
   test_instance_1.setUserSMS()
+  # setting changes are saved together when leaving the settings menu
+  test_instance_1.flushSettings()
   # Grab the user's SMS setting toconfirm update
   conn = sqlite3.connect("accounts.db")
   cursor = conn.cursor()
@@ -916,6 +918,8 @@ def test_set_targetedAds(test_instance_1):
   assert test_instance_1.user.loggedOn == True
   # Perform the test by calling the relevant method on account_settings
   test_instance_1.setUserTargetedAds()
+  # setting changes are saved together when leaving the settings menu
+  test_instance_1.flushSettings()
   # Grab the user's SMS setting toconfirm update
   conn = sqlite3.connect("accounts.db")
   cursor = conn.cursor()
@@ -932,6 +936,8 @@ def test_set_email(test_instance_1):
   # Perform the test by calling the relevant method on account_settings
   assert test_instance_1.user.loggedOn == True
   test_instance_1.setUserEmail()
+  # setting changes are saved together when leaving the settings menu
+  test_instance_1.flushSettings()
   # Grab the user's setting to confirm update
   conn = sqlite3.connect("accounts.db")
   cursor = conn.cursor()
@@ -1182,7 +1188,8 @@ def test_unique_requests(system_instance, temp_remove_accounts, capsys, name_reg
     query = "INSERT OR IGNORE INTO friends (sender, receiver, status) VALUES (?,?,?) RETURNING rowid"
     values = ('makdoodie', 'ahmad', 'pending')
     system_instance.cursor.execute(query, values)
-    query = "INSERT OR IGNORE INTO friends (sender, receiver, status) VALUES (?,?,?) RETURNING rowid"
+    # the reversed pair is rejected by the unique canonical pair index, which OR IGNORE would silently skip
+    query = "INSERT INTO friends (sender, receiver, status) VALUES (?,?,?) RETURNING rowid"
     values = ('ahmad', 'makdoodie', 'pending')
     try:
       system_instance.cursor.execute(query, values)
@@ -1287,8 +1294,9 @@ def test_accepted(system_instance, temp_remove_accounts, capsys, name_register ,
   with mock.patch('builtins.input', side_effect=['ahmad', 'Asibai1$', '0']):
     system_instance.login()
     system_instance.friend_menu()
-  assert len(system_instance.user.receivedRequests) == 0
-  assert len(system_instance.user.acceptedRequests) == 1
+  # the friends menu counts the pending requests, relations are looked up for each friend
+  assert system_instance.receivedFriendsCount == 0
+  assert system_instance.friendStatus('makdoodie') == 'accepted'
 
 #Subtask 4: If the user rejects the request, the friend record should be removed from the user class and friends table in the database.
 def test_rejected(system_instance, temp_remove_accounts, capsys, name_register ,name_register_1):
@@ -1306,8 +1314,8 @@ def test_rejected(system_instance, temp_remove_accounts, capsys, name_register ,
   with mock.patch('builtins.input', side_effect=['ahmad', 'Asibai1$', '0']):
     system_instance.login()
     system_instance.friend_menu()
-  assert len(system_instance.user.receivedRequests) == 0
-  assert len(system_instance.user.acceptedRequests) == 0
+  assert system_instance.receivedFriendsCount == 0
+  assert system_instance.friendStatus('makdoodie') is None
 
 
 #Subtask 5: After an accept/reject, the friend should not appear in 'pending requests'.
@@ -0,0 +1,843 @@
+import pytest
+import sqlite3
+import tracemalloc
+import json
+import time
+from collections import Counter
+from unittest import mock
+from system import System, Pager, LRUCache, JobMatcher, PAGE_SIZE
+from user import User, UserRef, LazyProfile, ProfileRenderer, profile, education, experience
+
+
+# a list of test users with the attributes necessary for registration
+TEST_USER = [
+  ['user1', 'hank', 'hill', 'uni1', 'major1', 'Password1!'],
+  ['user2', 'bobby', 'hill', 'uni2', 'major2', 'Password2@'],
+  ['user3', 'dale', 'gribble', 'uni3', 'major3', 'Password3#'],
+]
+
+
+#============================================== Fixtures ============================================================
+
+# an empty database with the current schema, cloned by the memory_system fixture
+TEMPLATE_DB = System(":memory:")
+
+
+@pytest.fixture
+def system_instance():
+  """Creates and instance of the system performs some menu initialization."""
+  s1 = System()
+  s1.initMenu()
+  return s1
+
+
+@pytest.fixture
+def clear_restore_db(system_instance):
+  """Sets up the database for testing by taking an in memory snapshot and clearing any persistent records,
+  after a test finishes the snapshot is restored."""
+  snapshot = system_instance.snapshot()
+  # delete all records from the the accounts table,
+  # and should auto delete all records from tables with FK to accounts
+  system_instance.cursor.execute("DELETE FROM accounts")
+  system_instance.cursor.execute("DELETE FROM jobs")
+  system_instance.conn.commit()
+
+  yield
+  system_instance.restore(snapshot)
+  snapshot.close()
+
+
+@pytest.fixture
+def memory_system():
+  """Creates a system with a private in memory database, cloned from an empty template database."""
+  s1 = System.fromTemplate(TEMPLATE_DB)
+  yield s1
+  s1.conn.close()
+
+
+@pytest.fixture
+def many_users(system_instance, clear_restore_db):
+  """Inserts enough users attending the same university to fill several pages of results, and logs in the first one."""
+  users = [(f"student{n:02}", 'first', f"last{n:02}", 'Usf', 'Cs') for n in range(PAGE_SIZE * 2 + 5)]
+  query = "INSERT INTO accounts (username, fName, lName, university, major) VALUES (?, ?, ?, ?, ?)"
+  system_instance.cursor.executemany(query, users)
+  system_instance.conn.commit()
+  system_instance.user.login(*users[0][:5], True, True, True, "English")
+  return users
+
+
+#============================================== Story 1 Tests ======================================================
+# Paginated result menus for large searches and networks
+
+def test_pager_pages():
+  """Checks that the pager moves forwards and backwards through the keys of a result set."""
+  keys = list(range(25))
+  fetch = lambda afterKey, limit: [k for k in keys if afterKey is None or k > afterKey][:limit]
+  pager = Pager(fetch, key=lambda k: k, pageSize=10)
+  assert pager.page() == keys[0:10] and pager.hasNext() and not pager.hasPrev()
+  pager.next()
+  assert pager.page() == keys[10:20] and pager.hasNext() and pager.hasPrev()
+  pager.next()
+  assert pager.page() == keys[20:25] and not pager.hasNext()
+  assert pager.pageNumber() == 3
+  pager.prev()
+  assert pager.page() == keys[10:20]
+
+
+def test_pager_fetches_visible_page_only():
+  """Checks that the pager never requests more than one extra result beyond the visible page."""
+  limits = []
+  def fetch(afterKey, limit):
+    limits.append(limit)
+    return list(range(limit))
+  pager = Pager(fetch, key=lambda k: k, pageSize=5)
+  pager.page()
+  pager.page()  # cached until refreshed
+  assert limits == [6]
+
+
+def test_pager_steps_back_from_empty_page():
+  """Checks that the pager returns to the previous page when the current page no longer has results."""
+  keys = list(range(15))
+  fetch = lambda afterKey, limit: [k for k in keys if afterKey is None or k > afterKey][:limit]
+  pager = Pager(fetch, key=lambda k: k, pageSize=10)
+  pager.page()
+  pager.next()
+  del keys[10:]
+  pager.refresh()
+  assert pager.page() == keys[0:10] and pager.pageNumber() == 1
+
+
+def test_search_results_paginated(system_instance, many_users, capsys):
+  """Checks that the search results menu displays a single page with page controls."""
+  inputs = ['Usf', '0']
+  with mock.patch('builtins.input', side_effect=inputs):
+    system_instance.searchUserByField('university')()
+  output = capsys.readouterr().out
+  assert f"Search Results: {len(many_users) - 1} Users Were Found" in output
+  assert f"[{PAGE_SIZE}] first last{PAGE_SIZE:02}" in output
+  assert f"[{PAGE_SIZE + 1}] Next Page" in output
+  assert "Previous Page" not in output
+  assert len(system_instance.userResultsMenu.currSelections) == PAGE_SIZE + 1
+
+
+def test_search_results_next_page(system_instance, many_users, capsys):
+  """Checks that the next and previous page controls move through the search results."""
+  inputs = ['Usf', str(PAGE_SIZE + 1), str(PAGE_SIZE + 1), '0']
+  with mock.patch('builtins.input', side_effect=inputs):
+    system_instance.searchUserByField('university')()
+  output = capsys.readouterr().out
+  # the last page holds the remaining users
+  assert f"[1] first last{PAGE_SIZE * 2 + 1:02}" in output
+  assert f"[4] first last{PAGE_SIZE * 2 + 4:02}" in output
+  assert "[5] Previous Page" in output
+
+
+def test_network_paginated(system_instance, many_users, capsys):
+  """Checks that the network menu only loads the current page of connections."""
+  query = "INSERT INTO friends (sender, receiver, status) VALUES (?, ?, 'accepted')"
+  system_instance.cursor.executemany(query, [(many_users[0][0], user[0]) for user in many_users[1:]])
+  system_instance.conn.commit()
+  with mock.patch('builtins.input', side_effect=[str(PAGE_SIZE + 1), '0', '0']):
+    system_instance.network_menu()
+  output = capsys.readouterr().out
+  assert "Your Connections: " in output
+  assert f"[1] First Last{PAGE_SIZE + 1:02}" in output
+  assert len(system_instance.networkPager.page()) == PAGE_SIZE
+
+
+def test_received_requests_paginated(system_instance, many_users, capsys):
+  """Checks that the received requests menu reports all requests but only displays a page of them."""
+  query = "INSERT INTO friends (sender, receiver, status) VALUES (?, ?, 'pending')"
+  system_instance.cursor.executemany(query, [(user[0], many_users[0][0]) for user in many_users[1:]])
+  system_instance.conn.commit()
+  with mock.patch('builtins.input', side_effect=['0']):
+    system_instance.received_friends_menu()
+  output = capsys.readouterr().out
+  assert f"You Have Received Friend Requests From {len(many_users) - 1} Users." in output
+  assert f"[{PAGE_SIZE + 1}] Next Page" in output
+
+
+
+def test_friend_menus_do_not_load_network(system_instance, many_users, capsys):
+  """Checks that the friend menus count requests and look up single relations instead of loading the user's whole network."""
+  query = "INSERT INTO friends (sender, receiver, status) VALUES (?, ?, ?)"
+  system_instance.cursor.executemany(query, [(many_users[0][0], user[0], 'accepted') for user in many_users[1:-2]] +
+                                            [(user[0], many_users[0][0], 'pending') for user in many_users[-2:]])
+  system_instance.conn.commit()
+  with mock.patch.object(system_instance, 'loadSentFriends') as sent, \
+       mock.patch.object(system_instance, 'loadReceivedFriends') as received, \
+       mock.patch.object(system_instance, 'loadAcceptedFriends') as accepted, \
+       mock.patch('builtins.input', side_effect=['2', '1', '0', '0', '0']):
+    system_instance.friend_menu()
+  output = capsys.readouterr().out
+  assert "[3] Pending Requests (2)" in output
+  assert "You Are Friends With This User" in output and "[1] Disconnect" in output
+  sent.assert_not_called()
+  received.assert_not_called()
+  accepted.assert_not_called()
+
+
+def test_friend_status_seeks_pair(system_instance, many_users):
+  """Checks that the relation with another user is found from either direction with a seek of the pair index."""
+  me, sent, received, accepted = (user[0] for user in many_users[:4])
+  query = "INSERT INTO friends (sender, receiver, status) VALUES (?, ?, ?)"
+  system_instance.cursor.executemany(query, [(me, sent, 'pending'), (received, me, 'pending'), (accepted, me, 'accepted')])
+  statuses = [system_instance.friendStatus(user[0]) for user in many_users[1:5]]
+  assert statuses == ['sent', 'received', 'accepted', None]
+  statements = trace_statements(system_instance)
+  system_instance.friendStatus(sent)
+  plan = [row[-1] for row in system_instance.conn.execute(f"EXPLAIN QUERY PLAN {statements[0]}")]
+  assert plan == ['SEARCH friends USING INDEX friends_pair (<expr>=? AND <expr>=?)']
+
+#============================================== Story 2 Tests ======================================================
+# Compact slot based user, profile, experience and education models
+
+def test_models_use_slots():
+  """Checks that the models do not carry a per instance dictionary."""
+  objs = [User('user1', 'first', 'last'), UserRef('user1', 'first', 'last'), profile(),
+          education('uni', 'major', 4), experience(1, 'title', 'emp', None, None, 'loc', 'desc')]
+  for obj in objs:
+    assert not hasattr(obj, '__dict__')
+
+
+def test_user_ref_upgrade():
+  """Checks that a user reference displays like a user and upgrades to a full user."""
+  ref = UserRef('user1', 'emily', 'johnson', Profile=profile('headline'))
+  full = User('user1', 'emily', 'johnson', Profile=profile('headline'))
+  assert ref.displayProfile('part') == full.displayProfile('part')
+  assert ref.displayProfile('full') == full.displayProfile('full')
+  upgraded = ref.upgrade(university='Usf', major='Cs')
+  assert isinstance(upgraded, User)
+  assert upgraded.userName == 'user1' and upgraded.Profile is ref.Profile
+  assert upgraded.university == 'Usf' and upgraded.sentRequests == {}
+
+
+def test_user_ref_memory_per_100k():
+  """Measures the memory held by 100k loaded network members as full users and as user references."""
+  def measure(make):
+    tracemalloc.start()
+    members = [make(n) for n in range(100_000)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+  user_bytes = measure(lambda n: User(f"user{n}", 'first', 'last'))
+  ref_bytes = measure(lambda n: UserRef(f"user{n}", 'first', 'last'))
+  print(f"100k network members: User {user_bytes / 2**20:.1f} MiB, UserRef {ref_bytes / 2**20:.1f} MiB")
+  assert ref_bytes * 2 < user_bytes
+
+
+def test_friend_lists_hold_refs(system_instance, many_users):
+  """Checks that the friend dictionaries are populated with user references."""
+  query = "INSERT INTO friends (sender, receiver, status) VALUES (?, ?, ?)"
+  rows = [(many_users[0][0], many_users[1][0], 'accepted'),
+          (many_users[0][0], many_users[2][0], 'pending'),
+          (many_users[3][0], many_users[0][0], 'pending')]
+  system_instance.cursor.executemany(query, rows)
+  system_instance.conn.commit()
+  system_instance.loadAllFriends()
+  friends = [*system_instance.user.acceptedRequests.values(),
+             *system_instance.user.sentRequests.values(),
+             *system_instance.user.receivedRequests.values()]
+  assert len(friends) == 3
+  assert all(type(friend) is UserRef for friend in friends)
+
+
+#============================================== Story 3 Tests ======================================================
+# Lazy profile hydration for friend stubs
+
+@pytest.fixture
+def friend_with_profile(system_instance, many_users):
+  """Makes the logged in user friends with a user that has a profile, and returns the friend's username."""
+  friend = many_users[1][0]
+  system_instance.cursor.execute("UPDATE accounts SET title = 'Intern', profile = True WHERE username = ?", (friend,))
+  system_instance.cursor.execute("INSERT INTO friends (sender, receiver, status) VALUES (?, ?, 'accepted')", (many_users[0][0], friend))
+  system_instance.conn.commit()
+  return friend
+
+
+def trace_statements(system_instance):
+  """Records every SQL statement executed by the system's connection into the returned list."""
+  statements = []
+  system_instance.conn.set_trace_callback(statements.append)
+  return statements
+
+
+def test_lazy_profile_loads_on_access():
+  """Checks that the lazy profile is only loaded when its attributes are accessed, and unknown attributes raise."""
+  loads = []
+  def load():
+    loads.append(1)
+    return profile('headline', 'about')
+  lazy = LazyProfile(load)
+  assert loads == []
+  assert lazy.headline == 'headline' and lazy.about == 'about'
+  assert len(loads) == 2
+  with pytest.raises(AttributeError):
+    lazy.headlnie
+
+
+def test_accepted_friends_not_hydrated(system_instance, friend_with_profile):
+  """Checks that loading the user's friends does not load the friends' profiles."""
+  system_instance.loadAcceptedFriends()
+  statements = trace_statements(system_instance)
+  friend = system_instance.user.acceptedRequests[friend_with_profile]
+  assert friend.hasProfile()
+  assert statements == []
+  assert friend.Profile.headline == 'Intern'
+  assert len(statements) == 1
+
+
+def test_friend_profile_reuses_friendship(system_instance, friend_with_profile):
+  """Checks that viewing a friend's profile twice runs a single query and never rechecks the friends table."""
+  system_instance.loadAcceptedFriends()
+  friend = system_instance.user.acceptedRequests[friend_with_profile]
+  statements = trace_statements(system_instance)
+  system_instance.loadFriendProfile(friend)
+  system_instance.loadFriendProfile(friend)
+  assert friend.Profile.headline == 'Intern'
+  assert len(statements) == 1
+  assert 'friends' not in statements[0]
+
+
+def test_friend_profile_view_reuses_network_relation(system_instance, friend_with_profile, capsys):
+  """Checks that viewing a friend's profile from the network menu reuses the relation looked up for the friend's screen."""
+  statements = trace_statements(system_instance)
+  with mock.patch('system.Menu.clear'), \
+       mock.patch('builtins.input', side_effect=['1', '1', '0', '0', '0']):
+    system_instance.network_menu()
+  assert "Intern" in capsys.readouterr().out
+  # one lookup for each time the friend's screen is displayed, none for the profile
+  assert len([statement for statement in statements if 'max(sender, receiver)' in statement]) == 2
+
+
+def test_friend_profile_not_friends(system_instance, many_users, capsys):
+  """Checks that the profile of a user that is not an accepted friend is not loaded."""
+  stranger = UserRef(many_users[2][0], 'first', 'last')
+  system_instance.loadAcceptedFriends()
+  system_instance.loadFriendProfile(stranger)
+  assert "Error: Not friends with this user" in capsys.readouterr().out
+  assert stranger.Profile is None
+
+
+#============================================== Story 4 Tests ======================================================
+# LRU profile cache with write-through invalidation
+
+def test_lru_cache_evicts_least_recent():
+  """Checks that the cache evicts the least recently used entry once full."""
+  cache = LRUCache(maxSize=2, ttl=60)
+  cache.put('a', 1)
+  cache.put('b', 2)
+  assert cache.get('a') == 1  # a is now the most recently used
+  cache.put('c', 3)
+  assert cache.get('b') is None
+  assert cache.get('a') == 1 and cache.get('c') == 3
+  stats = cache.stats()
+  assert stats['size'] == 2 and stats['evictions'] == 1
+  assert stats['hits'] == 3 and stats['misses'] == 1
+  assert stats['hitRate'] == 0.75
+
+
+def test_lru_cache_expires_and_patches():
+  """Checks that expired entries are misses and patching keeps an entry cached."""
+  cache = LRUCache(maxSize=2, ttl=-1)
+  cache.put('a', 1)
+  assert cache.get('a') is None and len(cache) == 0
+  cache = LRUCache(maxSize=2, ttl=60)
+  cache.put('a', (False, 'profile'))
+  cache.patch('a', lambda cached: (True, cached[1]))
+  assert cache.get('a') == (True, 'profile')
+  cache.invalidate('a')
+  assert cache.get('a') is None
+
+
+def test_profile_menus_query_once(system_instance, friend_with_profile, capsys):
+  """Checks that browsing the profile menus loads the profile from the database once."""
+  system_instance.user.login(friend_with_profile, 'first', 'last', 'Usf', 'Cs', True, True, True, "English")
+  statements = trace_statements(system_instance)
+  # view profile, then move in and out of the edit, education and experience menus
+  inputs = ['2', '0', '1', '3', '0', '4', '0', '5', '0', '0', '0']
+  with mock.patch('builtins.input', side_effect=inputs):
+    system_instance.user_profile_menu()
+  assert "Title: Intern" in capsys.readouterr().out
+  assert len([sql for sql in statements if 'FROM profile_documents' in sql]) == 1
+  assert all(not sql.lstrip().startswith('UPDATE') for sql in statements)
+  assert system_instance.profileCache.stats()['hits'] > 0
+
+
+def test_profile_edit_invalidates_cache(system_instance, friend_with_profile, capsys):
+  """Checks that editing the profile replaces the cached profile."""
+  system_instance.user.login(friend_with_profile, 'first', 'last', 'Usf', 'Cs', True, True, True, "English")
+  system_instance.loadUserProfile()
+  assert friend_with_profile in system_instance.profileCache.entries
+  inputs = ['1', 'Engineer', '0', '0']
+  with mock.patch('builtins.input', side_effect=inputs):
+    system_instance.edit_profile_menu()
+  assert system_instance.user.Profile.headline == 'Engineer'
+  assert system_instance.profileCache.get(friend_with_profile)[1].headline == 'Engineer'
+
+
+#============================================== Story 5 Tests ======================================================
+# Precompiled profile rendering templates
+
+def test_render_memoized_by_version():
+  """Checks that rendering an unchanged profile is a cache hit and a changed profile is rendered again."""
+  renderer = ProfileRenderer()
+  user = User('user1', 'emily', 'johnson', Profile=profile('Student', education=education('usf', 'cs', 2)))
+  first = renderer.render(user, 'full')
+  assert renderer.render(user, 'full') is first
+  assert renderer.stats()['hits'] == 1 and renderer.stats()['misses'] == 1
+  user.Profile.headline = 'Graduate'
+  user.Profile.touch()
+  assert 'Title: Graduate' in renderer.render(user, 'full')
+  assert renderer.stats()['misses'] == 2
+
+
+def test_render_formats():
+  """Checks the plain text and json profile formats."""
+  exp = experience(1, 'Intern', 'ABC Corp', '2020-01-01', None, 'Tampa', 'Coding')
+  user = User('user1', 'emily', 'johnson', Profile=profile('Student', None, education('usf', 'cs', 2), [exp]))
+  text = user.displayProfile('full', 'text')
+  assert 'Viewing Profile' not in text
+  assert 'Name: Emily Johnson\nTitle: Student\nAbout: N/A\n' in text
+  assert 'Experience 1: Intern\nEmployer: ABC Corp\n' in text
+  data = json.loads(user.displayProfile('full', 'json'))
+  assert data['name'] == 'Emily Johnson'
+  assert data['education'] == {'university': 'usf', 'major': 'cs', 'yearsAttended': 2}
+  assert data['experiences'][0]['employer'] == 'ABC Corp' and data['experiences'][0]['endDate'] is None
+  assert json.loads(user.displayProfile('part', 'json')) == {'name': 'Emily Johnson'}
+  with pytest.raises(ValueError):
+    user.displayProfile('full', 'html')
+
+
+#============================================== Story 6 Tests ======================================================
+# Job search and browse engine
+
+@pytest.fixture
+def many_jobs(system_instance, clear_restore_db):
+  """Inserts enough job postings to fill several pages of results."""
+  jobs = [(f"Job {n:02}", f"{'Python' if n % 2 else 'Java'} developer role", f"Employer {n % 3}", 'Tampa' if n < 10 else 'Miami', n * 1000)
+          for n in range(PAGE_SIZE * 2 + 5)]
+  query = "INSERT INTO jobs (title, description, employer, location, salary) VALUES (?, ?, ?, ?, ?)"
+  system_instance.cursor.executemany(query, jobs)
+  system_instance.conn.commit()
+  return jobs
+
+
+def test_browse_jobs_newest_first(system_instance, many_jobs, capsys):
+  """Checks that browsing displays the newest postings first, a page at a time."""
+  with mock.patch('builtins.input', side_effect=[str(PAGE_SIZE + 1), '0']):
+    system_instance.browseJobs()()
+  output = capsys.readouterr().out
+  assert "Job Postings (Page 1):" in output
+  assert f"[1] Job {len(many_jobs) - 1:02} - Employer {(len(many_jobs) - 1) % 3} (Miami)" in output
+  assert f"[{PAGE_SIZE + 1}] Next Page" in output
+  assert "Job Postings (Page 2):" in output
+
+
+def test_search_jobs_filters(system_instance, many_jobs):
+  """Checks the keyword, employer, location and salary filters."""
+  titles = lambda filters: [job.title for job in system_instance.fetchJobsPage(filters, None, 100)]
+  assert len(titles({'text': 'python'})) == len([job for job in many_jobs if 'Python' in job[1]])
+  assert titles({'text': 'pyth'}) == titles({'text': 'Python'})  # prefix match
+  assert titles({'employer': 'employer 1', 'location': 'tampa'}) == ['Job 07', 'Job 04', 'Job 01']
+  assert titles({'minSalary': 3000, 'maxSalary': 5000}) == ['Job 05', 'Job 04', 'Job 03']
+  assert titles({'text': 'java', 'maxSalary': 2000}) == ['Job 02', 'Job 00']
+  assert titles({'text': '"; DROP'}) == []
+
+
+def test_search_jobs_prompt(system_instance, many_jobs, capsys):
+  """Checks that the search prompt skips blank filters and validates salaries."""
+  with mock.patch('builtins.input', side_effect=['python', '', 'miami', '20000', '', '0']):
+    system_instance.promptJobSearch()()
+  output = capsys.readouterr().out
+  assert "[1] Job 23 - Employer 2 (Miami)" in output
+  assert "[2] Job 21 - Employer 0 (Miami)" in output
+  assert "[3]" not in output
+  with mock.patch('builtins.input', side_effect=['', '', '', 'lots', '']):
+    assert system_instance.promptJobSearch() is None
+  assert "Job Search Failed." in capsys.readouterr().out
+
+
+def test_jobs_fts_in_sync(system_instance, many_jobs):
+  """Checks that the full text index follows updates and deletes of the jobs table."""
+  system_instance.cursor.execute("UPDATE jobs SET description = 'Rust developer role' WHERE title = 'Job 00'")
+  system_instance.cursor.execute("DELETE FROM jobs WHERE title = 'Job 02'")
+  titles = lambda filters: [job.title for job in system_instance.fetchJobsPage(filters, None, 100)]
+  assert titles({'text': 'rust'}) == ['Job 00']
+  assert 'Job 02' not in titles({'text': 'java'})
+  system_instance.conn.rollback()
+
+
+def test_job_search_uses_indexes(system_instance):
+  """Checks that the job filters are answered from indexes rather than table scans."""
+  plan = lambda query: ' '.join(row[-1] for row in system_instance.cursor.execute("EXPLAIN QUERY PLAN " + query).fetchall())
+  assert 'jobs_employer' in plan("SELECT rowid FROM jobs WHERE employer = 'x' COLLATE NOCASE ORDER BY rowid DESC")
+  assert 'jobs_location' in plan("SELECT rowid FROM jobs WHERE location = 'x' COLLATE NOCASE")
+  assert 'jobs_salary' in plan("SELECT rowid FROM jobs WHERE salary >= 1 AND salary <= 2")
+  assert 'VIRTUAL TABLE INDEX' in plan("SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH 'python'")
+
+
+#============================================== Story 7 Tests ======================================================
+# Surrogate job IDs, poster accounts and the jobs counter
+
+def test_jobs_duplicate_titles_and_poster(system_instance, clear_restore_db):
+  """Checks that postings are keyed by jobID, so titles can repeat, and record who posted them and when."""
+  system_instance.cursor.execute("INSERT INTO accounts (username, fName, lName, university, major) VALUES (?, ?, ?, ?, ?)", TEST_USER[0][:5])
+  system_instance.user.login(*TEST_USER[0][:5], True, True, True, "English")
+  for _ in range(2):
+    with mock.patch('builtins.input', side_effect=['Engineer', 'Builds things', 'ABC Corp', 'Tampa', '50000']):
+      system_instance.postJob()
+  system_instance.cursor.execute("SELECT jobID, title, poster, created FROM jobs ORDER BY jobID")
+  rows = system_instance.cursor.fetchall()
+  assert [row[1:3] for row in rows] == [('Engineer', 'user1'), ('Engineer', 'user1')]
+  assert rows[0][0] != rows[1][0] and all(row[3] is not None for row in rows)
+  job = system_instance.fetchJobsPage({}, None, 1)[0]
+  assert (job.ID, job.poster) == (rows[1][0], 'user1')
+  assert "Posted By: hank hill" in job.details()
+  # deleting the poster's account removes their postings
+  system_instance.cursor.execute("DELETE FROM accounts WHERE username = 'user1'")
+  assert system_instance.rowCount('jobs') == 0
+
+
+def test_jobs_counter_maintained(system_instance, many_jobs):
+  """Checks that the jobs counter follows inserts and deletes without counting the table."""
+  assert system_instance.rowCount('jobs') == len(many_jobs)
+  system_instance.cursor.execute("DELETE FROM jobs WHERE salary < 5000")
+  assert system_instance.rowCount('jobs') == len(many_jobs) - 5
+  statements = trace_statements(system_instance)
+  system_instance.rowCount('jobs')
+  assert not any('COUNT(' in statement for statement in statements)
+  system_instance.conn.rollback()
+
+
+def test_jobs_migrated_from_title_key(tmp_path, monkeypatch):
+  """Checks that a jobs table keyed by title is migrated, keeping its postings and matching posters by name."""
+  monkeypatch.chdir(tmp_path)
+  conn = sqlite3.connect("accounts.db")
+  conn.execute("CREATE TABLE accounts (username VARCHAR(25) PRIMARY KEY, password VARCHAR(12), fName VARCHAR(25), lName VARCHAR(25))")
+  conn.execute("INSERT INTO accounts VALUES ('user1', 'Password1!', 'hank', 'hill')")
+  conn.execute("CREATE TABLE jobs (title VARCHAR(128) PRIMARY KEY, description TEXT, employer VARCHAR(128) NOT NULL, "
+               "location VARCHAR(128) NOT NULL, salary INT NOT NULL, posterFirstName VARCHAR(128), posterLastName VARCHAR(128))")
+  conn.executemany("INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                   [('Engineer', 'Python role', 'ABC', 'Tampa', 1, 'hank', 'hill'),
+                    ('Analyst', 'Java role', 'XYZ', 'Miami', 2, 'peggy', 'hill')])
+  conn.commit()
+  conn.close()
+  system = System()
+  system.cursor.execute("SELECT title, poster FROM jobs ORDER BY jobID")
+  assert system.cursor.fetchall() == [('Engineer', 'user1'), ('Analyst', None)]
+  assert system.rowCount('jobs') == 2
+  assert [job.title for job in system.fetchJobsPage({'text': 'python'}, None, 10)] == ['Engineer']
+  system.conn.close()
+
+
+#============================================== Story 8 Tests ======================================================
+# Recommended jobs matched against the user's profile
+
+def test_job_matcher_ranking():
+  """Checks that postings sharing rarer words with the candidate rank higher, and that the index updates incrementally."""
+  matcher = JobMatcher()
+  matcher.add(1, 'Python Developer', 'Build web services in python')
+  matcher.add(2, 'Java Developer', 'Build services in java')
+  matcher.add(3, 'Accountant', 'Prepare the taxes')
+  words = Counter(JobMatcher.tokenize('Python developer'))
+  assert [jobID for score, jobID in matcher.recommend(words)] == [1, 2]
+  assert len(matcher.recommend(words, k=1)) == 1
+  matcher.remove(1)
+  assert [jobID for score, jobID in matcher.recommend(words)] == [2]
+  assert 'python' not in matcher.index and len(matcher) == 2
+  matcher.add(3, 'Python Accountant')
+  assert [jobID for score, jobID in matcher.recommend(words)][0] == 3
+
+
+def test_recommended_jobs_menu(system_instance, many_jobs, capsys):
+  """Checks that the recommended jobs menu ranks postings by the user's experiences and education."""
+  system_instance.cursor.execute("INSERT INTO accounts (username, fName, lName, university, major) VALUES (?, ?, ?, ?, ?)", TEST_USER[0][:5])
+  system_instance.cursor.execute("INSERT INTO experiences (username, title, description) VALUES ('user1', 'Java Intern', 'Wrote java tools')")
+  system_instance.conn.commit()
+  system_instance.user.login(*TEST_USER[0][:5], True, True, True, "English")
+  with mock.patch('builtins.input', side_effect=['0']):
+    system_instance.recommendJobs()()
+  output = capsys.readouterr().out
+  assert "Recommended Jobs (Page 1):" in output
+  assert "[1] Job 24 - Employer 0 (Miami)" in output and "Python" not in output
+  assert "[11] Next Page" in output
+
+
+def test_posted_job_indexed_incrementally(system_instance, many_jobs):
+  """Checks that a new posting is added to the job matcher without rebuilding its index."""
+  system_instance.cursor.execute("DELETE FROM jobs WHERE salary >= 4000")
+  system_instance.cursor.execute("INSERT INTO accounts (username, fName, lName, university, major) VALUES (?, ?, ?, ?, ?)", TEST_USER[0][:5])
+  system_instance.cursor.execute("INSERT INTO experiences (username, title, description) VALUES ('user1', 'Java Intern', 'Wrote java tools')")
+  system_instance.conn.commit()
+  system_instance.user.login(*TEST_USER[0][:5], True, True, True, "English")
+  system_instance.candidateWords('user1')
+  assert len(system_instance.jobMatcher) == 4
+  with mock.patch.object(system_instance.jobMatcher, 'clear') as clear:
+    with mock.patch('builtins.input', side_effect=['Java Intern', 'Java tools team', 'ABC Corp', 'Tampa', '1']):
+      system_instance.postJob()
+    ranked = system_instance.jobMatcher.recommend(system_instance.candidateWords('user1'))
+  clear.assert_not_called()
+  assert system_instance.fetchJobsPage({'jobIDs': [ranked[0][1]]}, None, 1)[0].title == 'Java Intern'
+
+
+def test_recommended_jobs_follow_profile_edits(system_instance, many_jobs):
+  """Checks that a profile edit replaces the user's cached words used for matching."""
+  system_instance.cursor.execute("INSERT INTO accounts (username, fName, lName, university, major) VALUES (?, ?, ?, ?, ?)", TEST_USER[0][:5])
+  system_instance.user.login(*TEST_USER[0][:5], True, True, True, "English")
+  assert 'python' not in system_instance.candidateWords('user1')
+  system_instance.writeProfile('user1', "UPDATE accounts SET title = 'Python Developer' WHERE username = ?", ('user1',))
+  assert system_instance.candidateWords('user1')['python'] == 1
+
+
+def test_recommend_large_posting_set():
+  """Checks that recommending from a large number of postings stays fast."""
+  matcher = JobMatcher()
+  skills = ['python', 'java', 'sql', 'excel', 'sales', 'design', 'nursing', 'welding', 'marketing', 'finance']
+  for n in range(50000):
+    matcher.add(n, f"{skills[n % 10]} specialist {n}", f"{skills[n * 7 % 10]} and {skills[n * 3 % 10]} experience")
+  words = Counter(JobMatcher.tokenize('Nursing and welding experience'))
+  start = time.perf_counter()
+  best = matcher.recommend(words, k=10)
+  assert time.perf_counter() - start < 0.5
+  assert len(best) == 10 and all(best[i][0] >= best[i + 1][0] for i in range(9))
+
+
+#============================================== Story 9 Tests ======================================================
+# Row counters and quotas
+
+def test_account_counter_and_quota(system_instance, many_users, capsys):
+  """Checks that registration reads the maintained account counter instead of counting the accounts table."""
+  assert system_instance.rowCount('accounts') == len(many_users)
+  statements = trace_statements(system_instance)
+  system_instance.register()
+  assert "Maximum Number Of Accounts Created!" in capsys.readouterr().out
+  assert not any('COUNT(' in statement for statement in statements)
+  system_instance.setQuota('accounts', len(many_users) + 1)
+  with mock.patch('builtins.input', side_effect=TEST_USER[1][:5] + [TEST_USER[1][5]] * 2):
+    system_instance.register()
+  assert "Account created successfully." in capsys.readouterr().out
+  assert system_instance.rowCount('accounts') == len(many_users) + 1
+  assert any(statement == 'BEGIN IMMEDIATE' for statement in statements)
+  system_instance.setQuota('accounts', 10)
+
+
+def test_jobs_per_poster_quota(system_instance, many_users, capsys):
+  """Checks that a per user quota limits each poster's jobs, and a user's own quota overrides it."""
+  system_instance.setQuota('jobs', 2, '*')
+  try:
+    for n in range(3):
+      with mock.patch('builtins.input', side_effect=[f'Job {n}', 'desc', 'ABC', 'Tampa', '1']):
+        system_instance.postJob()
+    output = capsys.readouterr().out
+    assert output.count("Job Posted Successfully.") == 2
+    assert "Maximum Number Of Jobs Posts Created!" in output
+    assert system_instance.rowCount('jobs', many_users[0][0]) == 2
+    system_instance.setQuota('jobs', 3, many_users[0][0])
+    assert not system_instance.quotaReached('jobs', many_users[0][0])
+    assert system_instance.quotaReached('jobs', many_users[1][0]) is False
+    system_instance.cursor.execute("UPDATE jobs SET poster = ?", (many_users[1][0],))
+    assert system_instance.rowCount('jobs', many_users[1][0]) == 2 and system_instance.rowCount('jobs', many_users[0][0]) == 0
+  finally:
+    system_instance.setQuota('jobs', None, '*')
+    system_instance.setQuota('jobs', None, many_users[0][0])
+
+
+def test_counters_recounted(system_instance, many_jobs):
+  """Checks that recounting rebuilds the counters from the tables."""
+  system_instance.cursor.execute("UPDATE counters SET count = 0")
+  system_instance.recountRows()
+  assert system_instance.rowCount('jobs') == len(many_jobs)
+  assert system_instance.rowCount('accounts') == 0
+
+
+#============================================== Story 10 Tests =====================================================
+# Bulk import and export
+
+def test_export_import_round_trip(system_instance, many_users, friend_with_profile, tmp_path):
+  """Checks that exported tables are imported back unchanged, in both file formats."""
+  system_instance.cursor.execute("UPDATE account_settings SET language = 'Spanish' WHERE username = ?", (many_users[2][0],))
+  system_instance.cursor.execute("INSERT INTO experiences (username, title) VALUES (?, 'Intern')", (friend_with_profile,))
+  system_instance.cursor.execute("INSERT INTO jobs (title, description, employer, location, salary, poster) VALUES ('Job', 'Python role', 'ABC', 'Tampa', 1, ?)", (friend_with_profile,))
+  system_instance.conn.commit()
+  snapshot = {}
+  for table in ('accounts', 'account_settings', 'friends', 'experiences', 'jobs'):
+    snapshot[table] = system_instance.cursor.execute(f"SELECT * FROM {table} ORDER BY 1, 2").fetchall()
+  for fmt in ('csv', 'jsonl'):
+    counts = system_instance.exportData(tmp_path / fmt, fmt)
+    assert counts['accounts'] == len(many_users) and counts['jobs'] == 1
+    system_instance.cursor.execute("DELETE FROM jobs")
+    system_instance.cursor.execute("DELETE FROM accounts")
+    system_instance.conn.commit()
+    assert system_instance.importData(tmp_path / fmt, fmt) == counts
+    for table, rows in snapshot.items():
+      assert system_instance.cursor.execute(f"SELECT * FROM {table} ORDER BY 1, 2").fetchall() == rows
+    assert system_instance.rowCount('accounts') == len(many_users)
+    assert system_instance.rowCount('jobs', friend_with_profile) == 1
+    assert [job.title for job in system_instance.fetchJobsPage({'text': 'python'}, None, 10)] == ['Job']
+
+
+def test_import_maintains_derived_data(memory_system, tmp_path):
+  """Checks that importing many students keeps the schema and creates each student's settings, profile document and journal entry."""
+  system_instance = memory_system
+  schema = lambda: system_instance.cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('index', 'trigger') ORDER BY name").fetchall()
+  before = schema()
+  path = tmp_path / "students.csv"
+  path.write_text("username,fName,lName,university,major\n" +
+                  "".join(f"student{n},first,last{n},Usf,Cs\n" for n in range(50000)))
+  start = time.perf_counter()
+  assert system_instance.importTable('accounts', str(path), chunkSize=10000) == 50000
+  assert time.perf_counter() - start < 30
+  assert schema() == before
+  assert system_instance.rowCount('accounts') == 50000
+  assert system_instance.cursor.execute("SELECT COUNT(*) FROM account_settings").fetchone()[0] == 50000
+  assert system_instance.cursor.execute("SELECT COUNT(*) FROM profile_documents").fetchone()[0] == 50000
+  assert system_instance.cursor.execute("SELECT COUNT(*) FROM changes WHERE tableName = 'accounts'").fetchone()[0] == 50000
+  assert system_instance.cursor.execute("SELECT password, profile FROM accounts WHERE username = 'student7'").fetchone() == (None, None)
+
+
+def test_import_failure_keeps_committed_chunks(system_instance, clear_restore_db, tmp_path):
+  """Checks that a bad row rolls back only its own chunk, and that the imported accounts still get their settings."""
+  path = tmp_path / "accounts.jsonl"
+  path.write_text(''.join(json.dumps({'username': f"user{n % 5 if n == 7 else n}"}) + '\n' for n in range(10)))
+  with pytest.raises(sqlite3.IntegrityError):
+    system_instance.importTable('accounts', str(path), chunkSize=5)
+  assert system_instance.rowCount('accounts') == 5
+  assert system_instance.cursor.execute("SELECT COUNT(*) FROM account_settings").fetchone()[0] == 5
+  with pytest.raises(ValueError):
+    system_instance.importTable('accounts', str(tmp_path / "accounts.xml"))
+  (tmp_path / "bad.csv").write_text("username,salary\nuser9,1\n")
+  with pytest.raises(ValueError):
+    system_instance.importTable('accounts', str(tmp_path / "bad.csv"))
+
+
+def test_import_hashes_passwords(system_instance, clear_restore_db, tmp_path, capsys):
+  """Checks that imported plain text passwords are hashed so the accounts can log in, and that hashed passwords are kept."""
+  hashed = system_instance.encryption('Password2@')
+  path = tmp_path / "accounts.csv"
+  path.write_text(f"username,password\nuser1,Password1!\nuser2,{hashed}\nuser3,\n")
+  assert system_instance.importTable('accounts', str(path)) == 3
+  rows = system_instance.cursor.execute("SELECT username, password FROM accounts ORDER BY username").fetchall()
+  assert rows == [('user1', system_instance.encryption('Password1!')), ('user2', hashed), ('user3', None)]
+  for userName, password in (('user1', 'Password1!'), ('user2', 'Password2@')):
+    with mock.patch('builtins.input', side_effect=[userName, password]):
+      system_instance.login()
+    assert "You Have Successfully Logged In!" in capsys.readouterr().out
+
+
+def test_import_keeps_schema(system_instance, clear_restore_db, tmp_path):
+  """
+  Checks that another connection sees the same triggers and indexes during an import,
+  and that an account it registers during the import still gets its settings and profile document.
+  """
+  other = System()
+  schema = lambda: other.cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('index', 'trigger') ORDER BY name").fetchall()
+  before = schema()
+  readRows = System.readRows
+  def register(path, fmt):
+    for n, row in enumerate(readRows(path, fmt)):
+      if n == 2:
+        assert schema() == before
+        other.cursor.execute("INSERT INTO accounts (username) VALUES ('other')")
+        other.conn.commit()
+      yield row
+  path = tmp_path / "accounts.jsonl"
+  path.write_text(''.join(json.dumps({'username': f"user{n}"}) + '\n' for n in range(4)))
+  with mock.patch.object(System, 'readRows', staticmethod(register)):
+    assert system_instance.importTable('accounts', str(path), chunkSize=2) == 4
+  for userName in ('other', 'user3'):
+    assert system_instance.cursor.execute("SELECT 1 FROM account_settings WHERE username = ?", (userName,)).fetchone()
+    assert system_instance.cursor.execute("SELECT 1 FROM profile_documents WHERE username = ?", (userName,)).fetchone()
+  assert system_instance.rowCount('accounts') == 5
+  other.conn.close()
+
+
+#============================================== Story 11 Tests =====================================================
+# Online backup and snapshots
+
+def test_snapshot_restore(system_instance, many_users):
+  """Checks that restoring a snapshot returns the tables, counters and caches to the snapshot's state."""
+  snapshot = system_instance.snapshot()
+  system_instance.cachedProfile(many_users[0][0])
+  system_instance.cursor.execute("DELETE FROM accounts")
+  system_instance.cursor.execute("INSERT INTO accounts (username) VALUES ('uncommitted')")
+  system_instance.restore(snapshot)
+  assert system_instance.rowCount('accounts') == len(many_users)
+  assert system_instance.cursor.execute("SELECT COUNT(*) FROM account_settings").fetchone()[0] == len(many_users)
+  assert len(system_instance.profileCache) == 0
+  snapshot.close()
+
+
+def test_restore_discards_derived_state(memory_system):
+  """Checks that restoring a snapshot discards unsaved settings changes and the caches built from the replaced data."""
+  memory_system.cursor.execute("INSERT INTO accounts (username) VALUES ('user1')")
+  memory_system.conn.commit()
+  snapshot = memory_system.snapshot()
+  memory_system.settings.set('user1', 'language', 'Spanish')
+  memory_system.cursor.execute("INSERT INTO accounts (username) VALUES ('user2')")
+  memory_system.conn.commit()
+  memory_system.addUsername('user2')
+  memory_system.cachedProfile('user1')
+  memory_system.restore(snapshot)
+  assert not memory_system.settings.pending and len(memory_system.profileCache) == 0
+  assert 'user2' not in memory_system.usernames
+  memory_system.settings.flush()
+  language = "SELECT language FROM account_settings WHERE username = 'user1'"
+  assert memory_system.cursor.execute(language).fetchone() == ('English',)
+  snapshot.close()
+
+
+def test_backup_in_steps(system_instance, many_users, tmp_path):
+  """Checks that an online backup is copied in steps and can be restored while other connections use the database."""
+  steps = []
+  path = str(tmp_path / "backup.db")
+  system_instance.backup(path, pages=1, sleep=0, progress=lambda status, remaining, total: steps.append(remaining))
+  assert len(steps) > 1 and steps[-1] == 0
+  other = System()
+  other.cursor.execute("DELETE FROM accounts WHERE username = ?", (many_users[0][0],))
+  other.conn.commit()
+  assert system_instance.rowCount('accounts') == len(many_users) - 1
+  system_instance.restore(path)
+  assert other.rowCount('accounts') == len(many_users)
+  other.conn.close()
+
+
+#============================================== Story 12 Tests =====================================================
+# Configurable database location and in memory systems
+
+def test_memory_systems_isolated(memory_system):
+  """Checks that in memory systems cloned from a template don't share data, with each other or accounts.db."""
+  other = System.fromTemplate(memory_system)
+  memory_system.cursor.execute("INSERT INTO accounts (username) VALUES ('user1')")
+  memory_system.conn.commit()
+  assert memory_system.rowCount('accounts') == 1
+  assert other.rowCount('accounts') == 0
+  assert System.fromTemplate(memory_system).rowCount('accounts') == 1
+  assert memory_system.cursor.execute("PRAGMA database_list").fetchone()[2] == ''
+  other.conn.close()
+
+
+def test_shared_memory_database():
+  """Checks that systems opening the same shared cache memory URI use one database."""
+  uri = "file:test_shared_memory?mode=memory&cache=shared"
+  first = System(uri)
+  second = System(uri)
+  first.cursor.execute("INSERT INTO jobs (title, employer, location, salary) VALUES ('Job', 'ABC', 'Tampa', 1)")
+  first.conn.commit()
+  assert second.rowCount('jobs') == 1
+  assert second.database == uri
+  first.conn.close()
+  second.conn.close()
+
+
+def test_template_file_clone(memory_system, many_users, system_instance, tmp_path):
+  """Checks that a system can be cloned from a database file, leaving the file unchanged."""
+  path = str(tmp_path / "template.db")
+  system_instance.backup(path)
+  clone = System.fromTemplate(path)
+  assert clone.rowCount('accounts') == len(many_users)
+  clone.cursor.execute("DELETE FROM accounts")
+  clone.conn.commit()
+  assert System(path).rowCount('accounts') == len(many_users)
+  clone.conn.close()
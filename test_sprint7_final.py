@@ -0,0 +1,1073 @@
+import pytest
+import sqlite3
+import time
+import inspect
+import runpy
+import threading
+from unittest import mock
+import system as system_module
+from system import System
+
+
+# a list of test users with the attributes necessary for registration
+TEST_USER = [
+  ['user1', 'hank', 'hill', 'uni1', 'major1', 'Password1!'],
+  ['user2', 'bobby', 'hill', 'uni2', 'major2', 'Password2@'],
+  ['user3', 'dale', 'gribble', 'uni3', 'major3', 'Password3#'],
+]
+
+
+#============================================== Fixtures ============================================================
+
+# an empty database with the current schema, cloned by the memory_system fixture
+TEMPLATE_DB = System(":memory:")
+
+
+@pytest.fixture
+def memory_system():
+  """Creates a system with a private in memory database cloned from an empty template database, and initializes its menus."""
+  s1 = System.fromTemplate(TEMPLATE_DB)
+  s1.initMenu()
+  yield s1
+  s1.conn.close()
+
+
+@pytest.fixture
+def registered_users(memory_system):
+  """Registers the test users, and returns their registration details."""
+  for user in TEST_USER:
+    with mock.patch('builtins.input', side_effect=user + [user[-1]]):
+      memory_system.register()
+  return TEST_USER
+
+
+def login(system_instance, user):
+  """Logs the user in through the login prompt."""
+  with mock.patch('builtins.input', side_effect=[user[0], user[-1]]):
+    return system_instance.login()
+
+
+#============================================== Story 1 Tests ======================================================
+# Resumable login sessions
+
+def test_login_creates_signed_session(memory_system, registered_users):
+  """Checks that logging in stores a session that expires, with a token signed for the session."""
+  assert login(memory_system, registered_users[0]) is not None
+  token = memory_system.sessionToken
+  sessionID, signature = token.split('.')
+  username, expires = memory_system.cursor.execute("SELECT username, expires FROM sessions WHERE sessionID = ?", (sessionID,)).fetchone()
+  assert username == 'user1'
+  assert expires == pytest.approx(time.time() + system_module.SESSION_TTL, abs=5)
+  assert signature == memory_system.signSession(sessionID, username, expires)
+
+
+def test_resume_session_skips_login_work(memory_system, registered_users, capsys):
+  """Checks that resuming a session restores the user and their settings without the accounts join or hashing."""
+  login(memory_system, registered_users[0])
+  memory_system.user.language = 'Spanish'
+  memory_system.saveSession()
+  memory_system.user.logout()
+  statements = []
+  memory_system.conn.set_trace_callback(statements.append)
+  with mock.patch.object(memory_system, 'encryption') as encryption:
+    assert memory_system.resumeSession() == memory_system.home_page
+  encryption.assert_not_called()
+  assert not any('accounts' in statement for statement in statements)
+  assert memory_system.user.loggedOn and memory_system.user.userName == 'user1'
+  assert (memory_system.user.fName, memory_system.user.language) == ('hank', 'Spanish')
+  assert "You Have Successfully Logged In!" in capsys.readouterr().out
+
+
+def test_resume_rejects_bad_tokens(memory_system, registered_users, capsys):
+  """Checks that forged, expired and ended sessions can't be resumed."""
+  login(memory_system, registered_users[0])
+  token = memory_system.sessionToken
+  sessionID = token.split('.')[0]
+  memory_system.user.logout()
+  assert memory_system.resumeSession(sessionID + '.' + '0' * 64) is None
+  assert memory_system.resumeSession('missing.token') is None
+  assert memory_system.resumeSession(sessionID + '.' + 'é' * 64) is None
+  memory_system.cursor.execute("UPDATE sessions SET expires = expires + 3600 WHERE sessionID = ?", (sessionID,))
+  assert memory_system.resumeSession(token) is None  # the expiry no longer matches the signature
+  assert not memory_system.user.loggedOn
+  login(memory_system, registered_users[1])
+  memory_system.endSession()
+  assert memory_system.sessionToken is None
+  assert "Your Session Has Expired, Please Log In Again." in capsys.readouterr().out
+
+
+def test_main_with_bad_session_and_empty_ssh_client(tmp_path, memory_system, registered_users, capsys):
+  """Checks that main.py reports a non ASCII session token as expired, and uses the default origin when SSH_CLIENT is empty."""
+  path = str(tmp_path / 'session.db')
+  memory_system.backup(path)
+  with mock.patch('sys.argv', ['main.py', '--database', path, '--session', 'id.\u00e9']), \
+       mock.patch.dict('os.environ', {'SSH_CLIENT': ''}), mock.patch.object(system_module.Menu, 'clear'), \
+       mock.patch('builtins.input', side_effect=['0']):
+    namespace = runpy.run_path('main.py')
+  assert namespace['system'].origin == system_module.DEFAULT_ORIGIN
+  out = capsys.readouterr().out
+  assert "Your Session Has Expired, Please Log In Again." in out and "Exited from InCollege" in out
+
+
+def test_expired_sessions_reaped(memory_system, registered_users):
+  """Checks that expired sessions are removed by the home page's background action, at most once per interval."""
+  login(memory_system, registered_users[0])
+  login(memory_system, registered_users[1])
+  memory_system.cursor.execute("UPDATE sessions SET expires = 0 WHERE username = 'user1'")
+  memory_system.conn.commit()
+  with mock.patch('builtins.input', side_effect=['0']):
+    memory_system.homePage.start()
+  assert memory_system.cursor.execute("SELECT username FROM sessions").fetchall() == [('user2',)]
+  memory_system.cursor.execute("UPDATE sessions SET expires = 0")
+  memory_system.reapSessions()
+  assert memory_system.cursor.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] == 1
+  memory_system.reapSessions(force=True)
+  assert memory_system.sessionToken is None
+  # removing an account removes its sessions
+  login(memory_system, registered_users[2])
+  memory_system.cursor.execute("DELETE FROM accounts WHERE username = 'user3'")
+  assert memory_system.cursor.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] == 0
+
+
+#============================================== Story 2 Tests ======================================================
+# Login attempt throttling
+
+def test_token_bucket_refills():
+  """Checks that a bucket allows a burst, then one attempt per refill period, and counts blocked attempts."""
+  limiter = system_module.TokenBucketLimiter(capacity=3, rate=0.5)
+  assert [limiter.take('key', now=0) for _ in range(4)] == [True, True, True, False]
+  assert not limiter.take('key', now=1)
+  assert limiter.take('key', now=2)
+  assert limiter.take('other', now=2)
+  assert limiter.stats()['allowed'] == 5 and limiter.stats()['blocked'] == 2
+
+
+def test_token_bucket_eviction():
+  """Checks that full buckets are swept and the least recently used buckets are evicted beyond the maximum."""
+  limiter = system_module.TokenBucketLimiter(capacity=2, rate=1, maxKeys=3, evictInterval=10)
+  for n in range(5):
+    limiter.take(n, now=limiter.swept)
+  assert list(limiter.buckets) == [2, 3, 4] and limiter.stats()['evictions'] == 2
+  assert limiter.available(0, now=limiter.swept)  # an evicted bucket is full again
+  limiter.take('late', now=limiter.swept + 20)
+  assert list(limiter.buckets) == ['late']
+
+
+def test_login_throttled_before_lookup(memory_system, registered_users, capsys):
+  """Checks that blocked login attempts are rejected before the account lookup and password hash."""
+  user = registered_users[0]
+  for _ in range(system_module.LOGIN_USER_BURST):
+    with mock.patch('builtins.input', side_effect=[user[0], 'wrong']):
+      memory_system.login()
+  statements = []
+  memory_system.conn.set_trace_callback(statements.append)
+  with mock.patch.object(memory_system, 'encryption') as encryption:
+    assert login(memory_system, user) is None
+  encryption.assert_not_called()
+  assert statements == []
+  assert "Too Many Login Attempts, Please Try Again Later." in capsys.readouterr().out
+  # other users from the same origin can still log in
+  assert login(memory_system, registered_users[1]) is not None
+  assert memory_system.metrics()['userLogins']['blocked'] == 1
+
+
+def test_login_throttled_per_origin(memory_system, registered_users):
+  """Checks that an origin trying many usernames is blocked, without using up the usernames' attempts."""
+  for n in range(system_module.LOGIN_ORIGIN_BURST):
+    with mock.patch('builtins.input', side_effect=[f'guess{n}', 'wrong']):
+      memory_system.login()
+  assert login(memory_system, registered_users[0]) is None
+  assert memory_system.userLoginLimiter.available('user1')
+  assert memory_system.metrics()['originLogins']['blocked'] == 1
+  other = System.fromTemplate(memory_system)
+  other.origin = '10.0.0.2'
+  assert login(other, registered_users[0]) is not None
+  other.conn.close()
+
+
+#============================================== Story 3 Tests ======================================================
+# Coalesced settings writes
+
+def settings_row(system_instance, username):
+  return system_instance.cursor.execute("SELECT email, sms, targetedAds, language FROM account_settings WHERE username = ?", (username,)).fetchone()
+
+
+def test_guest_controls_write_once(memory_system, registered_users):
+  """Checks that toggling several settings is written in a single UPSERT when leaving the guest controls."""
+  login(memory_system, registered_users[0])
+  statements = []
+  memory_system.conn.set_trace_callback(statements.append)
+  with mock.patch('builtins.input', side_effect=['1', '2', '3', '1', '0']):
+    memory_system.guest_controls()
+  # the statement is traced again for each trigger it fires, so identical traces are one write
+  writes = list(dict.fromkeys(statement for statement in statements if 'account_settings' in statement))
+  assert len(writes) == 1 and 'ON CONFLICT' in writes[0]
+  assert settings_row(memory_system, 'user1') == (1, 0, 0, 'English')
+  assert (memory_system.user.email, memory_system.user.sms, memory_system.user.targetedAds) == (True, False, False)
+
+
+def test_settings_flushed_on_timer(memory_system, registered_users):
+  """Checks that changes are written by the settings menu's background action once they are due."""
+  login(memory_system, registered_users[0])
+  memory_system.setUserLanguage('Spanish')
+  memory_system.flushSettingsIfDue()
+  assert settings_row(memory_system, 'user1')[3] == 'English'
+  memory_system.settings.dirtySince -= system_module.SETTINGS_FLUSH_INTERVAL
+  with mock.patch('builtins.input', side_effect=['0']):
+    memory_system.languageMenu.start()
+  assert settings_row(memory_system, 'user1')[3] == 'Spanish'
+
+
+def test_failed_flush_keeps_changes(memory_system, registered_users, capsys):
+  """Checks that changes are kept when they can't be written, and written by the next flush."""
+  login(memory_system, registered_users[0])
+  memory_system.setUserEmail()
+  other = sqlite3.connect(":memory:")
+  memory_system.settings.conn = other  # a connection without the account_settings table
+  memory_system.flushSettings()
+  assert "Please Try Again Later." in capsys.readouterr().out
+  assert memory_system.settings.pending == {'user1'}
+  memory_system.settings.conn = memory_system.conn
+  memory_system.flushSettings()
+  assert settings_row(memory_system, 'user1')[0] == 0 and not memory_system.settings.pending
+  other.close()
+
+
+def test_settings_flushed_from_any_menu(memory_system, registered_users):
+  """Checks that due changes are written by the next menu step, even when no settings menu is open."""
+  login(memory_system, registered_users[0])
+  memory_system.setUserLanguage('Spanish')
+  memory_system.settings.dirtySince -= system_module.SETTINGS_FLUSH_INTERVAL
+  with mock.patch('builtins.input', side_effect=['0']):
+    memory_system.skills_menu()
+  assert settings_row(memory_system, 'user1')[3] == 'Spanish'
+
+
+def test_failed_flushes_discard_changes(memory_system, registered_users, capsys):
+  """Checks that a failed flush is retried once the interval passes again, and the changes are discarded after the last attempt."""
+  login(memory_system, registered_users[0])
+  memory_system.setUserEmail()
+  busy = system_module.DatabaseBusyError("database is locked")
+  with mock.patch.object(memory_system.writer, 'run', side_effect=busy):
+    for attempt in range(system_module.SETTINGS_FLUSH_ATTEMPTS - 1):
+      memory_system.flushSettings()
+      assert not memory_system.settings.due()
+      assert memory_system.settings.pending == {'user1'}
+    assert system_module.MSG_SETTINGS_DROPPED not in capsys.readouterr().out
+    memory_system.flushSettings()
+  assert system_module.MSG_SETTINGS_DROPPED in capsys.readouterr().out
+  assert not memory_system.settings.pending and memory_system.settings.dropped == 1
+  # the discarded change is no longer shown as the user's setting
+  assert memory_system.user.email == True and settings_row(memory_system, 'user1')[0] == 1
+
+
+def test_settings_loaded_once_per_session(memory_system, registered_users):
+  """Checks that logging in reads the settings once, and logging out saves them before they are unloaded."""
+  login(memory_system, registered_users[0])
+  statements = []
+  memory_system.conn.set_trace_callback(statements.append)
+  login(memory_system, registered_users[0])
+  assert not any('account_settings' in statement for statement in statements)
+  memory_system.setUserSMS()
+  with mock.patch('builtins.input', side_effect=['0']):
+    memory_system.home_page()
+  assert settings_row(memory_system, 'user1')[1] == 0
+  assert 'user1' not in memory_system.settings.settings
+  # guests' settings are never written
+  memory_system.setUserSMS()
+  assert not memory_system.settings.pending
+
+
+#============================================== Story 4 Tests ======================================================
+# Navigation stack
+
+def test_deep_navigation_constant_call_stack():
+  """Checks that opening menus from menu actions doesn't nest calls, however deep the menus go."""
+  depth = 2000  # deeper than the interpreter's recursion limit allows for nested menus
+  menus = [system_module.Menu() for _ in range(depth)]
+  frames = []
+  def record():
+    frames.append(len(inspect.stack(0)))
+  for menu, nextMenu in zip(menus, menus[1:]):
+    menu.addItem('Next', nextMenu.start)
+  menus[0].addBackgroundAction(record)
+  menus[-1].addBackgroundAction(record)
+  with mock.patch.object(system_module.Menu, 'clear'), mock.patch.object(system_module.Menu, 'displaySelections'):
+    with mock.patch('builtins.input', side_effect=['1'] * (depth - 1) + ['0'] * depth):
+      menus[0].start()
+  # the deepest menu runs at the same call depth as the first
+  assert len(frames) == 3 and frames[0] == frames[1] == frames[2]
+  assert system_module.Navigator.current is None
+
+
+def test_navigation_exit_callbacks(memory_system, capsys):
+  """Checks that a menu's exit callback runs when it is closed, before the menu below it is shown again."""
+  events = []
+  outer, inner = system_module.Menu(), system_module.Menu()
+  outer.addBackgroundAction(lambda: events.append('outer shown'))
+  def openInner():
+    inner.start(onExit=lambda: events.append('inner closed'))
+    events.append('action returned')
+  outer.addItem('Inner', openInner)
+  with mock.patch('builtins.input', side_effect=['1', '0', '0']):
+    outer.start(onExit=lambda: events.append('outer closed'))
+  assert events == ['outer shown', 'action returned', 'inner closed', 'outer shown', 'outer closed']
+  # leaving the main menu logs the user out once the menu is closed
+  memory_system.user.loggedOn = True
+  with mock.patch.object(memory_system, 'logout') as logout, mock.patch('builtins.input', side_effect=['0']):
+    memory_system.home_page()
+  logout.assert_called_once()
+
+
+def test_navigation_stack_reset_after_error():
+  """Checks that an error raised from a menu action closes every open menu."""
+  menu = system_module.Menu()
+  def fail():
+    raise RuntimeError()
+  menu.addItem('Fail', fail)
+  with mock.patch('builtins.input', side_effect=['1']), pytest.raises(RuntimeError):
+    menu.start()
+  assert system_module.Navigator.current is None
+
+
+#============================================== Story 5 Tests ======================================================
+# Type-ahead selections
+
+def test_typed_ahead_menus_not_displayed():
+  """Checks that a line of several selections walks through the menus without displaying the ones in between."""
+  outer, inner = system_module.Menu(), system_module.Menu()
+  shown = []
+  outer.addBackgroundAction(lambda: shown.append('outer'), onDisplay=True)
+  inner.addBackgroundAction(lambda: shown.append('inner'), onDisplay=True)
+  chosen = []
+  outer.addItem('Inner', inner.start)
+  inner.addItem('First', lambda: chosen.append(1))
+  inner.addItem('Second', lambda: chosen.append(2))
+  with mock.patch.object(system_module.Menu, 'clear'), mock.patch.object(system_module.Menu, 'displaySelections') as display:
+    with mock.patch('builtins.input', side_effect=['1 2, 0 0']) as prompt:
+      outer.start()
+  assert chosen == [2]
+  assert prompt.call_count == 1 and display.call_count == 1
+  assert shown == ['outer']
+
+
+def test_typed_ahead_background_actions_still_run():
+  """Checks that background actions building a menu's selections run for menus whose selection was typed ahead."""
+  outer, inner = system_module.Menu(), system_module.Menu()
+  chosen = []
+  def populate():
+    inner.clearSelections()
+    inner.addItem('Built', lambda: chosen.append('built'))
+  inner.addBackgroundAction(populate)
+  outer.addItem('Inner', inner.start)
+  with mock.patch.object(system_module.Menu, 'clear'), mock.patch('builtins.input', side_effect=['1 1 0 0']):
+    outer.start()
+  assert chosen == ['built']
+
+
+def test_invalid_typed_ahead_selection(capsys):
+  """Checks that an invalid typed ahead selection discards the rest of the line and displays the menu."""
+  outer, inner = system_module.Menu(), system_module.Menu()
+  chosen = []
+  outer.addItem('Inner', inner.start)
+  inner.addItem('First', lambda: chosen.append(1))
+  with mock.patch.object(system_module.Menu, 'clear'):
+    with mock.patch('builtins.input', side_effect=['1 7 1', '0', '0']) as prompt:
+      outer.start()
+  assert chosen == []
+  assert prompt.call_count == 3
+  assert "Invalid selection. Please try again." in capsys.readouterr().out
+
+
+def test_several_selections_without_navigator(capsys):
+  """Checks that a menu prompted outside a navigator accepts a single selection only."""
+  menu = system_module.Menu()
+  menu.addItem('First', lambda: None)
+  menu.currSelections = menu.getValidSelections()
+  with mock.patch('builtins.input', side_effect=['1 1', '1']):
+    assert menu.selectOption() == 1
+  assert "Invalid selection. Please try again." in capsys.readouterr().out
+
+
+def test_typed_ahead_from_home_page(memory_system, registered_users, capsys):
+  """Checks that typing ahead from the home page logs in and exits on one line after the credentials."""
+  with mock.patch('builtins.input', side_effect=['1', TEST_USER[0][0], TEST_USER[0][-1], '0 0']) as prompt:
+    memory_system.home_page()
+  assert prompt.call_count == 4
+  assert not memory_system.user.loggedOn
+
+
+#============================================== Story 6 Tests ======================================================
+# Routes & command palette
+
+def test_routes_cover_menus(memory_system):
+  """Checks that the route table holds a stable path for the nested menus and their items."""
+  for path in ['profile/edit/exp/3/location', 'profile/edit/edu/years', 'jobs/search', 'friends/pending',
+               'links/important/privacy/guest-controls', 'skills/coding']:
+    assert path in memory_system.routes
+  assert memory_system.mainMenu.owner is memory_system
+
+
+def test_routes_resolve_to_menu_items(memory_system):
+  """Checks that every route opens an item of its menu's definition, and that a route naming a missing item is rejected."""
+  for path, route in memory_system.routes.items():
+    assert route['entry'] in system_module.MENU_TABLE[system_module.ROUTE_SPEC[path][0]].entries
+    assert route['entry'] in route['menu'].selections
+  spec = {'skills/coding': ('skillsMenu', 'renamedSkill', 'isLoggedOn')}
+  with pytest.raises(ValueError):
+    system_module.compileRoutes(spec, system_module.MENU_TABLE)
+
+
+def test_route_runs_only_target_loading(memory_system, registered_users):
+  """Checks that opening a deep route loads the profile once and doesn't open the menus above it."""
+  login(memory_system, TEST_USER[0])
+  with mock.patch.object(memory_system, 'loadUserProfile', wraps=memory_system.loadUserProfile) as load, \
+       mock.patch.object(memory_system, 'edit_exp_location') as edit, \
+       mock.patch.object(system_module.Menu, 'start') as start:
+    memory_system.initRoutes()
+    memory_system.goTo('/profile/edit/exp/3/location')
+  load.assert_called_once()
+  edit.assert_called_once_with('location3')
+  start.assert_not_called()
+
+
+def test_route_not_found_or_unavailable(memory_system, capsys):
+  """Checks that unknown routes and routes that need a login are not opened."""
+  assert memory_system.goTo('/no/such/page') is None
+  assert "Page Not Found: /no/such/page" in capsys.readouterr().out
+  with mock.patch.object(memory_system, 'jobs_menu') as jobs:
+    memory_system.initRoutes()
+    assert memory_system.goTo('jobs') is None
+  jobs.assert_not_called()
+  assert "This Page Is Not Available" in capsys.readouterr().out
+
+
+def test_command_palette_from_menu(memory_system, registered_users):
+  """Checks that a route typed at a menu prompt opens the page and returns to the menu afterwards."""
+  with mock.patch.object(memory_system, 'skillD', return_value=None) as skill, mock.patch.object(system_module.Menu, 'clear'):
+    memory_system.initRoutes()
+    login(memory_system, TEST_USER[0])
+    with mock.patch('builtins.input', side_effect=['/skills/coding', '0']):
+      memory_system.main_menu()
+  skill.assert_called_once()
+
+
+def test_palette_reopens_friend_screen(memory_system, registered_users, capsys):
+  """Checks that a friend screen opened again from the command palette gets its own selections, not the open screen's."""
+  query = "INSERT INTO friends (sender, receiver, status) VALUES (?, ?, 'accepted')"
+  memory_system.cursor.executemany(query, [('user1', 'user2'), ('user1', 'user3')])
+  memory_system.conn.commit()
+  login(memory_system, TEST_USER[0])
+  # open dale, open bobby from the palette, then back on dale's screen disconnect from dale
+  with mock.patch.object(system_module.Menu, 'clear'), \
+       mock.patch('builtins.input', side_effect=['2', '/friends/network', '1', '0', '0', '1', '0', '0']):
+    memory_system.network_menu()
+  output = capsys.readouterr().out
+  assert "[2] Disconnect" not in output
+  assert memory_system.friendStatus('user3') is None
+  assert memory_system.friendStatus('user2') == 'accepted'
+
+
+
+@pytest.mark.parametrize('route, inputs, page', [
+  ('jobs/browse', [], "No Job Postings Found."),
+  ('register', ['user4', 'rita', 'race', 'uni', 'major', 'Password4$', 'Password4$'], "Log In:"),  # register returns login
+])
+def test_route_option_opens_page(tmp_path, memory_system, registered_users, route, inputs, page, capsys):
+  """Checks that main.py --route follows the menus returned by the route's action, so the page is displayed."""
+  path = str(tmp_path / 'route.db')
+  memory_system.backup(path)
+  args = ['main.py', '--database', path, '--route', route]
+  if route.startswith('jobs'):
+    session = System(path)
+    login(session, TEST_USER[0])
+    args += ['--session', session.sessionToken]
+    session.conn.close()
+  capsys.readouterr()
+  with mock.patch('sys.argv', args), mock.patch.object(system_module.Menu, 'clear'), \
+       mock.patch('builtins.input', side_effect=inputs + ['0'] * 10):
+    runpy.run_path('main.py')
+  out = capsys.readouterr().out
+  assert page in out and out.index(page) < out.index("Exited from InCollege")
+
+#============================================== Story 7 Tests ======================================================
+# Declarative menu table
+
+def test_menu_table_immutable():
+  """Checks that the compiled menu table and its entries can't be changed."""
+  table = system_module.MENU_TABLE
+  with pytest.raises(TypeError):
+    table['homePage'] = None
+  entry = table['homePage'].entries[0]
+  assert isinstance(table['homePage'].entries, tuple)
+  assert entry == system_module.MenuEntry('Login', None, 'login', (), None)
+  with pytest.raises(AttributeError):
+    entry.label = 'Logout'
+
+
+def test_menu_table_shared_by_systems(memory_system):
+  """Checks that every system's menus share the compiled entries instead of building their own."""
+  other = System.fromTemplate(TEMPLATE_DB)
+  other.initMenu()
+  assert memory_system.homePage.selections is other.homePage.selections
+  assert memory_system.experience3Menu.selections is system_module.MENU_TABLE['experience3Menu'].entries
+  # entries are still read like the selections added by addItem
+  assert [item['label'] for item in other.jobsMenu.selections] == ['Post Job', 'Browse Jobs', 'Search Jobs', 'Recommended Jobs']
+  other.conn.close()
+
+
+def test_menu_entries_dispatch_to_owner(memory_system, registered_users, capsys):
+  """Checks that entries call their owner's methods with their arguments and render dynamic labels per system."""
+  login(memory_system, TEST_USER[0])
+  with mock.patch.object(memory_system, 'searchUserByField', return_value=None) as search, mock.patch.object(system_module.Menu, 'clear'):
+    with mock.patch('builtins.input', side_effect=['2', '0']):
+      memory_system.find_a_friend_menu()
+  search.assert_called_once_with('university')
+  capsys.readouterr()
+  with mock.patch('builtins.input', side_effect=['0']):
+    memory_system.guest_controls()
+  output = capsys.readouterr().out
+  assert "[1] Email [ON]" in output and "[3] Targeted Advertising [ON]" in output
+
+
+def test_menu_with_added_items_copies_entries(memory_system):
+  """Checks that adding an item to a compiled menu doesn't change the shared table."""
+  entries = system_module.MENU_TABLE['joinMenu'].entries
+  memory_system.joinMenu.addItem('Extra', lambda: None)
+  assert len(memory_system.joinMenu.selections) == len(entries) + 1
+  assert len(system_module.MENU_TABLE['joinMenu'].entries) == 2
+
+
+#============================================== Story 8 Tests ======================================================
+# Cache coherence between processes
+
+@pytest.fixture
+def shared_systems(tmp_path, memory_system, registered_users):
+  """Creates two systems with their own connections to a database file holding the test users, as two processes would."""
+  path = str(tmp_path / 'shared.db')
+  memory_system.backup(path)
+  first, second = System(path), System(path)
+  yield first, second
+  first.conn.close()
+  second.conn.close()
+
+
+def test_sync_without_changes_reads_no_table(shared_systems):
+  """Checks that syncing when no other connection committed only runs PRAGMA data_version."""
+  first, second = shared_systems
+  statements = []
+  first.conn.set_trace_callback(statements.append)
+  assert first.syncCaches() == 0
+  assert statements == ['PRAGMA data_version']
+  # the connection's own commits don't change its data version
+  first.cursor.execute("UPDATE accounts SET major = 'history' WHERE username = 'user1'")
+  first.conn.commit()
+  assert first.syncCaches() == 0
+
+
+def test_sync_invalidates_changed_profiles_only(shared_systems):
+  """Checks that a profile changed by another connection is reloaded, while other cached profiles are kept."""
+  first, second = shared_systems
+  first.cachedProfile('user1')
+  first.cachedProfile('user2')
+  second.cursor.execute("UPDATE accounts SET title = 'Engineer' WHERE username = 'user1'")
+  second.conn.commit()
+  assert first.profileCache.get('user1')[1].headline is None
+  assert first.syncCaches() == 1
+  assert first.profileCache.get('user1') is None and first.profileCache.get('user2') is not None
+  assert first.cachedProfile('user1')[1].headline == 'Engineer'
+  assert first.syncCaches() == 0
+
+
+def test_sync_reloads_logged_in_settings(shared_systems):
+  """Checks that settings changed by another connection replace the logged in user's loaded settings."""
+  first, second = shared_systems
+  login(first, TEST_USER[0])
+  assert first.user.email
+  second.cursor.execute("UPDATE account_settings SET email = 0, language = 'Spanish' WHERE username = 'user1'")
+  second.conn.commit()
+  first.syncCaches()
+  assert not first.user.email and first.user.language == 'Spanish'
+
+
+def test_sync_reindexes_changed_jobs(shared_systems):
+  """Checks that job postings added or removed by another connection are reindexed one by one."""
+  first, second = shared_systems
+  insert = "INSERT INTO jobs (title, description, employer, location, salary, poster) VALUES (?, ?, ?, ?, ?, ?)"
+  first.cursor.execute(insert, ('Data Analyst', 'sql dashboards', 'Acme', 'Tampa', '1', 'user1'))
+  first.conn.commit()
+  first.syncJobMatcher()
+  second.cursor.execute(insert, ('Welder', 'metal fabrication', 'Forge', 'Tampa', '1', 'user2'))
+  second.conn.commit()
+  jobID = second.cursor.lastrowid
+  first.syncCaches()
+  assert jobID in first.jobMatcher.postings and len(first.jobMatcher) == 2
+  second.cursor.execute("DELETE FROM jobs WHERE jobID = ?", (jobID,))
+  second.conn.commit()
+  first.syncCaches()
+  assert jobID not in first.jobMatcher.postings
+
+
+def test_sync_after_pruned_journal_clears_caches(shared_systems):
+  """Checks that a connection whose unread changes were pruned from the journal clears its caches."""
+  first, second = shared_systems
+  first.cachedProfile('user2')
+  with mock.patch.object(system_module, 'CHANGE_JOURNAL_SIZE', 0):
+    second.cursor.execute("UPDATE accounts SET major = 'art' WHERE username = 'user1'")
+    second.conn.commit()
+    second.pruneChanges()
+  first.syncCaches()
+  assert len(first.profileCache) == 0
+
+
+def test_restore_clears_other_systems_caches(shared_systems):
+  """Checks that restoring the database journals every table as changed, so another system sharing it reloads its caches."""
+  first, second = shared_systems
+  snapshot = second.snapshot()
+  second.cursor.execute("UPDATE accounts SET title = 'NEW TITLE' WHERE username = 'user1'")
+  second.conn.commit()
+  first.syncCaches()
+  assert first.cachedProfile('user1')[1].headline == 'NEW TITLE'
+  second.restore(snapshot)
+  assert first.syncCaches() == len(system_module.JOURNALED_TABLES)
+  assert first.cachedProfile('user1')[1].headline is None
+  # a system that read changes numbered past the restored journal still clears its caches
+  first.cachedProfile('user1')
+  first.lastChange += 100
+  first.dataVersion = None
+  first.syncCaches()
+  assert len(first.profileCache) == 0
+  snapshot.close()
+
+
+def test_menu_steps_sync_caches(memory_system):
+  """Checks that the system's caches are synced before each step of its menus."""
+  with mock.patch.object(memory_system, 'syncCaches') as sync, mock.patch('builtins.input', side_effect=['0']):
+    memory_system.skills_menu()
+  sync.assert_called_once()
+
+
+#============================================== Story 9 Tests ======================================================
+# Write coordinator
+
+@pytest.fixture
+def locked_database(tmp_path, memory_system, registered_users):
+  """Returns a system on a database file, and another connection to the file able to hold its write lock."""
+  path = str(tmp_path / 'locked.db')
+  memory_system.backup(path)
+  system_instance = System(path)
+  system_instance.initMenu()
+  system_instance.writer.busyTimeout = 0  # report busy at once instead of waiting in SQLite
+  system_instance.writer.baseDelay = system_instance.writer.maxDelay = 0.01
+  other = sqlite3.connect(path, check_same_thread=False)
+  yield system_instance, other
+  other.close()
+  system_instance.conn.close()
+
+
+def test_busy_write_retried(locked_database):
+  """Checks that a write finding the database locked backs off and is retried once the lock is released."""
+  system_instance, other = locked_database
+  other.execute("BEGIN IMMEDIATE")
+  threading.Timer(0.03, other.rollback).start()
+  system_instance.writer.attempts = 50
+  system_instance.write(lambda: system_instance.cursor.execute("UPDATE accounts SET major = 'art' WHERE username = 'user1'"))
+  stats = system_instance.metrics()['writes']
+  assert stats['writes'] == 1 and stats['busy'] >= 1 and stats['waited'] > 0 and stats['failures'] == 0
+  assert other.execute("SELECT major FROM accounts WHERE username = 'user1'").fetchone() == ('art',)
+
+
+def test_busy_write_gives_up(locked_database, capsys):
+  """Checks that a write still busy after every attempt is rolled back, and the menu tells the user to try again."""
+  system_instance, other = locked_database
+  system_instance.writer.attempts = 3
+  login(system_instance, TEST_USER[0])
+  other.execute("BEGIN IMMEDIATE")  # readers can go on, writers are locked out
+  with pytest.raises(system_module.DatabaseBusyError):
+    system_instance.write(lambda: system_instance.cursor.execute("DELETE FROM jobs"))
+  assert not system_instance.conn.in_transaction
+  assert system_instance.writer.stats()['busy'] == 3 and system_instance.writer.stats()['failures'] == 1
+  assert system_instance.writer.stats()['writes'] == 1  # the login session
+  # a busy write from a menu leaves the user on the menu
+  with mock.patch('builtins.input', side_effect=['1', 'Title', 'Description', 'Employer', 'Tampa', '10', '0']):
+    system_instance.jobs_menu()
+  assert system_module.MSG_ERR_RETRY in capsys.readouterr().out
+  other.rollback()
+  assert system_instance.rowCount('jobs') == 0
+
+
+def test_other_errors_not_retried(memory_system, registered_users):
+  """Checks that errors other than a busy database are rolled back and raised without retrying."""
+  insert = "INSERT INTO accounts (username, password) VALUES ('user1', 'x')"
+  with pytest.raises(sqlite3.IntegrityError):
+    memory_system.write(lambda: memory_system.cursor.execute(insert))
+  assert memory_system.writer.stats()['busy'] == 0 and not memory_system.conn.in_transaction
+
+
+def test_quota_writes_begin_immediate(memory_system):
+  """Checks that registration checks its quota and inserts in one BEGIN IMMEDIATE transaction."""
+  statements = []
+  memory_system.conn.set_trace_callback(statements.append)
+  with mock.patch('builtins.input', side_effect=TEST_USER[0] + [TEST_USER[0][-1]]):
+    memory_system.register()
+  begin = statements.index('BEGIN IMMEDIATE')
+  commit = statements.index('COMMIT', begin)
+  assert any('INSERT INTO accounts' in statement for statement in statements[begin:commit])
+  assert any('counters' in statement for statement in statements[begin:commit])
+
+
+def test_nested_writes_share_transaction(memory_system, registered_users):
+  """Checks that a write run inside another joins its transaction and is committed once."""
+  def outer():
+    memory_system.write(lambda: memory_system.cursor.execute("UPDATE accounts SET major = 'art' WHERE username = 'user1'"))
+    memory_system.cursor.execute("UPDATE accounts SET major = 'art' WHERE username = 'user2'")
+  before = memory_system.writer.stats()['writes']
+  memory_system.write(outer)
+  assert memory_system.writer.stats()['writes'] == before + 1
+  assert memory_system.cursor.execute("SELECT COUNT(*) FROM accounts WHERE major = 'art'").fetchone()[0] == 2
+
+
+def test_writers_of_a_database_share_queue(tmp_path):
+  """Checks that coordinators of the same database file share one queue, and private memory databases don't."""
+  conn = sqlite3.connect(":memory:")
+  path = str(tmp_path / 'queue.db')
+  first, second = system_module.WriteCoordinator(conn, path), system_module.WriteCoordinator(conn, path)
+  assert first.queue is second.queue
+  assert system_module.WriteCoordinator(conn, ":memory:").queue is not system_module.WriteCoordinator(conn, ":memory:").queue
+  conn.close()
+
+
+def test_busy_timeout_left_to_backoff(tmp_path, memory_system, registered_users):
+  """Checks that SQLite only waits BUSY_TIMEOUT for a lock, so a busy write's wait is the coordinator's backoff."""
+  path = str(tmp_path / 'timeout.db')
+  memory_system.backup(path)
+  system_instance = System(path)
+  system_instance.writer.attempts = 2
+  system_instance.writer.baseDelay = system_instance.writer.maxDelay = 0.01
+  other = sqlite3.connect(path)
+  other.execute("BEGIN IMMEDIATE")
+  start = time.monotonic()
+  with pytest.raises(system_module.DatabaseBusyError):
+    system_instance.write(lambda: system_instance.cursor.execute("DELETE FROM jobs"))
+  assert time.monotonic() - start < 2 * system_module.BUSY_TIMEOUT + 1
+  other.rollback()
+  other.close()
+  system_instance.conn.close()
+
+
+def test_reads_wait_for_lock(tmp_path, memory_system, registered_users, capsys):
+  """Checks that reads, which aren't retried, wait READ_TIMEOUT for another connection's lock instead of the short write timeout."""
+  path = str(tmp_path / 'read.db')
+  memory_system.backup(path)
+  system_instance = System(path)
+  system_instance.write(lambda: system_instance.cursor.execute("DELETE FROM jobs"))
+  assert system_instance.conn.execute("PRAGMA busy_timeout").fetchone()[0] == system_module.READ_TIMEOUT * 1000
+  other = sqlite3.connect(path, check_same_thread=False)
+  other.execute("BEGIN EXCLUSIVE")
+  threading.Timer(0.5, other.rollback).start()
+  assert login(system_instance, TEST_USER[0]) is not None
+  assert "You Have Successfully Logged In!" in capsys.readouterr().out
+  other.close()
+  system_instance.conn.close()
+
+
+def test_housekeeping_writes_wait_for_lock(locked_database, capsys):
+  """Checks that the session and journal housekeeping writes go through the write coordinator instead of failing when locked."""
+  system_instance, other = locked_database
+  login(system_instance, TEST_USER[0])
+  system_instance.writer.attempts = 2
+  other.execute("BEGIN IMMEDIATE")
+  system_instance.sessionsReaped = 0
+  with mock.patch('builtins.input', side_effect=['0']):
+    system_instance.home_page()  # the expired sessions are left for the next display
+  assert system_instance.sessionsReaped == 0
+  for housekeeping in (system_instance.saveSession, system_instance.endSession, system_instance.pruneChanges):
+    with pytest.raises(system_module.DatabaseBusyError):
+      housekeeping()
+  other.rollback()
+  system_instance.reapSessions(force=True)
+  assert system_instance.sessionsReaped > 0
+
+
+def test_busy_background_action_returns_to_menu(locked_database, capsys):
+  """Checks that a menu whose background write stays busy is closed with the retry message, returning to the previous menu."""
+  system_instance, other = locked_database
+  login(system_instance, TEST_USER[0])
+  system_instance.writer.attempts = 2
+  other.execute("BEGIN IMMEDIATE")
+  # the edit menu's loadUserProfile marks the user as having a profile
+  with mock.patch('builtins.input', side_effect=['1', '0']):
+    system_instance.user_profile_menu()
+  out = capsys.readouterr().out
+  assert system_module.MSG_ERR_RETRY in out
+  assert out.count("Welcome to the Profile Menu") == 2
+  other.rollback()
+
+
+def test_experience_written_in_one_transaction(locked_database):
+  """Checks that an experience added by another session while one is being entered is updated instead of added twice."""
+  system_instance, other = locked_database
+  login(system_instance, TEST_USER[0])
+  def enterTitle():
+    other.execute("INSERT INTO experiences (username, title) VALUES ('user1', 'Intern')")
+    other.commit()
+    return 'Engineer'
+  with mock.patch('builtins.input', side_effect=enterTitle), mock.patch.object(system_instance, 'title1Menu'):
+    system_instance.edit_exp_title('title1')
+  assert other.execute("SELECT title FROM experiences WHERE username = 'user1'").fetchall() == [('Engineer',)]
+  assert system_instance.cachedProfile('user1')[1].experiences[0].title == 'Engineer'
+
+
+#============================================== Story 10 Tests =====================================================
+# Canonical friend pairs
+
+def test_friend_pairs_unique_without_trigger(memory_system, registered_users, capsys):
+  """Checks that a friendship is unique for its pair of users by index, whichever user sent the request."""
+  schema = memory_system.cursor.execute("SELECT type, name FROM sqlite_master WHERE tbl_name = 'friends'").fetchall()
+  assert ('index', 'friends_pair') in schema
+  assert not any(kind == 'trigger' and name == 'unique_friend_combinations' for kind, name in schema)
+  login(memory_system, TEST_USER[0])
+  memory_system.sendFriendRequest(system_module.UserRef('user2', 'bobby', 'hill'))
+  login(memory_system, TEST_USER[1])
+  memory_system.sendFriendRequest(system_module.UserRef('user1', 'hank', 'hill'))
+  assert "Pre-Existing Friend Record Found" in capsys.readouterr().out
+  assert memory_system.cursor.execute("SELECT * FROM friends").fetchall() == [('user1', 'user2', 'pending')]
+
+
+def test_friend_lookups_seek_indexes(memory_system):
+  """Checks that the friend queries search the friends indexes instead of scanning the table."""
+  statements = []
+  memory_system.conn.set_trace_callback(statements.append)
+  memory_system.user.login('user1', 'hank', 'hill', 'uni1', 'major1', True, True, True, 'English')
+  memory_system.loadAllFriends()
+  memory_system.fetchAcceptedFriendsPage(None, 10)
+  memory_system.disconnectFriend(system_module.UserRef('user2', 'bobby', 'hill'))
+  memory_system.conn.set_trace_callback(None)
+  friendQueries = [statement for statement in statements if 'FROM friends' in statement]
+  assert len(friendQueries) == 5
+  for statement in friendQueries:
+    plan = [row[-1] for row in memory_system.conn.execute(f"EXPLAIN QUERY PLAN {statement}")]
+    assert not any(step.startswith('SCAN friends') for step in plan)
+
+
+def test_disconnect_either_direction(memory_system, registered_users):
+  """Checks that disconnecting removes the friendship whichever user sent the request."""
+  query = "INSERT INTO friends (sender, receiver, status) VALUES (?, ?, 'accepted')"
+  memory_system.cursor.executemany(query, [('user1', 'user2'), ('user3', 'user1')])
+  memory_system.conn.commit()
+  login(memory_system, TEST_USER[0])
+  memory_system.loadAcceptedFriends()
+  assert set(memory_system.user.acceptedRequests) == {'user2', 'user3'}
+  memory_system.disconnectFriend(memory_system.user.acceptedRequests['user2'])
+  memory_system.disconnectFriend(memory_system.user.acceptedRequests['user3'])
+  assert memory_system.cursor.execute("SELECT COUNT(*) FROM friends").fetchone()[0] == 0
+
+
+def test_friend_pairs_migrated(tmp_path):
+  """Checks that a database using the old trigger gets the pair index, keeping the first of any reversed duplicates."""
+  path = str(tmp_path / 'old.db')
+  conn = sqlite3.connect(path)
+  conn.execute("CREATE TABLE friends (sender VARCHAR(25), receiver VARCHAR(25), status VARCHAR(12), PRIMARY KEY(sender, receiver))")
+  conn.executemany("INSERT INTO friends VALUES (?, ?, ?)", [('a', 'b', 'accepted'), ('b', 'a', 'pending'), ('c', 'a', 'pending')])
+  conn.commit()
+  conn.close()
+  migrated = System(path)
+  assert migrated.cursor.execute("SELECT * FROM friends ORDER BY sender").fetchall() == [('a', 'b', 'accepted'), ('c', 'a', 'pending')]
+  with pytest.raises(sqlite3.IntegrityError):
+    migrated.cursor.execute("INSERT INTO friends VALUES ('a', 'c', 'pending')")
+  migrated.conn.close()
+
+
+#============================================== Story 11 Tests =====================================================
+# Race-free registration
+
+def test_bloom_filter_has_no_false_negatives():
+  """Checks that every added item is found, and items never added are rarely reported present."""
+  bloom = system_module.BloomFilter(1000, 0.01)
+  for i in range(1000):
+    bloom.add(f"user{i}")
+  assert all(f"user{i}" in bloom for i in range(1000))
+  assert bloom.full()
+  falsePositives = sum(f"other{i}" in bloom for i in range(10000))
+  assert falsePositives < 300
+
+
+def test_new_username_checked_without_query(memory_system, registered_users):
+  """Checks that an available username is accepted from the username filter, and a taken one is confirmed by a query."""
+  statements = []
+  memory_system.conn.set_trace_callback(statements.append)
+  assert memory_system.validateUserName('newuser')
+  assert statements == []
+  assert not memory_system.validateUserName('user1')
+  assert len(statements) == 1
+
+
+def test_taken_username_rejected_before_details(memory_system, registered_users, capsys):
+  """Checks that registering with a taken username fails as soon as the username is entered."""
+  with mock.patch('builtins.input', side_effect=['user1']) as prompt:
+    memory_system.register()
+  assert prompt.call_count == 1
+  out = capsys.readouterr().out
+  assert "Username Has Been Taken." in out and "Account Creation Failed." in out
+
+
+def test_username_taken_during_prompts(memory_system, registered_users, capsys):
+  """Checks that a username taken by another connection while the details are entered is rejected by the insert."""
+  answers = iter(['racer', 'rita', 'race', 'uni', 'major', 'Password9!'])
+  def answer():
+    value = next(answers, None)
+    if value is None:  # the password is confirmed after the username is taken
+      memory_system.conn.execute("INSERT INTO accounts (username, password, fName, lName) VALUES ('racer', 'x', 'other', 'user')")
+      return 'Password9!'
+    return value
+  with mock.patch('builtins.input', side_effect=answer):
+    assert memory_system.register() is None
+  out = capsys.readouterr().out
+  assert "Username Has Been Taken." in out and "Account created successfully." not in out
+  assert memory_system.cursor.execute("SELECT fName FROM accounts WHERE username = 'racer'").fetchone() == ('other',)
+
+
+def test_username_filter_follows_other_connections(shared_systems):
+  """Checks that usernames registered by another connection are added to the username filter when caches sync."""
+  first, second = shared_systems
+  with mock.patch('builtins.input', side_effect=['user4', 'hank', 'hill', 'uni', 'major', 'Password4$', 'Password4$']):
+    second.register()
+  assert 'user4' not in first.usernames
+  first.syncCaches()
+  assert 'user4' in first.usernames
+  assert first.usernameTaken('user4')
+
+
+def test_username_filter_skips_known_usernames(shared_systems):
+  """Checks that accounts updated by another connection don't fill the username filter or cause rebuilds."""
+  first, second = shared_systems
+  count = len(first.usernames)
+  with mock.patch.object(first, 'rebuildUsernames') as rebuild:
+    for major in ('Art', 'Math', 'Physics'):
+      second.writeProfile('user1', "UPDATE accounts SET major = ? WHERE username = 'user1'", (major,))
+      first.syncCaches()
+  rebuild.assert_not_called()
+  assert len(first.usernames) == count
+
+
+#============================================== Story 12 Tests =====================================================
+# Case insensitive account indexes
+
+def test_find_user_seeks_name_index(memory_system, registered_users, capsys):
+  """Checks that finding a user by name matches any case and seeks the name index."""
+  statements = []
+  memory_system.conn.set_trace_callback(statements.append)
+  with mock.patch('builtins.input', side_effect=['HANK', 'Hill']):
+    memory_system.findUser()
+  memory_system.conn.set_trace_callback(None)
+  assert "They Are Part Of The InCollege System." in capsys.readouterr().out
+  query = next(statement for statement in statements if 'FROM accounts' in statement)
+  plan = [row[-1] for row in memory_system.conn.execute(f"EXPLAIN QUERY PLAN {query}")]
+  assert any(step.startswith('SEARCH accounts USING COVERING INDEX accounts_name') for step in plan)
+
+
+def test_search_counts_scan_indexes(memory_system):
+  """Checks that the Find A Friend counts read the column's index instead of the accounts table."""
+  for field, index in (('lName', 'accounts_name'), ('university', 'accounts_university'), ('major', 'accounts_major')):
+    query = f"SELECT COUNT(*) FROM accounts WHERE {field} LIKE ? COLLATE NOCASE and username != ?"
+    plan = [row[-1] for row in memory_system.conn.execute(f"EXPLAIN QUERY PLAN {query}", ('%a%', 'user1'))]
+    assert plan == [f'SCAN accounts USING COVERING INDEX {index}']
+
+
+def test_profile_edits_title_cased(memory_system, registered_users):
+  """Checks that universities and majors entered while editing a profile are title cased when written, as when registering."""
+  login(memory_system, TEST_USER[0])
+  memory_system.loadUserProfile()
+  with mock.patch('builtins.input', side_effect=['university of south florida', 'computer science']):
+    with mock.patch.object(memory_system, 'uniMenu'), mock.patch.object(memory_system, 'degreeMenu'):
+      memory_system.edit_section('uni')
+      memory_system.edit_section('deg')
+  row = memory_system.cursor.execute("SELECT university, major FROM accounts WHERE username = 'user1'").fetchone()
+  assert row == ('University Of South Florida', 'Computer Science')
+
+
+#============================================== Story 13 Tests =====================================================
+# Profile documents
+
+def profile_fields(result):
+  """Returns a loaded profile flag and profile as plain values, so profiles loaded by different methods can be compared."""
+  hasProfile, userProfile = result
+  edu = userProfile.education
+  return (hasProfile, userProfile.headline, userProfile.about, (edu.university, edu.major, edu.yearsAttended),
+          [(exp.ID, exp.title, exp.employer, exp.startDate, exp.endDate, exp.location, exp.description) for exp in userProfile.experiences])
+
+
+def add_experiences(system_instance):
+  """Gives user1 a headline and two experiences, and user2 one experience."""
+  query = "INSERT INTO experiences (username, title, employer, dateStarted, dateEnded, location, description) VALUES (?, ?, ?, ?, ?, ?, ?)"
+  system_instance.cursor.executemany(query, [('user1', 'Intern', 'ABC', '2022-01-01', '2022-06-01', 'Tampa', 'Wrote "tests"'),
+                                             ('user2', 'Tutor', 'USF', '2021-01-01', None, 'Tampa', None),
+                                             ('user1', 'Engineer', 'XYZ', '2023-01-01', None, None, 'Python')])
+  system_instance.cursor.execute("UPDATE accounts SET title = 'Student', yearsAttended = 3, profile = True WHERE username = 'user1'")
+  system_instance.conn.commit()
+
+
+def test_profile_documents_match_join(memory_system, registered_users):
+  """Checks that the profile documents load the same profiles as the join as accounts and experiences change."""
+  add_experiences(memory_system)
+  for userName in ('user1', 'user2', 'user3'):
+    assert profile_fields(memory_system.queryProfile(userName)) == profile_fields(memory_system.queryJoinedProfile(userName))
+  memory_system.cursor.execute("UPDATE experiences SET employer = 'DEF' WHERE title = 'Intern'")
+  memory_system.cursor.execute("DELETE FROM experiences WHERE username = 'user2'")
+  memory_system.cursor.execute("UPDATE accounts SET infoAbout = 'Hi', university = 'Usf' WHERE username = 'user2'")
+  for userName in ('user1', 'user2'):
+    assert profile_fields(memory_system.queryProfile(userName)) == profile_fields(memory_system.queryJoinedProfile(userName))
+  assert profile_fields(memory_system.queryProfile('user1'))[4][0][2] == 'DEF'
+  memory_system.cursor.execute("DELETE FROM accounts WHERE username = 'user3'")
+  assert memory_system.queryProfile('user3') is None
+  assert memory_system.cursor.execute("SELECT COUNT(*) FROM profile_documents WHERE username = 'user3'").fetchone()[0] == 0
+
+
+def test_profile_load_is_one_read(memory_system, registered_users):
+  """Checks that loading a profile is one primary key read of the profile documents."""
+  add_experiences(memory_system)
+  statements = []
+  memory_system.conn.set_trace_callback(statements.append)
+  memory_system.queryProfile('user1')
+  memory_system.conn.set_trace_callback(None)
+  assert len(statements) == 1
+  plan = [row[-1] for row in memory_system.conn.execute(f"EXPLAIN QUERY PLAN {statements[0]}")]
+  assert plan == ['SEARCH profile_documents USING PRIMARY KEY (username=?)']
+
+
+def test_profile_documents_written_for_existing_accounts(tmp_path, memory_system, registered_users):
+  """Checks that a database created before profile documents gets a document for each account, and imports write documents."""
+  add_experiences(memory_system)
+  path = str(tmp_path / 'old.db')
+  memory_system.backup(path)
+  conn = sqlite3.connect(path)
+  conn.executescript("DROP TABLE profile_documents; DROP TRIGGER profile_document_accounts_insert;")
+  conn.close()
+  migrated = System(path)
+  assert profile_fields(migrated.queryProfile('user1')) == profile_fields(memory_system.queryProfile('user1'))
+  memory_system.exportData(str(tmp_path / 'export'))
+  imported = System.fromTemplate(TEMPLATE_DB)
+  imported.importData(str(tmp_path / 'export'))
+  for userName in ('user1', 'user2', 'user3'):
+    assert profile_fields(imported.queryProfile(userName)) == profile_fields(memory_system.queryProfile(userName))
+  migrated.conn.close()
+  imported.conn.close()
+
+
+def test_benchmark_profile_loads(memory_system, registered_users):
+  """Checks that the benchmark loads every profile by both methods and reports their mean load times."""
+  add_experiences(memory_system)
+  with mock.patch.object(memory_system, 'queryJoinedProfile', wraps=memory_system.queryJoinedProfile) as joined:
+    timings = memory_system.benchmarkProfileLoads(repeat=2)
+  assert joined.call_count == 6
+  assert timings['profiles'] == 3
+  assert timings['document'] > 0 and timings['join'] > 0
+
+
+def test_profile_document_experiences_ordered(memory_system, registered_users):
+  """Checks that a profile document lists the experiences by expID whatever index the query uses."""
+  memory_system.cursor.execute("DROP INDEX experiences_username")
+  query = "INSERT INTO experiences (expID, username, title) VALUES (?, 'user1', ?)"
+  memory_system.cursor.executemany(query, [(9, 'Engineer'), (3, 'Intern'), (5, 'Tutor')])
+  experiences = memory_system.queryProfile('user1')[1].experiences
+  assert [(exp.ID, exp.title) for exp in experiences] == [(3, 'Intern'), (5, 'Tutor'), (9, 'Engineer')]
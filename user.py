@@ -1,6 +1,23 @@
+import json
+import itertools
+from collections import OrderedDict
+
+# number of seconds a cached profile is reused before it is fetched again
+PROFILE_TTL = 300
+# output formats supported by User.displayProfile
+PROFILE_FORMATS = ('terminal', 'text', 'json')
+# maximum number of rendered profiles kept by the profile renderer
+RENDER_CACHE_SIZE = 512
+# source of profile content versions, every new or changed profile gets the next version
+_profileVersions = itertools.count(1)
+
 class User:
   ## Not in Use Yet but will hold saved progress and relationships eventually
   ## Probably instantiate in system class and hold logged in status as well
+  # slots keep each loaded user compact (no per instance __dict__)
+  __slots__ = ('userName', 'fName', 'lName', 'university', 'major', 'Profile',
+               'email', 'sms', 'targetedAds', 'language',
+               'sentRequests', 'acceptedRequests', 'receivedRequests', 'loggedOn')
   def __init__(self, userName, fName, lName, loggedOn=False, university=None, major=None, Profile=None):
     from system import LANGUAGES
     self.userName = userName
@@ -47,59 +64,77 @@ class User:
   def hasProfile(self):
     return self.Profile is not None
 
-  def displayProfile(self, mode):
-    firstName = self.fName.capitalize()
-    lastName = self.lName.capitalize()
-    if mode == "full":
-        profileString = "---------------\nViewing Profile\n---------------\n\n"
-        profileString += f"Name: {firstName} {lastName}\n"
-        
-        if self.hasProfile():
-            headline = self.Profile.headline
-            about = self.Profile.about
-
-            profileString += f"Title: {headline if headline else 'N/A'}\n"
-            profileString += f"About: {about if about else 'N/A'}\n\n"
-            # education section
-            if self.Profile.education:
-              university = self.Profile.education.university.title()
-              major = self.Profile.education.major.title()
-              yearsAttended = self.Profile.education.yearsAttended
-              profileString += "Education\n..........\n\n"
-              profileString += f" University: {university}\n"
-              profileString += f" Degree: {major if major else 'N/A'}\n"
-              profileString += f" Years Attended: {yearsAttended if yearsAttended else 'N/A'}\n"
-            # experiences section 
-            if self.Profile.experiences:
-                for i, experience in enumerate(self.Profile.experiences, start = 1):
-                    title = experience.title if experience.title else 'N/A'
-                    employer = experience.employer if experience.employer else 'N/A'
-                    startDate = experience.startDate if experience.startDate else 'N/A'
-                    endDate = experience.endDate if experience.endDate else 'N/A'
-                    location = experience.location if experience.location else 'N/A'
-                    description = experience.description if experience.description else 'N/A'
-                    profileString += f"\nExperience {i}\n"
-                    profileString += ".............\n\n"
-                    profileString += f" Title: {title}\n"
-                    profileString += f" Employer: {employer}\n"
-                    profileString += f" Start Date: {startDate}\n"
-                    profileString += f" End Date: {endDate}\n"
-                    profileString += f" Location: {location}\n"
-                    profileString += f" Description: {description}\n\n"
-        return profileString
-
-    elif mode == "part":
-        return f"Name: {firstName} {lastName}"
+  def displayProfile(self, mode, fmt="terminal"):
+    """
+    Returns the user's profile as a string.
+
+    Args:
+      mode (str): "full" for the whole profile or "part" for the name only.
+      fmt (str): One of the PROFILE_FORMATS (terminal, text, json). The default is terminal.
+    """
+    return RENDERER.render(self, mode, fmt)
+
+
+class UserRef:
+  """
+  Lightweight reference to another user for list and search contexts (search results, friend lists).
+  Only holds the username and names, and the profile once it is loaded,
+  use upgrade to create a full User from the reference when one is needed.
+  """
+  __slots__ = ('userName', 'fName', 'lName', 'Profile')
+  def __init__(self, userName, fName, lName, Profile=None):
+    self.userName = userName
+    self.fName = fName
+    self.lName = lName
+    self.Profile = Profile
+
+  # a reference displays the same way as the full user
+  hasProfile = User.hasProfile
+  displayProfile = User.displayProfile
+
+  def upgrade(self, **fields):
+    """Returns a full User for the referenced user, any additional User fields may be passed as keyword arguments."""
+    return User(self.userName, self.fName, self.lName, Profile=self.Profile, **fields)
+
+
+class LazyProfile:
+  """
+  Stands in for another user's profile until it is needed.
+  The profile is fetched by calling load on each access of one of its attributes. load is expected to return a cached profile
+  (ex. from the system's profile cache), so the proxy holds no copy of its own that could outlive the cached one.
+
+  Args:
+    load (function): Returns the user's profile, or None if the profile is unavailable.
+  """
+  __slots__ = ('load',)
+  def __init__(self, load):
+    self.load = load
+
+  def resolve(self):
+    """Returns the profile, or None if it is unavailable."""
+    return self.load()
+
+  def __getattr__(self, name):
+    # only called for attributes that are not slots of the proxy (the profile's fields), unknown fields raise AttributeError
+    return getattr(self.resolve(), name)
 
 
 class profile:
+  __slots__ = ('headline', 'about', 'education', 'experiences', 'version')
   def __init__(self, headline=None, about=None, education=None, experiences=None):
     self.headline = headline
     self.about = about
     self.education = education
     self.experiences = experiences
+    # content version used to reuse rendered output, call touch after changing the profile in place
+    self.version = next(_profileVersions)
+
+  def touch(self):
+    """Gives the profile a new content version so it is rendered again."""
+    self.version = next(_profileVersions)
 
 class experience:
+  __slots__ = ('ID', 'title', 'employer', 'startDate', 'endDate', 'location', 'description')
   def __init__(self, ID, title, employer, startDate, endDate, location, description):
     self.ID = ID
     self.title = title
@@ -110,7 +145,115 @@ class experience:
     self.description = description
 
 class education:
+  __slots__ = ('university', 'major', 'yearsAttended')
   def __init__(self, university, major, yearsAttended):
     self.university = university
     self.major = major
-    self.yearsAttended = yearsAttended  
\ No newline at end of file
+    self.yearsAttended = yearsAttended  
+
+
+class ProfileRenderer:
+  """
+  Renders user profiles from templates compiled once when the renderer is created.
+  Rendered output is memoized by the user's name and the profile's content version,
+  so displaying an unchanged profile again does not rebuild the string.
+
+  Args:
+    maxSize (int): The maximum number of rendered profiles that are memoized.
+  """
+  # templates for each output format, terminal matches the original profile layout
+  TEMPLATES = {
+    'terminal': {
+      'part': "Name: {first} {last}",
+      'header': "---------------\nViewing Profile\n---------------\n\nName: {first} {last}\n",
+      'summary': "Title: {headline}\nAbout: {about}\n\n",
+      'education': "Education\n..........\n\n University: {university}\n Degree: {major}\n Years Attended: {years}\n",
+      'experience': ("\nExperience {n}\n.............\n\n Title: {title}\n Employer: {employer}\n Start Date: {startDate}\n"
+                     " End Date: {endDate}\n Location: {location}\n Description: {description}\n\n"),
+    },
+    'text': {
+      'part': "Name: {first} {last}",
+      'header': "Name: {first} {last}\n",
+      'summary': "Title: {headline}\nAbout: {about}\n",
+      'education': "University: {university}\nDegree: {major}\nYears Attended: {years}\n",
+      'experience': ("Experience {n}: {title}\nEmployer: {employer}\nStart Date: {startDate}\n"
+                     "End Date: {endDate}\nLocation: {location}\nDescription: {description}\n"),
+    },
+  }
+
+  def __init__(self, maxSize=RENDER_CACHE_SIZE):
+    self.maxSize = maxSize
+    self.rendered = OrderedDict()  # key: (mode, format, names, profile version), value: rendered profile
+    self.hits = 0
+    self.misses = 0
+    # compile each template into its bound format method
+    self.compiled = {fmt: {name: template.format for name, template in templates.items()}
+                     for fmt, templates in self.TEMPLATES.items()}
+
+  def render(self, user, mode, fmt="terminal"):
+    """Returns the rendered profile of the user, reusing the memoized output when the profile has not changed."""
+    if fmt not in PROFILE_FORMATS:
+      raise ValueError(f"Unknown profile format: {fmt}")
+    if mode not in ("full", "part"):
+      return None
+    hasProfile = user.hasProfile()
+    version = getattr(user.Profile, 'version', None) if mode == "full" and hasProfile else None
+    key = (mode, fmt, user.fName, user.lName, hasProfile, version)
+    output = self.rendered.get(key)
+    if output is not None:
+      self.hits += 1
+      self.rendered.move_to_end(key)
+      return output
+    self.misses += 1
+    output = self.build(user, mode, fmt, hasProfile)
+    # profiles without a content version (lazy profiles that could not be loaded) are not memoized
+    if mode == "part" or not hasProfile or version is not None:
+      self.rendered[key] = output
+      while len(self.rendered) > self.maxSize:
+        self.rendered.popitem(last=False)
+    return output
+
+  def build(self, user, mode, fmt, hasProfile):
+    """Renders the profile without consulting the memoized output."""
+    first, last = user.fName.capitalize(), user.lName.capitalize()
+    userProfile = user.Profile if hasProfile else None
+    if fmt == 'json':
+      return json.dumps(self.fields(first, last, userProfile if mode == "full" else None))
+    templates = self.compiled[fmt]
+    if mode == "part":
+      return templates['part'](first=first, last=last)
+    na = lambda value: value if value else 'N/A'
+    parts = [templates['header'](first=first, last=last)]
+    if userProfile is not None:
+      parts.append(templates['summary'](headline=na(userProfile.headline), about=na(userProfile.about)))
+      edu = userProfile.education
+      if edu:
+        parts.append(templates['education'](university=edu.university.title() if edu.university is not None else 'N/A',
+                                            major=na(edu.major.title() if edu.major is not None else None),
+                                            years=na(edu.yearsAttended)))
+      for n, exp in enumerate(userProfile.experiences or (), start=1):
+        parts.append(templates['experience'](n=n, title=na(exp.title), employer=na(exp.employer),
+                                             startDate=na(exp.startDate), endDate=na(exp.endDate),
+                                             location=na(exp.location), description=na(exp.description)))
+    return ''.join(parts)
+
+  @staticmethod
+  def fields(first, last, userProfile):
+    """Returns the profile as a dictionary for the json format."""
+    fields = {'name': f"{first} {last}"}
+    if userProfile is not None:
+      edu = userProfile.education
+      fields['headline'] = userProfile.headline
+      fields['about'] = userProfile.about
+      fields['education'] = edu and {'university': edu.university, 'major': edu.major, 'yearsAttended': edu.yearsAttended}
+      fields['experiences'] = [{'title': exp.title, 'employer': exp.employer, 'startDate': exp.startDate,
+                                'endDate': exp.endDate, 'location': exp.location, 'description': exp.description}
+                               for exp in userProfile.experiences or ()]
+    return fields
+
+  def stats(self):
+    return {'size': len(self.rendered), 'hits': self.hits, 'misses': self.misses}
+
+
+# shared renderer used by User.displayProfile
+RENDERER = ProfileRenderer()